@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
     UserProfile, Skill, Hackathon, Team, TeamMembership,
-    TeamInvitation, Task, TaskComment, MatchingPreference
+    TeamInvitation, Task, TaskComment, MatchingPreference, TeamFormationJob,
+    RecommendationFeed, HackathonAnalytics, SkillPopularity
 )
 
 
@@ -15,8 +16,8 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(Skill)
 class SkillAdmin(admin.ModelAdmin):
-    list_display = ('name', 'category', 'created_at')
-    list_filter = ('category', 'created_at')
+    list_display = ('name', 'category', 'is_public', 'created_at')
+    list_filter = ('category', 'is_public', 'created_at')
     search_fields = ('name', 'description')
 
 
@@ -35,6 +36,17 @@ class TeamAdmin(admin.ModelAdmin):
     list_filter = ('hackathon', 'is_recruiting', 'created_at')
     search_fields = ('name', 'description', 'leader__username')
     readonly_fields = ('created_at', 'updated_at', 'current_size')
+    list_select_related = ('hackathon', 'leader')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_member_counts()
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            # Leave member_count to the F() updates of the membership signals
+            obj.save(update_fields=[*form.changed_data, 'updated_at'])
+        else:
+            super().save_model(request, obj, form, change)
 
 
 @admin.register(TeamMembership)
@@ -71,3 +83,32 @@ class MatchingPreferenceAdmin(admin.ModelAdmin):
     list_display = ('user', 'preferred_team_size', 'location_preference', 'created_at')
     list_filter = ('location_preference', 'created_at')
     search_fields = ('user__username',)
+
+
+@admin.register(TeamFormationJob)
+class TeamFormationJobAdmin(admin.ModelAdmin):
+    list_display = ('hackathon', 'status', 'participant_count', 'requested_by', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('hackathon__title',)
+    readonly_fields = ('created_at', 'started_at', 'completed_at')
+
+
+@admin.register(RecommendationFeed)
+class RecommendationFeedAdmin(admin.ModelAdmin):
+    list_display = ('user', 'is_stale', 'refreshed_at')
+    list_filter = ('is_stale',)
+    search_fields = ('user__username',)
+
+
+@admin.register(HackathonAnalytics)
+class HackathonAnalyticsAdmin(admin.ModelAdmin):
+    list_display = ('hackathon', 'is_stale', 'refreshed_at')
+    list_filter = ('is_stale',)
+    search_fields = ('hackathon__title',)
+
+
+@admin.register(SkillPopularity)
+class SkillPopularityAdmin(admin.ModelAdmin):
+    list_display = ('skill', 'score', 'profile_count', 'team_count', 'updated_at')
+    search_fields = ('skill',)
+    ordering = ('-score',)
@@ -0,0 +1,83 @@
+"""
+Database-side aggregation over JSON list columns
+
+Skill, theme and role lists are stored as JSON arrays. ``json_element_counts``
+unnests them inside the database (``jsonb_array_elements`` on PostgreSQL,
+``json_each`` on SQLite), groups and orders there, and returns only the
+top rows, so memory on the web worker does not grow with the number of
+rows scanned. Other backends fall back to streaming the column through a
+Counter.
+"""
+from collections import Counter
+
+from django.db import connections
+
+
+# Matches trending.skill_counter: string entries, truncated to 100 characters
+MAX_VALUE_LENGTH = 100
+
+_UNNEST_SQL = {
+    'postgresql': (
+        'SELECT LEFT(elem #>> \'{{}}\', {length}) AS value, {weight} AS weight '
+        'FROM ({query}) AS src CROSS JOIN LATERAL jsonb_array_elements('
+        'CASE WHEN jsonb_typeof(src.{column}) = \'array\' THEN src.{column} '
+        'ELSE \'[]\'::jsonb END) AS elem '
+        'WHERE jsonb_typeof(elem) = \'string\' AND elem #>> \'{{}}\' <> \'\''
+    ),
+    'sqlite': (
+        'SELECT SUBSTR(elem.value, 1, {length}) AS value, {weight} AS weight '
+        'FROM ({query}) AS src, json_each('
+        'CASE WHEN json_type(src.{column}) = \'array\' THEN src.{column} '
+        'ELSE \'[]\' END) AS elem '
+        'WHERE elem.type = \'text\' AND elem.value <> \'\''
+    ),
+}
+
+
+def json_element_counts(sources, limit=10):
+    """
+    Most frequent string elements across JSON list columns.
+
+    ``sources`` is an iterable of ``(queryset, field, weight)``; each element
+    of ``field`` in every row of ``queryset`` adds ``weight`` to its count.
+    All querysets must use the same database. Returns up to ``limit``
+    ``(value, count)`` pairs ordered by count, then value.
+    """
+    sources = list(sources)
+    if not sources:
+        return []
+
+    alias = sources[0][0].db
+    connection = connections[alias]
+    template = _UNNEST_SQL.get(connection.vendor)
+    if template is None:
+        return _count_in_python(sources, limit)
+
+    parts, params = [], []
+    for queryset, field, weight in sources:
+        query, query_params = queryset.order_by().values(field).query.sql_with_params()
+        parts.append(template.format(
+            length=MAX_VALUE_LENGTH,
+            weight=int(weight),
+            query=query,
+            column=connection.ops.quote_name(field),
+        ))
+        params.extend(query_params)
+
+    sql = (
+        'SELECT value, SUM(weight) AS total FROM ({}) AS elements '
+        'GROUP BY value ORDER BY total DESC, value LIMIT %s'
+    ).format(' UNION ALL '.join(parts))
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*params, limit])
+        return [(value, int(total)) for value, total in cursor.fetchall()]
+
+
+def _count_in_python(sources, limit):
+    counts = Counter()
+    for queryset, field, weight in sources:
+        for values in queryset.values_list(field, flat=True).iterator():
+            for value in values if isinstance(values, list) else ():
+                if isinstance(value, str) and value:
+                    counts[value[:MAX_VALUE_LENGTH]] += weight
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
@@ -0,0 +1,94 @@
+"""
+Materialized hackathon analytics for the HackMate API
+
+/api/hackathons/<id>/analytics/ reads a stored HackathonAnalytics row
+instead of aggregating the raw tables on every request. Signal handlers
+flag the snapshot stale when teams, memberships or tasks change; a stale
+snapshot is rebuilt on read at most once per HACKATHON_ANALYTICS_DEBOUNCE
+seconds, or by the refresh_hackathon_analytics worker. Every rebuild that
+changes the figures appends a HackathonAnalyticsSnapshot, giving organizers
+a participation history without recomputing it from raw tables.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import HackathonAnalytics, HackathonAnalyticsSnapshot
+from .utils import get_hackathon_analytics
+
+
+# Most recent history points returned per request
+HISTORY_LIMIT = 1000
+
+
+def build_snapshot(hackathon):
+    """Recompute and store the hackathon's analytics"""
+    # Round-trip through JSON so the stored and freshly built data compare equal
+    data = json.loads(json.dumps(get_hackathon_analytics(hackathon)))
+    now = timezone.now()
+
+    with transaction.atomic():
+        snapshot, _ = HackathonAnalytics.objects.update_or_create(
+            hackathon=hackathon,
+            defaults={'data': data, 'is_stale': False, 'refreshed_at': now}
+        )
+        latest = HackathonAnalyticsSnapshot.objects.filter(
+            hackathon=hackathon
+        ).order_by('-taken_at').values_list('data', flat=True).first()
+        if latest != data:
+            HackathonAnalyticsSnapshot.objects.create(hackathon=hackathon, data=data, taken_at=now)
+    return snapshot
+
+
+def _debounce_cutoff():
+    return timezone.now() - timedelta(seconds=settings.HACKATHON_ANALYTICS_DEBOUNCE)
+
+
+def get_snapshot(hackathon):
+    """The stored analytics, rebuilt when stale and not rebuilt within the debounce"""
+    try:
+        snapshot = HackathonAnalytics.objects.get(hackathon=hackathon)
+    except HackathonAnalytics.DoesNotExist:
+        return build_snapshot(hackathon)
+
+    if snapshot.is_stale and snapshot.refreshed_at <= _debounce_cutoff():
+        return build_snapshot(hackathon)
+    return snapshot
+
+
+def mark_stale(hackathon_id=None, team_id=None):
+    """Flag the snapshot of a hackathon, or of the hackathon a team belongs to"""
+    snapshots = HackathonAnalytics.objects.filter(is_stale=False)
+    if hackathon_id is not None:
+        snapshots = snapshots.filter(hackathon_id=hackathon_id)
+    if team_id is not None:
+        snapshots = snapshots.filter(hackathon__teams=team_id)
+    snapshots.update(is_stale=True)
+
+
+def refresh_snapshots(limit=None):
+    """Rebuild stale snapshots outside their debounce; returns the number rebuilt"""
+    due = HackathonAnalytics.objects.filter(
+        is_stale=True,
+        refreshed_at__lte=_debounce_cutoff()
+    ).select_related('hackathon').order_by('refreshed_at')
+    if limit:
+        due = due[:limit]
+
+    refreshed = 0
+    for snapshot in due:
+        build_snapshot(snapshot.hackathon)
+        refreshed += 1
+    return refreshed
+
+
+def analytics_history(hackathon, since=None):
+    """Stored analytics points in chronological order, newest HISTORY_LIMIT at most"""
+    points = HackathonAnalyticsSnapshot.objects.filter(hackathon=hackathon)
+    if since is not None:
+        points = points.filter(taken_at__gte=since)
+    latest = points.order_by('-taken_at').values('taken_at', 'data')[:HISTORY_LIMIT]
+    return [{'taken_at': point['taken_at'], **point['data']} for point in reversed(latest)]
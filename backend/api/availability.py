@@ -0,0 +1,122 @@
+"""
+Weekly availability bitmasks for the HackMate API
+
+``UserProfile.availability`` is free-form JSON entered in the user's local
+time. It is normalized into a 168-bit mask (one bit per hour of the week,
+Monday 00:00 UTC = bit 0) so that shared working hours between users or
+across a whole team are a bitwise AND plus a popcount.
+
+Accepted availability formats::
+
+    {"monday": ["09:00-12:00", "14:00-18:00"], "sat": "10:00-16:00"}
+    {"days": ["mon", "tue", "wed"], "hours": {"start": "09:00", "end": "17:00"}}
+    {"days": ["mon", "tue", "wed"], "hours": "09:00-17:00"}
+
+Ranges ending before they start run past midnight into the next day.
+"""
+from datetime import datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+
+HOURS_PER_WEEK = 168
+MINUTES_PER_WEEK = HOURS_PER_WEEK * 60
+MASK_HEX_LENGTH = HOURS_PER_WEEK // 4
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+DAY_INDEX = {}
+for _index, _day in enumerate(DAYS):
+    DAY_INDEX[_day] = DAY_INDEX[_day[:3]] = _index
+
+
+def _parse_time(value):
+    """Minutes since midnight for 'HH:MM' or 'HH' strings"""
+    hours, _, minutes = str(value).strip().partition(':')
+    hours, minutes = int(hours), int(minutes or 0)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60):
+        raise ValueError(f'Invalid time: {value}')
+    return min(hours * 60 + minutes, 24 * 60)
+
+
+def _parse_range(value):
+    if isinstance(value, dict):
+        return _parse_time(value['start']), _parse_time(value['end'])
+    start, _, end = str(value).partition('-')
+    return _parse_time(start), _parse_time(end)
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _local_ranges(availability):
+    """Yield (day_index, start_minute, end_minute) in local time"""
+    if not isinstance(availability, dict):
+        return
+
+    if 'days' in availability:
+        hours = availability.get('hours') or '00:00-24:00'
+        for day in _as_list(availability['days']):
+            day_index = DAY_INDEX.get(str(day).strip().lower())
+            if day_index is None:
+                continue
+            for hour_range in _as_list(hours):
+                yield (day_index, *_parse_range(hour_range))
+        return
+
+    for day, ranges in availability.items():
+        day_index = DAY_INDEX.get(str(day).strip().lower())
+        if day_index is None or not ranges:
+            continue
+        for hour_range in _as_list(ranges):
+            yield (day_index, *_parse_range(hour_range))
+
+
+def _utc_offset_minutes(tz_name, now=None):
+    try:
+        tz = ZoneInfo(tz_name) if tz_name else dt_timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = dt_timezone.utc
+    offset = (now or datetime.now(dt_timezone.utc)).astimezone(tz).utcoffset()
+    return int(offset.total_seconds() // 60)
+
+
+def availability_mask(availability, tz_name=None, now=None):
+    """
+    UTC-aligned 168-bit weekly mask for an availability dict, or None when
+    the availability is empty or cannot be parsed. Any hour partly covered
+    by a range counts as available.
+    """
+    if not availability:
+        return None
+
+    offset = _utc_offset_minutes(tz_name, now)
+    mask = 0
+    try:
+        for day_index, start, end in _local_ranges(availability):
+            if end <= start:
+                end += 24 * 60
+            start = day_index * 24 * 60 + start - offset
+            end = day_index * 24 * 60 + end - offset
+            for hour in range(start // 60, -(-end // 60)):
+                mask |= 1 << (hour % HOURS_PER_WEEK)
+    except (KeyError, TypeError, ValueError):
+        return None
+    return mask
+
+
+def mask_to_hex(mask):
+    return '' if mask is None else format(mask, f'0{MASK_HEX_LENGTH}x')
+
+
+def hex_to_mask(value):
+    return int(value, 16) if value else 0
+
+
+def shared_hours(*masks):
+    """Hours per week during which everyone in ``masks`` is available"""
+    if not masks:
+        return 0
+    shared = masks[0]
+    for mask in masks[1:]:
+        shared &= mask
+    return shared.bit_count()
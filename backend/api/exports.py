@@ -0,0 +1,91 @@
+"""
+Streaming bulk exports of hackathon data
+
+Teams, memberships and tasks of a hackathon are read as flat value rows in
+chunks and encoded one line at a time, so an export holds a single chunk
+in memory however many rows it has, and the first bytes are sent before
+the last row is read.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Team, TeamMembership, Task
+
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows fetched per database round trip
+CHUNK_SIZE = 2000
+
+
+# table: (model, lookup from the row to its hackathon, exported columns)
+EXPORT_TABLES = {
+    'teams': (
+        Team,
+        'hackathon_id',
+        ('id', 'name', 'leader_id', 'leader__username', 'is_recruiting', 'max_members',
+         'required_skills', 'project_idea', 'github_repo', 'project_url', 'created_at'),
+    ),
+    'memberships': (
+        TeamMembership,
+        'team__hackathon_id',
+        ('id', 'team_id', 'team__name', 'user_id', 'user__username', 'role', 'status',
+         'joined_at'),
+    ),
+    'tasks': (
+        Task,
+        'team__hackathon_id',
+        ('id', 'team_id', 'title', 'status', 'priority', 'assigned_to_id',
+         'assigned_to__username', 'created_by_id', 'due_date', 'estimated_hours', 'tags',
+         'created_at', 'completed_at'),
+    ),
+}
+
+
+def export_rows(hackathon, table):
+    """``(columns, rows)`` for one table of a hackathon; rows are streamed lazily"""
+    model, hackathon_field, columns = EXPORT_TABLES[table]
+    rows = model.objects.filter(**{hackathon_field: hackathon.id}).order_by('id').values_list(
+        *columns
+    )
+    return columns, rows.iterator(chunk_size=CHUNK_SIZE)
+
+
+class _Echo:
+    """File-like object whose write() hands the encoded line straight back"""
+
+    def write(self, value):
+        return value
+
+
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(columns, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_csv_value(value) for value in row])
+
+
+def stream_ndjson(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def stream_export(hackathon, table, fmt='csv'):
+    """Encoded lines of a hackathon table export in ``fmt`` (csv or ndjson)"""
+    columns, rows = export_rows(hackathon, table)
+    if fmt == 'ndjson':
+        return stream_ndjson(columns, rows)
+    return stream_csv(columns, rows)
@@ -0,0 +1,112 @@
+"""
+Precomputed recommendation feeds for the HackMate API
+
+/api/recommendations/ reads a single RecommendationFeed row instead of
+computing and serializing suggestions per request. Feeds are flagged
+stale by signal handlers when relevant data changes and rebuilt by the
+refresh_recommendation_feeds worker, which also refreshes feeds older
+than RECOMMENDATION_FEED_MAX_AGE.
+
+Feeds keep the nested shape they were first served in (see FEED_EXPAND)
+rather than the IDs list endpoints return by default.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Q, prefetch_related_objects
+from django.utils import timezone
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import RecommendationFeed, Skill, ProfileSkill
+from .serializers import HackathonSerializer, TeamSerializer
+from .utils import get_user_recommendations
+
+
+# Relations stored nested in feed items
+FEED_EXPAND = {
+    'hackathons': 'created_by',
+    'teams': 'leader,hackathon.created_by,memberships.user',
+}
+
+
+def _serialize(serializer_class, objects, expand):
+    """Serializer output for ``objects`` with ``expand`` loaded in bulk"""
+    objects = list(objects)
+    _, prefetch = serializer_class.get_eager_loading(many=True, expand=expand)
+    prefetch_related_objects(objects, *prefetch)
+    return serializer_class(objects, many=True, expand=expand).data
+
+
+def _to_json(data):
+    """Round-trip serializer output through JSON so it fits a JSONField"""
+    return json.loads(json.dumps(data, cls=JSONEncoder))
+
+
+def build_feed(user):
+    """Compute and store the user's recommendations"""
+    recommendations = get_user_recommendations(user)
+
+    hackathons = _serialize(
+        HackathonSerializer, recommendations.get('hackathons', []), FEED_EXPAND['hackathons']
+    )
+    teams = _serialize(TeamSerializer, recommendations.get('teams', []), FEED_EXPAND['teams'])
+    for team_data, team in zip(teams, recommendations.get('teams', [])):
+        team_data['fit_score'] = team.fit_score
+
+    feed, _ = RecommendationFeed.objects.update_or_create(
+        user=user,
+        defaults={
+            'hackathons': _to_json(hackathons),
+            'teams': _to_json(teams),
+            'is_stale': False,
+            'refreshed_at': timezone.now(),
+        }
+    )
+    return feed
+
+
+def get_feed(user):
+    """The user's feed, built synchronously the first time it is requested"""
+    try:
+        return RecommendationFeed.objects.get(user=user)
+    except RecommendationFeed.DoesNotExist:
+        return build_feed(user)
+
+
+def mark_stale(user):
+    """Flag the user's feed for rebuilding"""
+    RecommendationFeed.objects.filter(user=user, is_stale=False).update(is_stale=True)
+
+
+def mark_stale_for_skills(skills, users=()):
+    """
+    Flag the feeds that may list a hackathon or team requiring ``skills``:
+    recommendations only include those sharing a skill with the user.
+    Feeds of ``users`` are flagged as well.
+    """
+    skill_ids = Skill.resolve_ids(skills)
+    affected = Q(user_id__in=ProfileSkill.objects.filter(
+        skill_id__in=skill_ids
+    ).values('profile__user_id')) if skill_ids else Q()
+    users = [user for user in users if user is not None]
+    if users:
+        affected |= Q(user__in=users)
+    if affected:
+        RecommendationFeed.objects.filter(affected, is_stale=False).update(is_stale=True)
+
+
+def refresh_feeds(limit=None):
+    """Rebuild stale or expired feeds; returns the number rebuilt"""
+    expired_before = timezone.now() - timedelta(seconds=settings.RECOMMENDATION_FEED_MAX_AGE)
+    due = RecommendationFeed.objects.filter(
+        Q(is_stale=True) | Q(refreshed_at__lt=expired_before)
+    ).select_related('user').order_by('refreshed_at')
+    if limit:
+        due = due[:limit]
+
+    refreshed = 0
+    for feed in due:
+        build_feed(feed.user)
+        refreshed += 1
+    return refreshed
@@ -0,0 +1,124 @@
+"""
+Location normalization for the HackMate API
+
+``UserProfile.location`` is free text ("City, Country", "City, State",
+"City, State, Country"). It is parsed into normalized country and city
+codes stored in indexed columns, so location preferences in matching are
+plain equality filters.
+"""
+import re
+
+
+US_STATES = {
+    'al', 'ak', 'az', 'ar', 'ca', 'co', 'ct', 'de', 'fl', 'ga', 'hi', 'id', 'il', 'in',
+    'ia', 'ks', 'ky', 'la', 'me', 'md', 'ma', 'mi', 'mn', 'ms', 'mo', 'mt', 'ne', 'nv',
+    'nh', 'nj', 'nm', 'ny', 'nc', 'nd', 'oh', 'ok', 'or', 'pa', 'ri', 'sc', 'sd', 'tn',
+    'tx', 'ut', 'vt', 'va', 'wa', 'wv', 'wi', 'wy', 'dc',
+}
+
+# Georgia is left out: as a state and a country it stays the plain name 'georgia'
+US_STATE_NAMES = {
+    'alabama', 'alaska', 'arizona', 'arkansas', 'california', 'colorado', 'connecticut',
+    'delaware', 'florida', 'hawaii', 'idaho', 'illinois', 'indiana', 'iowa',
+    'kansas', 'kentucky', 'louisiana', 'maine', 'maryland', 'massachusetts', 'michigan',
+    'minnesota', 'mississippi', 'missouri', 'montana', 'nebraska', 'nevada', 'new hampshire',
+    'new jersey', 'new mexico', 'new york', 'north carolina', 'north dakota', 'ohio',
+    'oklahoma', 'oregon', 'pennsylvania', 'rhode island', 'south carolina', 'south dakota',
+    'tennessee', 'texas', 'utah', 'vermont', 'virginia', 'washington', 'west virginia',
+    'wisconsin', 'wyoming', 'district of columbia',
+}
+
+# ISO 3166-1 alpha-2; a 2-letter code found here is always read as the country
+# code, even when it is also a US state code ("Fresno, CA" and "Toronto, CA" both
+# give 'ca'), so every user writing the same code is placed the same way
+ISO_COUNTRY_CODES = set("""
+    ad ae af ag ai al am ao aq ar as at au aw ax az ba bb bd be bf bg bh bi bj bl bm bn bo
+    bq br bs bt bv bw by bz ca cc cd cf cg ch ci ck cl cm cn co cr cu cv cw cx cy cz de dj
+    dk dm do dz ec ee eg eh er es et fi fj fk fm fo fr ga gb gd ge gf gg gh gi gl gm gn gp
+    gq gr gs gt gu gw gy hk hm hn hr ht hu id ie il im in io iq ir is it je jm jo jp ke kg
+    kh ki km kn kp kr kw ky kz la lb lc li lk lr ls lt lu lv ly ma mc md me mf mg mh mk ml
+    mm mn mo mp mq mr ms mt mu mv mw mx my mz na nc ne nf ng ni nl no np nr nu nz om pa pe
+    pf pg ph pk pl pm pn pr ps pt pw py qa re ro rs ru rw sa sb sc sd se sg sh si sj sk sl
+    sm sn so sr ss st sv sx sy sz tc td tf tg th tj tk tl tm tn to tr tt tv tw tz ua ug um
+    us uy uz va vc ve vg vi vn vu wf ws ye yt za zm zw
+""".split())
+
+
+
+# Common spellings mapped to ISO 3166-1 alpha-2 codes
+COUNTRY_ALIASES = {
+    'us': 'us', 'usa': 'us', 'u s': 'us', 'u s a': 'us', 'united states': 'us',
+    'united states of america': 'us', 'america': 'us',
+    'uk': 'gb', 'u k': 'gb', 'gb': 'gb', 'united kingdom': 'gb', 'great britain': 'gb',
+    'england': 'gb', 'scotland': 'gb', 'wales': 'gb', 'northern ireland': 'gb',
+    'india': 'in', 'canada': 'ca', 'australia': 'au', 'germany': 'de', 'deutschland': 'de',
+    'france': 'fr', 'spain': 'es', 'espana': 'es', 'italy': 'it', 'netherlands': 'nl',
+    'the netherlands': 'nl', 'holland': 'nl', 'belgium': 'be', 'switzerland': 'ch',
+    'austria': 'at', 'sweden': 'se', 'norway': 'no', 'denmark': 'dk', 'finland': 'fi',
+    'ireland': 'ie', 'portugal': 'pt', 'poland': 'pl', 'czech republic': 'cz',
+    'czechia': 'cz', 'greece': 'gr', 'turkey': 'tr', 'turkiye': 'tr', 'russia': 'ru',
+    'ukraine': 'ua', 'israel': 'il', 'uae': 'ae', 'united arab emirates': 'ae',
+    'saudi arabia': 'sa', 'egypt': 'eg', 'nigeria': 'ng', 'kenya': 'ke',
+    'south africa': 'za', 'china': 'cn', 'japan': 'jp', 'south korea': 'kr',
+    'korea': 'kr', 'singapore': 'sg', 'malaysia': 'my', 'indonesia': 'id',
+    'philippines': 'ph', 'vietnam': 'vn', 'thailand': 'th', 'pakistan': 'pk',
+    'bangladesh': 'bd', 'sri lanka': 'lk', 'nepal': 'np', 'new zealand': 'nz',
+    'brazil': 'br', 'brasil': 'br', 'mexico': 'mx', 'argentina': 'ar', 'chile': 'cl',
+    'colombia': 'co', 'peru': 'pe',
+}
+
+
+def normalize_place(value):
+    """Lowercase, strip punctuation and collapse whitespace"""
+    return ' '.join(re.sub(r'[^\w\s-]', ' ', value.lower()).split())
+
+
+def country_code(value):
+    """
+    ISO code for known countries and 2-letter country codes, 'us' for other
+    US states ("Austin, TX", "San Francisco, California"), else the
+    normalized name. State codes that are also country codes ("CA", "IL")
+    stay that country code.
+    """
+    place = normalize_place(value)
+    if place in COUNTRY_ALIASES:
+        return COUNTRY_ALIASES[place]
+    if place in ISO_COUNTRY_CODES:
+        return place
+    if place in US_STATES or place in US_STATE_NAMES:
+        return 'us'
+    return place
+
+
+def parse_location(location):
+    """Return ``(country, city)`` codes for a free-text location"""
+    parts = [part for part in (p.strip() for p in (location or '').split(',')) if part]
+    if not parts:
+        return '', ''
+
+    if len(parts) == 1:
+        place = normalize_place(parts[0])
+        if place in COUNTRY_ALIASES:
+            return COUNTRY_ALIASES[place], ''
+        return '', place
+
+    return country_code(parts[-1])[:60], normalize_place(parts[0])[:100]
+
+
+def backfill_location_codes(model, batch_size=1000):
+    """
+    Recompute location codes for every profile of ``model`` in chunks.
+    Works with both the live and a migration's historical UserProfile.
+    """
+    updated = 0
+    batch = []
+    profiles = model.objects.exclude(location='').only('id', 'location')
+    for profile in profiles.iterator(chunk_size=batch_size):
+        profile.location_country, profile.location_city = parse_location(profile.location)
+        batch.append(profile)
+        if len(batch) >= batch_size:
+            model.objects.bulk_update(batch, ['location_country', 'location_city'])
+            updated += len(batch)
+            batch = []
+    model.objects.bulk_update(batch, ['location_country', 'location_city'])
+    return updated + len(batch)
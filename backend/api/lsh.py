@@ -0,0 +1,178 @@
+"""
+MinHash / locality-sensitive hashing index over UserProfile.skills
+
+Each profile's skill set is reduced to a MinHash signature of
+``bands * rows`` values. The signature is split into bands and every band
+is hashed into a SkillBucket row. Profiles sharing at least one bucket
+with the user form the shortlist that find_teammates rescores exactly,
+so candidate generation is a handful of indexed lookups instead of a
+scan over every profile.
+"""
+import hashlib
+import heapq
+import random
+import struct
+from functools import lru_cache
+
+from django.conf import settings
+from django.db.models import Q
+
+from .models import UserProfile, SkillBucket, normalize_skill_name
+from .matching import rank_candidates
+
+
+# Mersenne prime used by the universal hash family
+_PRIME = (1 << 61) - 1
+_SEED = 1337
+
+
+@lru_cache(maxsize=None)
+def _hash_params(count):
+    rng = random.Random(_SEED)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(count)]
+
+
+def _stable_hash(value):
+    """64-bit hash that is identical across processes (unlike hash())"""
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+    return struct.unpack('>Q', digest)[0]
+
+
+def _signed(value):
+    """Fit an unsigned 64-bit value into a BigIntegerField"""
+    return struct.unpack('>q', struct.pack('>Q', value))[0]
+
+
+def minhash_signature(skills, num_perm=None):
+    """MinHash signature of a skill list, or None when it has no skills"""
+    num_perm = num_perm or settings.MATCHING_LSH_BANDS * settings.MATCHING_LSH_ROWS
+    values = {
+        _stable_hash(normalize_skill_name(skill))
+        for skill in skills or ()
+        if isinstance(skill, str) and skill.strip()
+    }
+    if not values:
+        return None
+    return [
+        min((a * value + b) % _PRIME for value in values)
+        for a, b in _hash_params(num_perm)
+    ]
+
+
+def band_buckets(skills):
+    """``(band, bucket)`` keys of a skill list for the configured banding"""
+    bands, rows = settings.MATCHING_LSH_BANDS, settings.MATCHING_LSH_ROWS
+    signature = minhash_signature(skills, bands * rows)
+    if signature is None:
+        return []
+
+    buckets = []
+    for band in range(bands):
+        chunk = signature[band * rows:(band + 1) * rows]
+        key = hashlib.blake2b(
+            struct.pack(f'>{rows}Q', *chunk), digest_size=8, salt=struct.pack('>H', band)
+        ).digest()
+        buckets.append((band, _signed(struct.unpack('>Q', key)[0])))
+    return buckets
+
+
+def index_profile(profile):
+    """Replace the profile's buckets with ones for its current skills"""
+    SkillBucket.objects.filter(profile=profile).delete()
+    SkillBucket.objects.bulk_create([
+        SkillBucket(profile=profile, band=band, bucket=bucket)
+        for band, bucket in band_buckets(profile.skills)
+    ])
+
+
+def rebuild_index(batch_size=1000):
+    """Recreate every bucket from scratch; returns the number of profiles indexed"""
+    SkillBucket.objects.all().delete()
+    indexed = 0
+    buckets = []
+    profiles = UserProfile.objects.exclude(skills=[]).values_list('id', 'skills')
+    for profile_id, skills in profiles.iterator(chunk_size=batch_size):
+        keys = band_buckets(skills)
+        if keys:
+            indexed += 1
+        buckets.extend(
+            SkillBucket(profile_id=profile_id, band=band, bucket=bucket) for band, bucket in keys
+        )
+        if len(buckets) >= batch_size:
+            SkillBucket.objects.bulk_create(buckets)
+            buckets = []
+    SkillBucket.objects.bulk_create(buckets)
+    return indexed
+
+
+def shortlist(user_profile, candidates):
+    """
+    Restrict a UserProfile queryset to profiles sharing an LSH bucket with
+    the user. Returns None when the user has no skills to hash.
+    """
+    keys = band_buckets(user_profile.skills)
+    if not keys:
+        return None
+
+    bucket_filter = Q()
+    for band, bucket in keys:
+        bucket_filter |= Q(band=band, bucket=bucket)
+    return candidates.filter(
+        id__in=SkillBucket.objects.filter(bucket_filter).values('profile_id')
+    )
+
+
+def rank_candidates_lsh(user_profile, candidates, limit=20):
+    """
+    rank_candidates over the LSH shortlist, falling back to exact scoring.
+
+    Skills are only part of the score, so when the shortlist yields fewer
+    than ``limit`` results it is merged with the exact ranking of up to
+    MATCHING_LSH_TOP_UP_SCAN of the most recently updated candidates
+    outside it, and the two are re-sorted by score.
+    """
+    shortlisted = shortlist(user_profile, candidates)
+    if shortlisted is None:
+        return rank_candidates(user_profile, candidates, limit=limit)
+
+    ranked = rank_candidates(user_profile, shortlisted, limit=limit)
+    if len(ranked) < limit:
+        outside = list(
+            candidates.exclude(id__in=[profile.id for profile, _ in ranked])
+            .order_by('-updated_at')
+            .values_list('id', flat=True)[:settings.MATCHING_LSH_TOP_UP_SCAN]
+        )
+        topped_up = rank_candidates(user_profile, candidates.filter(id__in=outside), limit=limit)
+        ranked = heapq.nlargest(limit, ranked + topped_up, key=lambda item: item[1])
+    return ranked
+
+
+def measure_recall(sample_size=100, k=20):
+    """
+    Average recall@k of LSH ranking against exact ranking.
+
+    For each sampled profile a shortlist result counts as a hit when its
+    score reaches the exact k-th best score, so ties in the exact ranking
+    do not count as misses.
+    """
+    sample = list(
+        UserProfile.objects.filter(is_available=True).exclude(skills=[]).order_by('?')[:sample_size]
+    )
+    recalls = []
+    for profile in sample:
+        candidates = UserProfile.objects.filter(is_available=True).exclude(id=profile.id)
+        exact = rank_candidates(profile, candidates, limit=k)
+        if not exact:
+            continue
+        threshold = exact[-1][1]
+        approximate = rank_candidates_lsh(profile, candidates, limit=k)
+        hits = sum(1 for _, score in approximate if score >= threshold)
+        recalls.append(hits / len(exact))
+
+    return {
+        'profiles_sampled': len(recalls),
+        'k': k,
+        'bands': settings.MATCHING_LSH_BANDS,
+        'rows': settings.MATCHING_LSH_ROWS,
+        'recall': round(sum(recalls) / len(recalls), 4) if recalls else None,
+    }
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+
+class LoopCommand(BaseCommand):
+    """Command that runs one pass, or keeps running passes as a background worker."""
+
+    default_interval = 30
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running as a background worker'
+        )
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=self.default_interval,
+            help='Seconds to sleep between passes when looping'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            # Drop connections the database closed or that outlived CONN_MAX_AGE
+            # while we slept, as Django does around every request
+            close_old_connections()
+            self.handle_pass(**options)
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+    def handle_pass(self, **options):
+        raise NotImplementedError('subclasses of LoopCommand must provide a handle_pass() method')
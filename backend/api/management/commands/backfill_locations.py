@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from api.models import UserProfile
+from api.locations import backfill_location_codes
+
+
+class Command(BaseCommand):
+    help = 'Recompute normalized country/city codes for all user profiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        self.stdout.write('Backfilling profile locations...')
+        updated = backfill_location_codes(UserProfile, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Updated {updated} profiles'))
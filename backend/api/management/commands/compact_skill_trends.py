@@ -0,0 +1,14 @@
+from api.management.base import LoopCommand
+from api.models import SkillTrendBucket
+from api.trending import compact_buckets
+
+
+class Command(LoopCommand):
+    help = 'Roll hourly skill trend buckets into daily buckets and drop expired ones'
+    default_interval = 60 * 60
+
+    def handle_pass(self, **options):
+        before = SkillTrendBucket.objects.count()
+        compact_buckets()
+        after = SkillTrendBucket.objects.count()
+        self.stdout.write(self.style.SUCCESS(f'Compacted {before} trend buckets into {after}'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Hackathon
+from api.exports import EXPORT_FORMATS, EXPORT_TABLES, stream_export
+
+
+class Command(BaseCommand):
+    help = "Export a hackathon's teams, memberships or tasks as CSV or NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('hackathon_id', type=int)
+        parser.add_argument('table', choices=list(EXPORT_TABLES))
+        parser.add_argument(
+            '--fmt',
+            choices=list(EXPORT_FORMATS),
+            default='csv',
+            help='Output format'
+        )
+        parser.add_argument(
+            '--output',
+            help='File to write to (defaults to stdout)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            hackathon = Hackathon.objects.get(id=options['hackathon_id'])
+        except Hackathon.DoesNotExist:
+            raise CommandError(f'Hackathon {options["hackathon_id"]} does not exist')
+
+        lines = stream_export(hackathon, options['table'], options['fmt'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+
+        rows = 0
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            for line in lines:
+                output.write(line)
+                rows += 1
+        if options['fmt'] == 'csv':
+            rows -= 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {rows} {options['table']} to {options['output']}")
+        )
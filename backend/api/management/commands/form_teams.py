@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from api.models import Hackathon, TeamFormationJob
+from api.team_formation import run_team_formation_job
+
+
+class Command(BaseCommand):
+    help = 'Propose teams for every unteamed participant of a hackathon'
+
+    def add_arguments(self, parser):
+        parser.add_argument('hackathon_id', type=int)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Worker processes to use (defaults to TEAM_FORMATION_WORKERS or CPU count)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Print the proposed teams as JSON'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            hackathon = Hackathon.objects.get(id=options['hackathon_id'])
+        except Hackathon.DoesNotExist:
+            raise CommandError(f'Hackathon {options["hackathon_id"]} does not exist')
+
+        self.stdout.write(f'Forming teams for {hackathon.title}...')
+        job = TeamFormationJob.objects.create(hackathon=hackathon)
+        job = run_team_formation_job(job.id, workers=options['workers'])
+
+        if job.status != 'completed':
+            raise CommandError(f'Team formation job {job.id} failed: {job.error}')
+
+        teams = job.result['teams']
+        if options['json']:
+            self.stdout.write(json.dumps(teams, indent=2))
+
+        elapsed = (job.completed_at - job.started_at).total_seconds()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Job {job.id}: placed {job.participant_count} participants '
+                f'into {len(teams)} teams in {elapsed:.2f}s'
+            )
+        )
@@ -2,7 +2,7 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
 from django.utils import timezone
 from datetime import timedelta
-from api.models import Skill, Hackathon, UserProfile
+from api.models import Skill, Hackathon, UserProfile, normalize_skill_name
 
 
 class Command(BaseCommand):
@@ -61,11 +61,15 @@ class Command(BaseCommand):
         
         for skill_name, category in skills_data:
             skill, created = Skill.objects.get_or_create(
-                name=skill_name,
-                defaults={'category': category}
+                normalized_name=normalize_skill_name(skill_name),
+                defaults={'name': skill_name, 'category': category}
             )
             if created:
                 self.stdout.write(f'Created skill: {skill_name}')
+            elif not skill.is_public:
+                # First added privately from a profile; publish it under its catalogue name
+                skill.name, skill.category, skill.is_public = skill_name, category, True
+                skill.save()
         
         # Create sample hackathons
         hackathons_data = [
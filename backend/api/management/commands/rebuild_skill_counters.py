@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from api.trending import rebuild_counters, counter_mismatches, recount_skills
+
+
+class Command(BaseCommand):
+    help = 'Rebuild skill popularity counters from scratch and verify them against a full recount'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify-only',
+            action='store_true',
+            help='Only compare the stored counters with a full recount'
+        )
+
+    def handle(self, *args, **options):
+        if options['verify_only']:
+            expected = recount_skills()
+        else:
+            self.stdout.write('Rebuilding skill counters...')
+            expected = rebuild_counters()
+            self.stdout.write(f'Stored counters for {len(expected)} skills')
+
+        mismatches = counter_mismatches(expected)
+        for skill, counts in sorted(mismatches.items()):
+            self.stdout.write(
+                f"{skill}: stored {counts['stored']}, expected {counts['expected']}"
+            )
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} skill counters differ from a full recount')
+
+        self.stdout.write(self.style.SUCCESS('Skill counters match a full recount'))
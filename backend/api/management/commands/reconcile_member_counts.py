@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from api.utils import member_count_mismatches, reconcile_member_counts
+
+
+class Command(BaseCommand):
+    help = 'Repair Team.member_count columns that drifted from the accepted memberships'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report teams whose member_count is wrong'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            mismatches = member_count_mismatches()
+        else:
+            mismatches = reconcile_member_counts()
+
+        for team_id, (stored, actual) in sorted(mismatches.items()):
+            self.stdout.write(f'Team {team_id}: stored {stored}, actual {actual}')
+
+        verb = 'Found' if options['dry_run'] else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(mismatches)} drifted member counts'))
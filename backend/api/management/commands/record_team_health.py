@@ -0,0 +1,24 @@
+from api.management.base import LoopCommand
+from api.models import Team
+from api.team_health import record_team_health
+
+
+class Command(LoopCommand):
+    help = 'Append team health history points for teams whose score changed'
+    default_interval = 15 * 60
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hackathon',
+            type=int,
+            help='Only record teams of this hackathon'
+        )
+        super().add_arguments(parser)
+
+    def handle_pass(self, **options):
+        teams = Team.objects.all()
+        if options['hackathon']:
+            teams = teams.filter(hackathon_id=options['hackathon'])
+
+        recorded = record_team_health(teams)
+        self.stdout.write(f'Recorded {recorded} team health points')
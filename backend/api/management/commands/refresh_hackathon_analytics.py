@@ -0,0 +1,10 @@
+from api.analytics import refresh_snapshots
+from api.management.base import LoopCommand
+
+
+class Command(LoopCommand):
+    help = 'Rebuild stale hackathon analytics snapshots'
+
+    def handle_pass(self, **options):
+        refreshed = refresh_snapshots()
+        self.stdout.write(f'Refreshed {refreshed} hackathon analytics snapshots')
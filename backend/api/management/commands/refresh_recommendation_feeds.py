@@ -0,0 +1,19 @@
+from api.feeds import refresh_feeds
+from api.management.base import LoopCommand
+
+
+class Command(LoopCommand):
+    help = 'Rebuild stale or expired recommendation feeds'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=500,
+            help='Maximum feeds to rebuild per pass'
+        )
+
+    def handle_pass(self, **options):
+        refreshed = refresh_feeds(limit=options['limit'])
+        self.stdout.write(f'Refreshed {refreshed} recommendation feeds')
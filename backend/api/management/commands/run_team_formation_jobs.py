@@ -0,0 +1,20 @@
+from api.management.base import LoopCommand
+from api.team_formation import run_pending_jobs
+
+
+class Command(LoopCommand):
+    help = 'Run team formation jobs queued through the API'
+    default_interval = 5
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=None,
+            help='Worker processes per job (defaults to TEAM_FORMATION_WORKERS or CPU count)'
+        )
+
+    def handle_pass(self, **options):
+        ran = run_pending_jobs(workers=options['workers'])
+        self.stdout.write(f'Ran {ran} team formation jobs')
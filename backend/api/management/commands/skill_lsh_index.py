@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from api.lsh import rebuild_index, measure_recall
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the MinHash/LSH skill index and report its recall against exact scoring'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Recreate all buckets (required after changing MATCHING_LSH_BANDS/ROWS)'
+        )
+        parser.add_argument(
+            '--recall',
+            action='store_true',
+            help='Measure recall@k of LSH ranking against exact ranking'
+        )
+        parser.add_argument('--sample', type=int, default=100, help='Profiles to sample')
+        parser.add_argument('-k', type=int, default=20, help='Result size to compare')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write('Rebuilding skill LSH index...')
+            indexed = rebuild_index()
+            self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} profiles'))
+
+        if options['recall']:
+            report = measure_recall(sample_size=options['sample'], k=options['k'])
+            self.stdout.write(
+                f"recall@{report['k']} = {report['recall']} over "
+                f"{report['profiles_sampled']} profiles "
+                f"(bands={report['bands']}, rows={report['rows']})"
+            )
+
+        if not options['rebuild'] and not options['recall']:
+            self.stdout.write('Nothing to do; pass --rebuild and/or --recall')
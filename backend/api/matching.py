@@ -0,0 +1,222 @@
+"""
+Teammate matching engine for the HackMate API
+
+Profiles are encoded into fixed-width integer bitsets (skills, roles,
+weekly availability) and
+small integer codes (experience level, timezone) so that every available
+candidate can be scored in a single pass over the database, instead of
+materialising model instances and Python sets for each pair.
+"""
+import heapq
+import uuid
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import UserProfile, normalize_skill_name
+from .availability import hex_to_mask
+
+
+EXPERIENCE_LEVELS = ['beginner', 'intermediate', 'advanced', 'expert']
+
+# Columns read for each candidate during a scoring pass
+PROFILE_VECTOR_FIELDS = (
+    'id', 'skills', 'experience_level', 'preferred_roles', 'timezone', 'availability_mask'
+)
+
+ProfileVector = namedtuple(
+    'ProfileVector',
+    ['skill_mask', 'skill_count', 'experience', 'role_mask', 'timezone',
+     'availability', 'available_hours']
+)
+
+
+class FeatureEncoder:
+    """Assigns bit positions to skills/roles and codes to timezones"""
+
+    def __init__(self):
+        self._skill_bits = {}
+        self._role_bits = {}
+        self._timezones = {'': 0}
+
+    @staticmethod
+    def _mask(values, bits):
+        mask = 0
+        for value in values or ():
+            bit = bits.get(value)
+            if bit is None:
+                bit = bits[value] = len(bits)
+            mask |= 1 << bit
+        return mask
+
+    def encode(self, skills, experience_level, preferred_roles, timezone, availability_mask=''):
+        timezone = timezone or ''
+        tz_code = self._timezones.get(timezone)
+        if tz_code is None:
+            tz_code = self._timezones[timezone] = len(self._timezones)
+
+        availability = hex_to_mask(availability_mask)
+        return ProfileVector(
+            skill_mask=self._mask(skills, self._skill_bits),
+            skill_count=len(skills or ()),
+            experience=EXPERIENCE_LEVELS.index(experience_level),
+            role_mask=self._mask(preferred_roles, self._role_bits),
+            timezone=tz_code,
+            availability=availability,
+            available_hours=availability.bit_count(),
+        )
+
+    def encode_profile(self, profile):
+        return self.encode(
+            profile.skills,
+            profile.experience_level,
+            profile.preferred_roles,
+            profile.timezone,
+            profile.availability_mask,
+        )
+
+
+def score_vectors(user_vector, teammate_vector):
+    """Compatibility score between two encoded profiles (0-100)"""
+    score = 0
+
+    # Skill matching (40% weight)
+    if user_vector.skill_count and teammate_vector.skill_mask:
+        common_skills = (user_vector.skill_mask & teammate_vector.skill_mask).bit_count()
+        score += common_skills / user_vector.skill_count * 40
+
+    # Experience level compatibility (20% weight)
+    exp_diff = abs(user_vector.experience - teammate_vector.experience)
+    score += max(0, (3 - exp_diff) / 3) * 20
+
+    # Role compatibility (20% weight) - complementary roles score higher
+    if user_vector.role_mask and teammate_vector.role_mask:
+        score += 10 if user_vector.role_mask & teammate_vector.role_mask else 20
+
+    # Working-hours compatibility (20% weight): share of the smaller weekly
+    # schedule both users are available for, or a timezone match when either
+    # user has not filled in their availability
+    if user_vector.available_hours and teammate_vector.available_hours:
+        shared = (user_vector.availability & teammate_vector.availability).bit_count()
+        score += shared / min(user_vector.available_hours, teammate_vector.available_hours) * 20
+    elif user_vector.timezone and teammate_vector.timezone:
+        score += 20 if user_vector.timezone == teammate_vector.timezone else 10
+
+    return min(score, 100)
+
+
+def calculate_compatibility_score(user_profile, teammate_profile):
+    """Calculate compatibility score between two users"""
+    encoder = FeatureEncoder()
+    return score_vectors(
+        encoder.encode_profile(user_profile),
+        encoder.encode_profile(teammate_profile),
+    )
+
+
+def rank_candidates(user_profile, candidates, limit=20, chunk_size=2000):
+    """
+    Score every profile in ``candidates`` against ``user_profile`` and
+    return the exact top ``limit`` as ``(profile, score)`` pairs.
+
+    Candidates are streamed as value rows, so only the winning profiles are
+    ever loaded as model instances.
+    """
+    encoder = FeatureEncoder()
+    user_vector = encoder.encode_profile(user_profile)
+
+    rows = candidates.order_by('id').values_list(*PROFILE_VECTOR_FIELDS)
+    scored = (
+        (score_vectors(user_vector, encoder.encode(*row[1:])), row[0])
+        for row in rows.iterator(chunk_size=chunk_size)
+    )
+    top = heapq.nlargest(limit, scored, key=lambda item: item[0])
+
+    profiles = UserProfile.objects.select_related('user').in_bulk(
+        [profile_id for _, profile_id in top]
+    )
+    return [(profiles[profile_id], score) for score, profile_id in top]
+
+
+def match_cache_key(profile_id):
+    return f'matching:teammates:{profile_id}'
+
+
+def generation_key(scope):
+    """
+    Cache key of a generation token. Scopes are ``profile:<id>`` (one
+    candidate), ``skill:<normalized name>`` (available profiles with the
+    skill) and ``any`` (any available profile).
+    """
+    return f'matching:generation:{scope}'
+
+
+def skill_scopes(skills):
+    return list({f'skill:{normalize_skill_name(skill)}' for skill in skills if isinstance(skill, str)})
+
+
+def match_version(user_profile, preferences):
+    """Version of the user's own matching inputs: their profile and preferences"""
+    preferences_version = preferences.updated_at.timestamp() if preferences else 0
+    return user_profile.updated_at.timestamp(), preferences_version
+
+
+def match_scopes(user_profile, preferences, results, limit):
+    """Generation scopes whose bump can change the user's results"""
+    skills = list(user_profile.skills or ())
+    if preferences:
+        skills += preferences.preferred_skills or ()
+    scopes = {f'profile:{result["id"]}' for result in results}
+    scopes.update(skill_scopes(skills))
+    # Without a skill to share, or with free slots, any available profile can enter
+    if not skills or len(results) < limit:
+        scopes.add('any')
+    return scopes
+
+
+def get_cached_matches(user_profile, preferences, compute, limit=20):
+    """
+    Return cached match results for the user, computing them on a miss.
+
+    An entry is ignored once the user's profile or preferences are saved,
+    or once a generation it was computed under is bumped: a listed
+    candidate changed, or an available profile sharing one of the user's
+    (preferred) skills changed, appeared or left.
+    """
+    key = match_cache_key(user_profile.pk)
+    version = match_version(user_profile, preferences)
+    cached = cache.get(key)
+    if cached is not None and cached[0] == version:
+        if _generations(cached[1]) == cached[1]:
+            return cached[2]
+
+    # Read the skill tokens before computing, so a bump during the pass is not missed
+    before = _generations(match_scopes(user_profile, preferences, [], limit))
+    results = compute()
+    scopes = match_scopes(user_profile, preferences, results, limit)
+    tokens = {**before, **_generations(scope for scope in scopes if scope not in before)}
+    generations = {scope: tokens[scope] for scope in scopes}
+    cache.set(key, (version, generations, results), settings.MATCHING_CACHE_TIMEOUT)
+    return results
+
+
+def _generations(scopes):
+    """``{scope: token}`` of the current generation tokens (None if never bumped)"""
+    scopes = list(scopes)
+    tokens = cache.get_many([generation_key(scope) for scope in scopes])
+    return {scope: tokens.get(generation_key(scope)) for scope in scopes}
+
+
+def bump_match_generations(profile_id, skills=(), available=False):
+    """
+    Invalidate cached results that list ``profile_id`` and, when the profile
+    is (or was) available, results it could now enter through ``skills``
+    """
+    scopes = [f'profile:{profile_id}']
+    if available:
+        scopes.append('any')
+        scopes += skill_scopes(skills)
+    # A fresh token per bump: plain sets, so concurrent bumps never lose one
+    token = uuid.uuid4().hex
+    cache.set_many({generation_key(scope): token for scope in scopes}, None)
@@ -0,0 +1,68 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+BATCH_SIZE = 1000
+
+
+def normalize(name):
+    return ' '.join(str(name).split()).lower()
+
+
+def backfill_profile_skills(apps, schema_editor):
+    Skill = apps.get_model('api', 'Skill')
+    UserProfile = apps.get_model('api', 'UserProfile')
+    ProfileSkill = apps.get_model('api', 'ProfileSkill')
+
+    skill_ids = {}
+    for skill in Skill.objects.all():
+        skill.normalized_name = normalize(skill.name)
+        skill.save(update_fields=['normalized_name'])
+        skill_ids.setdefault(skill.normalized_name, skill.id)
+
+    links = []
+    profiles = UserProfile.objects.exclude(skills=[]).values_list('id', 'skills')
+    for profile_id, skills in profiles.iterator(chunk_size=BATCH_SIZE):
+        for name in set(
+            ' '.join(s.split())[:100] for s in skills or () if isinstance(s, str) and s.strip()
+        ):
+            key = normalize(name)
+            if key not in skill_ids:
+                skill_ids[key] = Skill.objects.create(
+                    name=name, normalized_name=key, category='other'
+                ).id
+            links.append(ProfileSkill(profile_id=profile_id, skill_id=skill_ids[key]))
+        if len(links) >= BATCH_SIZE:
+            ProfileSkill.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    ProfileSkill.objects.bulk_create(links, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='normalized_name',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.CreateModel(
+            name='ProfileSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_links', to='api.userprofile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='profile_links', to='api.skill')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['skill', 'profile'], name='api_profileskill_skill_idx')],
+                'unique_together': {('profile', 'skill')},
+            },
+        ),
+        migrations.RunPython(backfill_profile_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_team_formation_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('band', models.PositiveSmallIntegerField()),
+                ('bucket', models.BigIntegerField()),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='skill_buckets', to='api.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['band', 'bucket'], name='api_skillbucket_lookup_idx')],
+                'unique_together': {('profile', 'band')},
+            },
+        ),
+    ]
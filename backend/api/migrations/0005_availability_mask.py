@@ -0,0 +1,131 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:50
+
+from datetime import datetime, timezone as dt_timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.db import migrations, models
+
+
+# Frozen copy of api.availability at the time of this migration
+
+HOURS_PER_WEEK = 168
+MASK_HEX_LENGTH = HOURS_PER_WEEK // 4
+
+DAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+DAY_INDEX = {}
+for _index, _day in enumerate(DAYS):
+    DAY_INDEX[_day] = DAY_INDEX[_day[:3]] = _index
+
+
+def _parse_time(value):
+    """Minutes since midnight for 'HH:MM' or 'HH' strings"""
+    hours, _, minutes = str(value).strip().partition(':')
+    hours, minutes = int(hours), int(minutes or 0)
+    if not (0 <= hours <= 24 and 0 <= minutes < 60):
+        raise ValueError(f'Invalid time: {value}')
+    return min(hours * 60 + minutes, 24 * 60)
+
+
+def _parse_range(value):
+    if isinstance(value, dict):
+        return _parse_time(value['start']), _parse_time(value['end'])
+    start, _, end = str(value).partition('-')
+    return _parse_time(start), _parse_time(end)
+
+
+def _as_list(value):
+    return value if isinstance(value, list) else [value]
+
+
+def _local_ranges(availability):
+    """Yield (day_index, start_minute, end_minute) in local time"""
+    if not isinstance(availability, dict):
+        return
+
+    if 'days' in availability:
+        hours = availability.get('hours') or '00:00-24:00'
+        for day in _as_list(availability['days']):
+            day_index = DAY_INDEX.get(str(day).strip().lower())
+            if day_index is None:
+                continue
+            for hour_range in _as_list(hours):
+                yield (day_index, *_parse_range(hour_range))
+        return
+
+    for day, ranges in availability.items():
+        day_index = DAY_INDEX.get(str(day).strip().lower())
+        if day_index is None or not ranges:
+            continue
+        for hour_range in _as_list(ranges):
+            yield (day_index, *_parse_range(hour_range))
+
+
+def _utc_offset_minutes(tz_name, now=None):
+    try:
+        tz = ZoneInfo(tz_name) if tz_name else dt_timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = dt_timezone.utc
+    offset = (now or datetime.now(dt_timezone.utc)).astimezone(tz).utcoffset()
+    return int(offset.total_seconds() // 60)
+
+
+def availability_mask(availability, tz_name=None, now=None):
+    """
+    UTC-aligned 168-bit weekly mask for an availability dict, or None when
+    the availability is empty or cannot be parsed. Any hour partly covered
+    by a range counts as available.
+    """
+    if not availability:
+        return None
+
+    offset = _utc_offset_minutes(tz_name, now)
+    mask = 0
+    try:
+        for day_index, start, end in _local_ranges(availability):
+            if end <= start:
+                end += 24 * 60
+            start = day_index * 24 * 60 + start - offset
+            end = day_index * 24 * 60 + end - offset
+            for hour in range(start // 60, -(-end // 60)):
+                mask |= 1 << (hour % HOURS_PER_WEEK)
+    except (KeyError, TypeError, ValueError):
+        return None
+    return mask
+
+
+def mask_to_hex(mask):
+    return '' if mask is None else format(mask, f'0{MASK_HEX_LENGTH}x')
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_availability_masks(apps, schema_editor):
+    UserProfile = apps.get_model('api', 'UserProfile')
+    batch = []
+    profiles = UserProfile.objects.exclude(availability={}).only('id', 'availability', 'timezone')
+    for profile in profiles.iterator(chunk_size=BATCH_SIZE):
+        profile.availability_mask = mask_to_hex(
+            availability_mask(profile.availability, profile.timezone)
+        )
+        batch.append(profile)
+        if len(batch) >= BATCH_SIZE:
+            UserProfile.objects.bulk_update(batch, ['availability_mask'])
+            batch = []
+    UserProfile.objects.bulk_update(batch, ['availability_mask'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_skill_bucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='availability_mask',
+            field=models.CharField(blank=True, editable=False, help_text='Weekly UTC availability, one bit per hour (hex), derived from availability', max_length=42),
+        ),
+        migrations.RunPython(backfill_availability_masks, migrations.RunPython.noop),
+    ]
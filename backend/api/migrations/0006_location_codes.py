@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_availability_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='location_city',
+            field=models.CharField(blank=True, editable=False, help_text='Normalized city derived from location', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='location_country',
+            field=models.CharField(blank=True, editable=False, help_text='Normalized country code derived from location', max_length=60),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['location_country', 'location_city'], name='api_profile_location_idx'),
+        ),
+    ]
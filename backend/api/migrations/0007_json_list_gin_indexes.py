@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:40
+
+from django.db import migrations
+
+
+# GIN indexes back the jsonb ?| / ?& operators used by json_list_filter.
+# Other backends have no equivalent index type and use the text fallback.
+GIN_INDEXES = [
+    ('api_hackathon_required_skills_gin', 'api_hackathon', 'required_skills'),
+    ('api_hackathon_themes_gin', 'api_hackathon', 'themes'),
+    ('api_team_required_skills_gin', 'api_team', 'required_skills'),
+]
+
+
+def create_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in GIN_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column})'
+        )
+
+
+def drop_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, _, _ in GIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_location_codes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_indexes, drop_gin_indexes),
+    ]
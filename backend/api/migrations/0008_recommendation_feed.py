@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_json_list_gin_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationFeed',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hackathons', models.JSONField(default=list, help_text='Serialized recommended hackathons')),
+                ('teams', models.JSONField(default=list, help_text='Serialized recommended teams')),
+                ('is_stale', models.BooleanField(db_index=True, default=False, help_text='Set when data affecting this feed changed since it was built')),
+                ('refreshed_at', models.DateTimeField(db_index=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='recommendation_feed', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
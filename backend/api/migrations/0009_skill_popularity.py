@@ -0,0 +1,59 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:55
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_skills(rows):
+    counts = Counter()
+    for skills in rows.iterator(chunk_size=1000):
+        counts.update(s[:100] for s in skills or () if isinstance(s, str) and s)
+    return counts
+
+
+def backfill_skill_popularity(apps, schema_editor):
+    UserProfile = apps.get_model('api', 'UserProfile')
+    Team = apps.get_model('api', 'Team')
+    SkillPopularity = apps.get_model('api', 'SkillPopularity')
+
+    profiles = count_skills(UserProfile.objects.values_list('skills', flat=True))
+    teams = count_skills(Team.objects.values_list('required_skills', flat=True))
+    SkillPopularity.objects.bulk_create(
+        [
+            SkillPopularity(
+                skill=skill,
+                profile_count=profiles[skill],
+                team_count=teams[skill],
+                score=profiles[skill] + teams[skill] * 2
+            )
+            for skill in profiles.keys() | teams.keys()
+        ],
+        batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_recommendation_feed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillPopularity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100, unique=True)),
+                ('profile_count', models.IntegerField(default=0)),
+                ('team_count', models.IntegerField(default=0)),
+                ('score', models.IntegerField(default=0, help_text='profile_count + 2 * team_count')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Skill popularity',
+                'indexes': [models.Index(fields=['-score'], name='api_skillpopularity_score_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_skill_popularity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-16 22:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_skill_popularity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkillTrendBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=100)),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('bucket_start', models.DateTimeField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bucket_start'], name='api_skilltrend_start_idx')],
+                'unique_together': {('granularity', 'bucket_start', 'skill')},
+            },
+        ),
+    ]
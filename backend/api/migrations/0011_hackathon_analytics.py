@@ -0,0 +1,37 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_skill_trend_bucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HackathonAnalytics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(default=dict)),
+                ('is_stale', models.BooleanField(db_index=True, default=False, help_text='Set when teams, memberships or tasks changed since it was built')),
+                ('refreshed_at', models.DateTimeField()),
+                ('hackathon', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analytics', to='api.hackathon')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HackathonAnalyticsSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.JSONField(default=dict)),
+                ('taken_at', models.DateTimeField()),
+                ('hackathon', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='analytics_snapshots', to='api.hackathon')),
+            ],
+            options={
+                'ordering': ['taken_at'],
+                'indexes': [models.Index(fields=['hackathon', 'taken_at'], name='api_analyticssnap_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_team_health_point'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('status', 'done'), _negated=True), fields=['team', 'due_date'], name='api_task_open_due_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:06
+
+from django.db import migrations, models
+
+
+PRIORITY_RANKS = {'low': 0, 'medium': 1, 'high': 2, 'urgent': 3}
+
+
+def backfill_priority_rank(apps, schema_editor):
+    Task = apps.get_model('api', 'Task')
+    Task.objects.update(priority_rank=models.Case(
+        *[models.When(priority=priority, then=rank) for priority, rank in PRIORITY_RANKS.items()],
+        default=1
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_task_open_due_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['-priority_rank', 'due_date', '-created_at']},
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority_rank',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, help_text='Sortable rank derived from priority (low=0 ... urgent=3)'),
+        ),
+        migrations.RunPython(backfill_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['team', 'status', '-priority_rank', 'due_date'], name='api_task_board_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-16 23:09
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_member_count(apps, schema_editor):
+    Team = apps.get_model('api', 'Team')
+    TeamMembership = apps.get_model('api', 'TeamMembership')
+    accepted = TeamMembership.objects.filter(
+        team=models.OuterRef('pk'), status='accepted'
+    ).order_by().values('team').annotate(count=models.Count('id')).values('count')
+    Team.objects.update(member_count=Coalesce(models.Subquery(accepted), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_task_priority_rank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Accepted members, maintained by TeamMembership signal handlers'),
+        ),
+        migrations.RunPython(backfill_member_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='team',
+            index=models.Index(fields=['hackathon', 'is_recruiting', 'member_count'], name='api_team_open_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.3 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+def merge_duplicate_skills(apps, schema_editor):
+    """Fold case/whitespace duplicates into one row and unpublish profile-created skills"""
+    Skill = apps.get_model('api', 'Skill')
+    ProfileSkill = apps.get_model('api', 'ProfileSkill')
+
+    keep = {}
+    for skill_id, normalized_name in Skill.objects.order_by('id').values_list('id', 'normalized_name'):
+        if normalized_name not in keep:
+            keep[normalized_name] = skill_id
+            continue
+        kept_id = keep[normalized_name]
+        linked = ProfileSkill.objects.filter(skill_id=kept_id).values('profile_id')
+        ProfileSkill.objects.filter(skill_id=skill_id, profile_id__in=linked).delete()
+        ProfileSkill.objects.filter(skill_id=skill_id).update(skill_id=kept_id)
+        Skill.objects.filter(id=skill_id).delete()
+
+    # Profile sync added unknown names as bare 'other' skills; populate_initial_data
+    # republishes any catalogue skill among them on the next release
+    Skill.objects.filter(category='other', description='').update(is_public=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_team_member_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='skill',
+            name='is_public',
+            field=models.BooleanField(default=True, help_text='Listed in the skill catalogue; free-form profile skills are kept private'),
+        ),
+        migrations.RunPython(merge_duplicate_skills, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_private_skills'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='skill',
+            name='normalized_name',
+            field=models.CharField(default='', editable=False, max_length=100, unique=True),
+        ),
+    ]
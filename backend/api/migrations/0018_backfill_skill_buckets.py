@@ -0,0 +1,103 @@
+# Generated by Django 5.2.3 on 2026-10-17 09:40
+
+import hashlib
+import random
+import struct
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import migrations
+
+
+# Frozen copy of api.lsh at the time of this migration
+
+def normalize(name):
+    return ' '.join(str(name).split()).lower()
+
+
+# Mersenne prime used by the universal hash family
+_PRIME = (1 << 61) - 1
+_SEED = 1337
+
+
+@lru_cache(maxsize=None)
+def _hash_params(count):
+    rng = random.Random(_SEED)
+    return [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(count)]
+
+
+def _stable_hash(value):
+    """64-bit hash that is identical across processes (unlike hash())"""
+    digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+    return struct.unpack('>Q', digest)[0]
+
+
+def _signed(value):
+    """Fit an unsigned 64-bit value into a BigIntegerField"""
+    return struct.unpack('>q', struct.pack('>Q', value))[0]
+
+
+def minhash_signature(skills, num_perm=None):
+    """MinHash signature of a skill list, or None when it has no skills"""
+    num_perm = num_perm or settings.MATCHING_LSH_BANDS * settings.MATCHING_LSH_ROWS
+    values = {
+        _stable_hash(normalize(skill))
+        for skill in skills or ()
+        if isinstance(skill, str) and skill.strip()
+    }
+    if not values:
+        return None
+    return [
+        min((a * value + b) % _PRIME for value in values)
+        for a, b in _hash_params(num_perm)
+    ]
+
+
+def band_buckets(skills):
+    """``(band, bucket)`` keys of a skill list for the configured banding"""
+    bands, rows = settings.MATCHING_LSH_BANDS, settings.MATCHING_LSH_ROWS
+    signature = minhash_signature(skills, bands * rows)
+    if signature is None:
+        return []
+
+    buckets = []
+    for band in range(bands):
+        chunk = signature[band * rows:(band + 1) * rows]
+        key = hashlib.blake2b(
+            struct.pack(f'>{rows}Q', *chunk), digest_size=8, salt=struct.pack('>H', band)
+        ).digest()
+        buckets.append((band, _signed(struct.unpack('>Q', key)[0])))
+    return buckets
+
+
+BATCH_SIZE = 1000
+
+
+def backfill_skill_buckets(apps, schema_editor):
+    """Index existing profiles so MATCHING_STRATEGY=lsh works without a manual rebuild"""
+    UserProfile = apps.get_model('api', 'UserProfile')
+    SkillBucket = apps.get_model('api', 'SkillBucket')
+
+    indexed = SkillBucket.objects.values('profile_id')
+    profiles = UserProfile.objects.exclude(skills=[]).exclude(id__in=indexed)
+    buckets = []
+    for profile_id, skills in profiles.values_list('id', 'skills').iterator(chunk_size=BATCH_SIZE):
+        buckets.extend(
+            SkillBucket(profile_id=profile_id, band=band, bucket=bucket)
+            for band, bucket in band_buckets(skills)
+        )
+        if len(buckets) >= BATCH_SIZE:
+            SkillBucket.objects.bulk_create(buckets)
+            buckets = []
+    SkillBucket.objects.bulk_create(buckets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_skill_normalized_name_unique'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_skill_buckets, migrations.RunPython.noop),
+    ]
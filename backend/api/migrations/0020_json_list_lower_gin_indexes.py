@@ -0,0 +1,42 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:30
+
+from django.db import migrations
+
+
+# json_list_filter compares lower-cased elements, so the GIN indexes cover
+# lower(column::text)::jsonb instead of the raw column.
+GIN_INDEXES = [
+    ('api_hackathon_required_skills_gin', 'api_hackathon', 'required_skills'),
+    ('api_hackathon_themes_gin', 'api_hackathon', 'themes'),
+    ('api_team_required_skills_gin', 'api_team', 'required_skills'),
+]
+
+
+def create_lower_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in GIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} ON {table} '
+            f'USING gin ((lower({column}::text)::jsonb))'
+        )
+
+
+def create_raw_gin_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, table, column in GIN_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column})')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_reparse_location_codes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_lower_gin_indexes, create_raw_gin_indexes),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-17 10:45
+
+from django.db import migrations
+
+
+def mark_feeds_stale(apps, schema_editor):
+    """Rebuild feeds stored with relations as IDs in the nested FEED_EXPAND shape"""
+    apps.get_model('api', 'RecommendationFeed').objects.update(is_stale=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_json_list_lower_gin_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(mark_feeds_stale, migrations.RunPython.noop),
+    ]
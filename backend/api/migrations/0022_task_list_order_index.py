@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-17 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_restale_recommendation_feeds'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['team', '-priority_rank', 'due_date', '-created_at'], name='api_task_list_order_idx'),
+        ),
+    ]
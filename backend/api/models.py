@@ -1,8 +1,17 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.core.validators import URLValidator
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from .availability import MASK_HEX_LENGTH, availability_mask, mask_to_hex
+from .locations import parse_location
+
+
+def normalize_skill_name(name):
+    """Canonical lookup key for a skill name (case and whitespace insensitive)"""
+    return ' '.join(str(name).split()).lower()
+
 
 class UserProfile(models.Model):
     """Extended user profile with additional fields for HackMate"""
@@ -26,11 +35,29 @@ class UserProfile(models.Model):
     linkedin_url = models.URLField(blank=True, null=True, validators=[URLValidator()])
     portfolio_url = models.URLField(blank=True, null=True, validators=[URLValidator()])
     location = models.CharField(max_length=100, blank=True, help_text="City, Country")
+    location_country = models.CharField(
+        max_length=60,
+        blank=True,
+        editable=False,
+        help_text="Normalized country code derived from location"
+    )
+    location_city = models.CharField(
+        max_length=100,
+        blank=True,
+        editable=False,
+        help_text="Normalized city derived from location"
+    )
     timezone = models.CharField(max_length=50, blank=True, help_text="User's timezone")
     availability = models.JSONField(
         default=dict,
         help_text="Availability preferences (days, hours, etc.)"
     )
+    availability_mask = models.CharField(
+        max_length=MASK_HEX_LENGTH,
+        blank=True,
+        editable=False,
+        help_text="Weekly UTC availability, one bit per hour (hex), derived from availability"
+    )
     preferred_roles = models.JSONField(
         default=list,
         help_text="Preferred team roles (Developer, Designer, PM, etc.)"
@@ -50,9 +77,48 @@ class UserProfile(models.Model):
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'location' in update_fields:
+            self.location_country, self.location_city = parse_location(self.location)
+            if update_fields is not None:
+                update_fields = kwargs['update_fields'] = {
+                    *update_fields, 'location_country', 'location_city'
+                }
+
+        if update_fields is None or {'availability', 'timezone'} & set(update_fields):
+            self.availability_mask = mask_to_hex(
+                availability_mask(self.availability, self.timezone)
+            )
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'availability_mask'}
+
+        super().save(*args, **kwargs)
+        if update_fields is None or 'skills' in update_fields:
+            self.sync_skill_links()
+
+    def sync_skill_links(self):
+        """Mirror the skills JSON list into indexed ProfileSkill rows"""
+        wanted = set(Skill.resolve_ids(self.skills, create=True))
+        existing = set(self.skill_links.values_list('skill_id', flat=True))
+
+        if existing - wanted:
+            self.skill_links.filter(skill_id__in=existing - wanted).delete()
+        if wanted - existing:
+            ProfileSkill.objects.bulk_create(
+                [ProfileSkill(profile=self, skill_id=skill_id) for skill_id in wanted - existing],
+                ignore_conflicts=True
+            )
+
     class Meta:
         verbose_name = "User Profile"
         verbose_name_plural = "User Profiles"
+        indexes = [
+            models.Index(
+                fields=['location_country', 'location_city'],
+                name='api_profile_location_idx'
+            ),
+        ]
 
 
 class Skill(models.Model):
@@ -72,17 +138,73 @@ class Skill(models.Model):
     ]
 
     name = models.CharField(max_length=100, unique=True)
+    normalized_name = models.CharField(max_length=100, unique=True, editable=False, default='')
     category = models.CharField(max_length=20, choices=SKILL_CATEGORIES)
     description = models.TextField(blank=True)
+    is_public = models.BooleanField(
+        default=True,
+        help_text="Listed in the skill catalogue; free-form profile skills are kept private"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_skill_name(self.name)
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def resolve_ids(cls, names, create=False):
+        """
+        Map free-form skill names to Skill ids with one indexed IN lookup.
+        Unknown names are skipped, or added as private 'other' skills (kept
+        out of the public catalogue) when ``create`` is set.
+        """
+        wanted = {}
+        for name in names or ():
+            if isinstance(name, str) and name.strip():
+                name = ' '.join(name.split())[:100]
+                wanted.setdefault(normalize_skill_name(name), name)
+        if not wanted:
+            return []
+
+        found = dict(
+            cls.objects.filter(normalized_name__in=wanted).values_list('normalized_name', 'id')
+        )
+        missing = [name for key, name in wanted.items() if key not in found]
+        if create and missing:
+            cls.objects.bulk_create(
+                [cls(name=name, normalized_name=normalize_skill_name(name), category='other',
+                     is_public=False)
+                 for name in missing],
+                ignore_conflicts=True
+            )
+            found = dict(
+                cls.objects.filter(normalized_name__in=wanted).values_list('normalized_name', 'id')
+            )
+        return list(found.values())
+
     class Meta:
         ordering = ['category', 'name']
 
 
+class ProfileSkill(models.Model):
+    """Normalized profile-to-skill relation kept in sync with UserProfile.skills"""
+
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='skill_links')
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='profile_links')
+
+    def __str__(self):
+        return f"{self.profile.user.username} - {self.skill.name}"
+
+    class Meta:
+        unique_together = ['profile', 'skill']
+        indexes = [
+            models.Index(fields=['skill', 'profile'], name='api_profileskill_skill_idx'),
+        ]
+
+
 class Hackathon(models.Model):
     """Hackathon event model"""
 
@@ -160,6 +282,25 @@ class Hackathon(models.Model):
         ordering = ['-start_date']
 
 
+class TeamQuerySet(models.QuerySet):
+    def with_member_counts(self):
+        """
+        Annotate ``accepted_member_count``, an exact recount of accepted
+        members that ``current_size`` prefers over the denormalized
+        ``member_count`` column
+        """
+        accepted = TeamMembership.objects.filter(
+            team=models.OuterRef('pk'), status='accepted'
+        ).order_by().values('team').annotate(count=models.Count('id')).values('count')
+        return self.annotate(
+            accepted_member_count=Coalesce(models.Subquery(accepted), 0)
+        )
+
+    def open(self):
+        """Recruiting teams with a free seat"""
+        return self.filter(is_recruiting=True, member_count__lt=models.F('max_members'))
+
+
 class Team(models.Model):
     """Team model for hackathon participation"""
 
@@ -182,6 +323,14 @@ class Team(models.Model):
     )
     is_recruiting = models.BooleanField(default=True)
     max_members = models.PositiveIntegerField(default=4)
+    # Only written by F() updates in the membership signal handlers; code that
+    # saves an existing team passes update_fields so a stale value is not
+    # written back
+    member_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        help_text="Accepted members, maintained by TeamMembership signal handlers"
+    )
     required_skills = models.JSONField(
         default=list,
         help_text="Skills the team is looking for"
@@ -195,12 +344,15 @@ class Team(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TeamQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.name} - {self.hackathon.title}"
 
     @property
     def current_size(self):
-        return self.members.count()
+        """Accepted members, recounted when the queryset used ``with_member_counts()``"""
+        return getattr(self, 'accepted_member_count', self.member_count)
 
     @property
     def is_full(self):
@@ -209,6 +361,12 @@ class Team(models.Model):
     class Meta:
         unique_together = ['name', 'hackathon']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(
+                fields=['hackathon', 'is_recruiting', 'member_count'],
+                name='api_team_open_idx'
+            ),
+        ]
 
 
 class TeamMembership(models.Model):
@@ -289,6 +447,12 @@ class TeamInvitation(models.Model):
         ordering = ['-created_at']
 
 
+class TaskQuerySet(models.QuerySet):
+    def overdue(self, now=None):
+        """Tasks past their due date that are not done"""
+        return self.filter(Task.overdue_filter(now))
+
+
 class Task(models.Model):
     """Task model for team task management"""
 
@@ -299,6 +463,9 @@ class Task(models.Model):
         ('urgent', 'Urgent'),
     ]
 
+    # Sort rank of each priority, stored in priority_rank
+    PRIORITY_RANKS = {priority: rank for rank, (priority, _) in enumerate(PRIORITY_CHOICES)}
+
     STATUS_CHOICES = [
         ('todo', 'To Do'),
         ('in_progress', 'In Progress'),
@@ -324,6 +491,11 @@ class Task(models.Model):
     )
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='todo')
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default='medium')
+    priority_rank = models.PositiveSmallIntegerField(
+        default=1,
+        editable=False,
+        help_text="Sortable rank derived from priority (low=0 ... urgent=3)"
+    )
     due_date = models.DateTimeField(null=True, blank=True)
     estimated_hours = models.PositiveIntegerField(
         null=True,
@@ -341,6 +513,8 @@ class Task(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    objects = TaskQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.title} - {self.team.name}"
 
@@ -350,15 +524,48 @@ class Task(models.Model):
             return timezone.now() > self.due_date
         return False
 
+    @staticmethod
+    def overdue_filter(now=None, prefix=''):
+        """
+        Q matching overdue tasks (served by api_task_open_due_idx); ``prefix``
+        reaches tasks through a relation, e.g. ``'tasks__'`` from Team
+        """
+        return (
+            models.Q(**{f'{prefix}due_date__lt': now or timezone.now()})
+            & ~models.Q(**{f'{prefix}status': 'done'})
+        )
+
     def save(self, *args, **kwargs):
         if self.status == 'done' and not self.completed_at:
             self.completed_at = timezone.now()
         elif self.status != 'done' and self.completed_at:
             self.completed_at = None
+
+        self.priority_rank = self.PRIORITY_RANKS.get(self.priority, self.PRIORITY_RANKS['medium'])
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'priority' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'priority_rank'}
         super().save(*args, **kwargs)
 
     class Meta:
-        ordering = ['-priority', 'due_date', '-created_at']
+        ordering = ['-priority_rank', 'due_date', '-created_at']
+        indexes = [
+            # Default team list, read in Meta.ordering without a sort step
+            models.Index(
+                fields=['team', '-priority_rank', 'due_date', '-created_at'],
+                name='api_task_list_order_idx'
+            ),
+            # Team list filtered by ?status=
+            models.Index(
+                fields=['team', 'status', '-priority_rank', 'due_date'],
+                name='api_task_board_idx'
+            ),
+            models.Index(
+                fields=['team', 'due_date'],
+                condition=~models.Q(status='done'),
+                name='api_task_open_due_idx'
+            ),
+        ]
 
 
 class TaskComment(models.Model):
@@ -417,3 +624,189 @@ class MatchingPreference(models.Model):
 
     def __str__(self):
         return f"{self.user.username}'s Matching Preferences"
+
+
+class TeamFormationJob(models.Model):
+    """Batch job proposing teams for every unteamed participant of a hackathon"""
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    hackathon = models.ForeignKey(
+        Hackathon,
+        on_delete=models.CASCADE,
+        related_name='team_formation_jobs'
+    )
+    requested_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='team_formation_jobs'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    participant_count = models.PositiveIntegerField(default=0)
+    result = models.JSONField(default=dict, help_text="Proposed teams")
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Team formation for {self.hackathon.title} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+
+
+class SkillBucket(models.Model):
+    """LSH band bucket of a profile's MinHash skill signature"""
+
+    profile = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='skill_buckets'
+    )
+    band = models.PositiveSmallIntegerField()
+    bucket = models.BigIntegerField()
+
+    def __str__(self):
+        return f"{self.profile.user.username} - band {self.band}"
+
+    class Meta:
+        unique_together = ['profile', 'band']
+        indexes = [
+            models.Index(fields=['band', 'bucket'], name='api_skillbucket_lookup_idx'),
+        ]
+
+
+class RecommendationFeed(models.Model):
+    """Precomputed recommendation payload for a user, refreshed in the background"""
+
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        related_name='recommendation_feed'
+    )
+    hackathons = models.JSONField(default=list, help_text="Serialized recommended hackathons")
+    teams = models.JSONField(default=list, help_text="Serialized recommended teams")
+    is_stale = models.BooleanField(
+        default=False,
+        db_index=True,
+        help_text="Set when data affecting this feed changed since it was built"
+    )
+    refreshed_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.user.username}'s Recommendation Feed"
+
+
+class HackathonAnalytics(models.Model):
+    """Latest analytics snapshot for a hackathon, rebuilt on a short debounce"""
+
+    hackathon = models.OneToOneField(
+        Hackathon,
+        on_delete=models.CASCADE,
+        related_name='analytics'
+    )
+    data = models.JSONField(default=dict)
+    is_stale = models.BooleanField(
+        default=False,
+        db_index=True,
+        help_text="Set when teams, memberships or tasks changed since it was built"
+    )
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Analytics for {self.hackathon.title}"
+
+
+class HackathonAnalyticsSnapshot(models.Model):
+    """Point in a hackathon's analytics history"""
+
+    hackathon = models.ForeignKey(
+        Hackathon,
+        on_delete=models.CASCADE,
+        related_name='analytics_snapshots'
+    )
+    data = models.JSONField(default=dict)
+    taken_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.hackathon.title} analytics @ {self.taken_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        ordering = ['taken_at']
+        indexes = [
+            models.Index(fields=['hackathon', 'taken_at'], name='api_analyticssnap_time_idx'),
+        ]
+
+
+class TeamHealthPoint(models.Model):
+    """Point in a team's health score history"""
+
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='health_points')
+    health_score = models.FloatField()
+    task_count = models.PositiveIntegerField(default=0)
+    done_count = models.PositiveIntegerField(default=0)
+    overdue_count = models.PositiveIntegerField(default=0)
+    member_count = models.PositiveIntegerField(default=0)
+    recorded_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.team.name} health {self.health_score:.0f} @ {self.recorded_at:%Y-%m-%d %H:%M}"
+
+    class Meta:
+        ordering = ['recorded_at']
+        indexes = [
+            models.Index(fields=['team', 'recorded_at'], name='api_teamhealth_time_idx'),
+        ]
+
+
+class SkillPopularity(models.Model):
+    """Running count of a skill across profiles and team requirements"""
+
+    skill = models.CharField(max_length=100, unique=True)
+    profile_count = models.IntegerField(default=0)
+    team_count = models.IntegerField(default=0)
+    score = models.IntegerField(
+        default=0,
+        help_text="profile_count + 2 * team_count"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.skill} ({self.score})"
+
+    class Meta:
+        verbose_name_plural = "Skill popularity"
+        indexes = [
+            models.Index(fields=['-score'], name='api_skillpopularity_score_idx'),
+        ]
+
+
+class SkillTrendBucket(models.Model):
+    """Weighted count of skill additions within one hour or one day"""
+
+    GRANULARITY_CHOICES = [
+        ('hour', 'Hour'),
+        ('day', 'Day'),
+    ]
+
+    skill = models.CharField(max_length=100)
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    bucket_start = models.DateTimeField()
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.skill} @ {self.bucket_start:%Y-%m-%d %H:%M} ({self.count})"
+
+    class Meta:
+        unique_together = ['granularity', 'bucket_start', 'skill']
+        indexes = [
+            models.Index(fields=['bucket_start'], name='api_skilltrend_start_idx'),
+        ]
@@ -0,0 +1,77 @@
+"""
+Normalized (entity-deduplicated) list responses
+
+Clients that send ``Accept: application/vnd.hackmate.normalized+json``
+receive list endpoints as an envelope of primary records plus an
+``entities`` map. Relations named in ``?expand=`` (all of them when it is
+absent) stay IDs on the records and the related objects are side-loaded
+once per response under ``entities[<type>][<id>]``, so twenty teams of
+one hackathon carry the hackathon once instead of twenty times.
+"""
+from rest_framework.renderers import JSONRenderer
+
+from .serializers import parse_expand, parse_field_paths
+
+
+NORMALIZED_MEDIA_TYPE = 'application/vnd.hackmate.normalized+json'
+
+
+class NormalizedJSONRenderer(JSONRenderer):
+    """JSON renderer selected by clients asking for the normalized envelope"""
+    media_type = NORMALIZED_MEDIA_TYPE
+    format = 'normalized'
+
+
+def is_normalized(request):
+    return isinstance(getattr(request, 'accepted_renderer', None), NormalizedJSONRenderer)
+
+
+def entity_type(serializer_class):
+    return serializer_class.Meta.model._meta.model_name
+
+
+def normalize(objects, serializer_class, expand=None, fields=None, context=None):
+    """
+    ``(records, entities)`` for ``objects``.
+
+    Expanded relations are read from the loaded objects (plan the queryset
+    with ``setup_eager_loading`` for the same shape) and every related
+    object is serialized once, with the expansions of the first path that
+    reaches it.
+    """
+    entities = {}
+    records = _serialize(
+        list(objects), serializer_class, parse_expand(expand), parse_field_paths(fields),
+        context, entities
+    )
+    return records, entities
+
+
+def _serialize(objects, serializer_class, expand, fields, context, entities):
+    records = serializer_class(objects, many=True, expand={}, fields=fields, context=context).data
+    expandable_fields = getattr(serializer_class.Meta, 'expandable_fields', {})
+
+    for name, (nested_class, options) in expandable_fields.items():
+        if expand is not None and name not in expand or (fields and name not in fields):
+            continue
+
+        source = options.get('source', name)
+        related = {}
+        for obj, record in zip(objects, records):
+            if options.get('many'):
+                values = list(getattr(obj, source).all())
+                record[name] = [value.pk for value in values]
+            else:
+                value = getattr(obj, source)
+                values = [] if value is None else [value]
+            related.update((value.pk, value) for value in values)
+
+        table = entities.setdefault(entity_type(nested_class), {})
+        unseen = [value for pk, value in related.items() if str(pk) not in table]
+        nested_records = _serialize(
+            unseen, nested_class, None if expand is None else expand[name], fields.get(name, {}),
+            context, entities
+        )
+        for value, record in zip(unseen, nested_records):
+            table[str(value.pk)] = record
+    return records
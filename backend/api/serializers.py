@@ -4,10 +4,140 @@ from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from .models import (
     UserProfile, Skill, Hackathon, Team, TeamMembership, 
-    TeamInvitation, Task, TaskComment, MatchingPreference
+    TeamInvitation, Task, TaskComment, MatchingPreference, TeamFormationJob,
+    normalize_skill_name
 )
 
 
+def parse_field_paths(paths):
+    """
+    Tree of comma separated dotted paths, e.g. ``'team.hackathon,assigned_to'``
+    becomes ``{'team': {'hackathon': {}}, 'assigned_to': {}}``
+    """
+    if isinstance(paths, dict):
+        return paths
+    if isinstance(paths, str):
+        paths = paths.split(',')
+
+    tree = {}
+    for path in paths or ():
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree
+
+
+def parse_expand(expand):
+    """
+    ``parse_field_paths`` for ``expand``; ``None`` (no expansion requested)
+    is kept apart from an empty one and nests every expandable relation
+    """
+    return None if expand is None else parse_field_paths(expand)
+
+
+class EagerLoadingMixin:
+    """
+    Plans the joins and prefetches a serializer needs.
+
+    Relations read by plain fields are declared in ``Meta.select_related``
+    (forward foreign keys) and ``Meta.prefetch_related`` (many-valued
+    relations). Expanded relations (``Meta.expandable_fields``, all of
+    them when no expansion is given) are followed through their
+    ``source``, so the plan for a task list expanded to ``team.hackathon``
+    includes everything TeamSerializer and HackathonSerializer read.
+    Relations left as IDs need no join, except many-valued ones, whose IDs
+    are prefetched.
+    Relations below a many-valued one are prefetched as well, keeping the
+    query count independent of page size.
+    """
+
+    @classmethod
+    def get_eager_loading(cls, prefix='', many=False, expand=None, fields=None):
+        """``(select_related, prefetch_related)`` lookups rooted at ``prefix``"""
+        meta = getattr(cls, 'Meta', None)
+        expand = parse_expand(expand)
+        fields = parse_field_paths(fields)
+
+        def requested(path):
+            return not fields or path.split('__')[0] in fields
+
+        select = [prefix + path for path in getattr(meta, 'select_related', ()) if requested(path)]
+        prefetch = [prefix + path for path in getattr(meta, 'prefetch_related', ()) if requested(path)]
+        if many:
+            prefetch, select = prefetch + select, []
+
+        for name, (serializer_class, options) in getattr(meta, 'expandable_fields', {}).items():
+            if not requested(name):
+                continue
+
+            field_many = options.get('many', False)
+            path = prefix + options.get('source', name).replace('.', '__')
+            if expand is not None and name not in expand:
+                # Many-valued relations left as IDs still read the related rows
+                if field_many:
+                    prefetch.append(path)
+                continue
+            if many or field_many:
+                prefetch.append(path)
+            else:
+                select.append(path)
+            nested_select, nested_prefetch = serializer_class.get_eager_loading(
+                path + '__', many or field_many,
+                None if expand is None else expand[name], fields.get(name)
+            )
+            select += nested_select
+            prefetch += nested_prefetch
+        return select, prefetch
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, expand=None, fields=None):
+        """Add the planned select_related/prefetch_related calls to ``queryset``"""
+        select, prefetch = cls.get_eager_loading(expand=expand, fields=fields)
+        return queryset.select_related(*select).prefetch_related(*prefetch)
+
+
+class SparseFieldsMixin(EagerLoadingMixin):
+    """
+    Serializer whose output shape is chosen by the client.
+
+    Relations in ``Meta.expandable_fields`` are nested, all the way down,
+    unless ``expand`` is given; then only the named ones are nested and the
+    rest render as primary keys (an empty ``expand`` keeps every relation
+    an ID). ``fields`` limits the output to the named fields.
+    Both take comma separated dotted paths (``expand=team.hackathon``,
+    ``fields=id,title,team.name``) and default to the ``?expand=`` and
+    ``?fields=`` query parameters of the request in the serializer context.
+    """
+
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        query_params = getattr(self._context.get('request'), 'query_params', {})
+        if fields is None:
+            fields = query_params.get('fields')
+        if expand is None:
+            expand = query_params.get('expand')
+        self.requested_fields = parse_field_paths(fields)
+        self.expanded_fields = parse_expand(expand)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name, (serializer_class, options) in getattr(self.Meta, 'expandable_fields', {}).items():
+            if self.expanded_fields is None or name in self.expanded_fields:
+                fields[name] = serializer_class(
+                    read_only=True,
+                    expand=None if self.expanded_fields is None else self.expanded_fields[name],
+                    fields=self.requested_fields.get(name, {}),
+                    **options
+                )
+            else:
+                fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, **options)
+
+        if self.requested_fields:
+            fields = {name: field for name, field in fields.items() if name in self.requested_fields}
+        return fields
+
+
 class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     """Custom JWT token serializer with additional user data"""
     
@@ -54,7 +184,7 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Basic user serializer"""
     
     class Meta:
@@ -68,18 +198,28 @@ class SkillSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Skill
-        fields = '__all__'
+        exclude = ('normalized_name', 'is_public')
+
+    def validate_name(self, value):
+        duplicates = Skill.objects.filter(normalized_name=normalize_skill_name(value), is_public=True)
+        if self.instance is not None:
+            duplicates = duplicates.exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise serializers.ValidationError('A skill with this name already exists.')
+        return value
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """User profile serializer"""
     
-    user = UserSerializer(read_only=True)
     
     class Meta:
         model = UserProfile
         fields = '__all__'
         read_only_fields = ('user', 'created_at', 'updated_at')
+        expandable_fields = {
+            'user': (UserSerializer, {}),
+        }
 
 
 class UserProfileUpdateSerializer(serializers.ModelSerializer):
@@ -90,10 +230,9 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
         exclude = ('user', 'created_at', 'updated_at')
 
 
-class HackathonSerializer(serializers.ModelSerializer):
+class HackathonSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Hackathon serializer"""
     
-    created_by = UserSerializer(read_only=True)
     is_registration_open = serializers.ReadOnlyField()
     is_active = serializers.ReadOnlyField()
     
@@ -101,6 +240,9 @@ class HackathonSerializer(serializers.ModelSerializer):
         model = Hackathon
         fields = '__all__'
         read_only_fields = ('created_by', 'created_at', 'updated_at')
+        expandable_fields = {
+            'created_by': (UserSerializer, {}),
+        }
 
 
 class HackathonCreateSerializer(serializers.ModelSerializer):
@@ -111,23 +253,22 @@ class HackathonCreateSerializer(serializers.ModelSerializer):
         exclude = ('created_by', 'created_at', 'updated_at')
 
 
-class TeamMembershipSerializer(serializers.ModelSerializer):
+class TeamMembershipSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Team membership serializer"""
     
-    user = UserSerializer(read_only=True)
     
     class Meta:
         model = TeamMembership
         fields = '__all__'
         read_only_fields = ('joined_at', 'updated_at')
+        expandable_fields = {
+            'user': (UserSerializer, {}),
+        }
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Team serializer"""
     
-    leader = UserSerializer(read_only=True)
-    hackathon = HackathonSerializer(read_only=True)
-    memberships = TeamMembershipSerializer(source='teammembership_set', many=True, read_only=True)
     current_size = serializers.ReadOnlyField()
     is_full = serializers.ReadOnlyField()
     
@@ -135,6 +276,19 @@ class TeamSerializer(serializers.ModelSerializer):
         model = Team
         fields = '__all__'
         read_only_fields = ('leader', 'created_at', 'updated_at')
+        prefetch_related = ('members',)
+        expandable_fields = {
+            'leader': (UserSerializer, {}),
+            'hackathon': (HackathonSerializer, {}),
+            'memberships': (TeamMembershipSerializer, {'source': 'teammembership_set', 'many': True}),
+        }
+
+    def update(self, instance, validated_data):
+        """Save only the edited columns so member_count keeps its F() updates"""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
 
 
 class TeamCreateSerializer(serializers.ModelSerializer):
@@ -145,32 +299,37 @@ class TeamCreateSerializer(serializers.ModelSerializer):
         exclude = ('leader', 'created_at', 'updated_at')
 
 
-class TeamInvitationSerializer(serializers.ModelSerializer):
+class TeamInvitationSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Team invitation serializer"""
     
-    team = TeamSerializer(read_only=True)
-    invited_user = UserSerializer(read_only=True)
-    invited_by = UserSerializer(read_only=True)
     is_expired = serializers.ReadOnlyField()
     
     class Meta:
         model = TeamInvitation
         fields = '__all__'
         read_only_fields = ('invited_by', 'created_at', 'updated_at')
+        expandable_fields = {
+            'team': (TeamSerializer, {}),
+            'invited_user': (UserSerializer, {}),
+            'invited_by': (UserSerializer, {}),
+        }
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Task serializer"""
     
-    assigned_to = UserSerializer(read_only=True)
-    created_by = UserSerializer(read_only=True)
-    team = TeamSerializer(read_only=True)
     is_overdue = serializers.ReadOnlyField()
     
     class Meta:
         model = Task
         fields = '__all__'
         read_only_fields = ('created_by', 'created_at', 'updated_at', 'completed_at')
+        prefetch_related = ('dependencies',)
+        expandable_fields = {
+            'assigned_to': (UserSerializer, {}),
+            'created_by': (UserSerializer, {}),
+            'team': (TeamSerializer, {}),
+        }
 
 
 class TaskCreateSerializer(serializers.ModelSerializer):
@@ -181,23 +340,39 @@ class TaskCreateSerializer(serializers.ModelSerializer):
         exclude = ('created_by', 'created_at', 'updated_at', 'completed_at')
 
 
-class TaskCommentSerializer(serializers.ModelSerializer):
+class TaskCommentSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Task comment serializer"""
     
-    author = UserSerializer(read_only=True)
     
     class Meta:
         model = TaskComment
         fields = '__all__'
         read_only_fields = ('author', 'created_at', 'updated_at')
+        expandable_fields = {
+            'author': (UserSerializer, {}),
+        }
 
 
-class MatchingPreferenceSerializer(serializers.ModelSerializer):
+class MatchingPreferenceSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Matching preference serializer"""
     
-    user = UserSerializer(read_only=True)
     
     class Meta:
         model = MatchingPreference
         fields = '__all__'
         read_only_fields = ('user', 'created_at', 'updated_at')
+        expandable_fields = {
+            'user': (UserSerializer, {}),
+        }
+
+
+class TeamFormationJobSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Team formation job serializer"""
+
+
+    class Meta:
+        model = TeamFormationJob
+        fields = '__all__'
+        expandable_fields = {
+            'requested_by': (UserSerializer, {}),
+        }
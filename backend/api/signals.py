@@ -0,0 +1,180 @@
+"""
+Signal handlers that keep derived data in sync with the core models
+"""
+from django.db.models import F
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import UserProfile, Hackathon, Team, TeamMembership, Task
+from .matching import bump_match_generations
+from .lsh import index_profile
+from .trending import apply_skill_delta
+from .team_health import invalidate_team_health, schedule_team_health
+from . import feeds, analytics
+
+
+# User fields rendered in find-teammates results
+MATCH_USER_FIELDS = {'username', 'email', 'first_name', 'last_name'}
+
+
+def remember_previous(instance, *fields):
+    """Store the row's current DB values on the instance before it is saved"""
+    previous = None
+    if instance.pk:
+        previous = type(instance).objects.filter(pk=instance.pk).values(*fields).first()
+    instance._previous = previous or {}
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_match_cache(sender, instance, **kwargs):
+    """The profile's own results are versioned by updated_at; bump results it can enter"""
+    previous = getattr(instance, '_previous', {})
+    bump_match_generations(
+        instance.pk,
+        [*(previous.get('skills') or ()), *(instance.skills or ())],
+        available=previous.get('is_available', False) or instance.is_available
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_match_cache_on_user_edit(sender, instance, created, update_fields=None, **kwargs):
+    """Names and usernames are part of the serialized match results"""
+    if created or update_fields is not None and not MATCH_USER_FIELDS & set(update_fields):
+        return
+    for profile_id in UserProfile.objects.filter(user=instance).values_list('id', flat=True):
+        bump_match_generations(profile_id)
+
+
+@receiver(post_save, sender=UserProfile)
+def update_skill_buckets(sender, instance, update_fields=None, **kwargs):
+    """Keep the LSH index in step with the profile's skills"""
+    if update_fields is None or 'skills' in update_fields:
+        index_profile(instance)
+
+
+@receiver(pre_save, sender=UserProfile)
+def remember_profile_state(sender, instance, **kwargs):
+    remember_previous(instance, 'skills', 'is_available')
+
+
+@receiver(pre_save, sender=TeamMembership)
+def remember_membership_status(sender, instance, **kwargs):
+    remember_previous(instance, 'status')
+
+
+@receiver(pre_save, sender=Team)
+def remember_team_state(sender, instance, **kwargs):
+    remember_previous(instance, 'is_recruiting', 'required_skills')
+
+
+@receiver(post_save, sender=UserProfile)
+def stale_feed_on_skill_edit(sender, instance, created, **kwargs):
+    if not created and instance._previous.get('skills') != instance.skills:
+        feeds.mark_stale(instance.user)
+
+
+@receiver(post_save, sender=Hackathon)
+def stale_feeds_on_new_hackathon(sender, instance, created, **kwargs):
+    if created:
+        feeds.mark_stale_for_skills(instance.required_skills)
+
+
+@receiver(post_save, sender=Team)
+def stale_feeds_on_recruiting_change(sender, instance, created, **kwargs):
+    previous_skills = instance._previous.get('required_skills')
+    if (
+        created
+        or instance._previous.get('is_recruiting') != instance.is_recruiting
+        or previous_skills != instance.required_skills
+    ):
+        feeds.mark_stale_for_skills([*(previous_skills or ()), *instance.required_skills])
+
+
+@receiver(post_delete, sender=Team)
+def stale_feeds_on_team_delete(sender, instance, **kwargs):
+    feeds.mark_stale_for_skills(instance.required_skills)
+
+
+@receiver(post_save, sender=TeamMembership)
+def stale_feeds_on_membership_change(sender, instance, created, **kwargs):
+    """A member joining or leaving changes the team's fit and free seats"""
+    was_accepted = instance._previous.get('status') == 'accepted'
+    if was_accepted != (instance.status == 'accepted'):
+        stale_feeds_for_team(instance.team_id, instance.user_id)
+    elif created:
+        feeds.mark_stale(instance.user_id)
+
+
+@receiver(post_delete, sender=TeamMembership)
+def stale_feeds_on_membership_delete(sender, instance, **kwargs):
+    if instance.status == 'accepted':
+        stale_feeds_for_team(instance.team_id, instance.user_id)
+    else:
+        feeds.mark_stale(instance.user_id)
+
+
+def stale_feeds_for_team(team_id, user_id):
+    required_skills = Team.objects.filter(id=team_id).values_list('required_skills', flat=True).first()
+    feeds.mark_stale_for_skills(required_skills or [], users=[user_id])
+
+
+@receiver(post_save, sender=UserProfile)
+def count_profile_skills(sender, instance, **kwargs):
+    apply_skill_delta(instance._previous.get('skills'), instance.skills, 'profile')
+
+
+@receiver(post_delete, sender=UserProfile)
+def uncount_profile_skills(sender, instance, **kwargs):
+    apply_skill_delta(instance.skills, [], 'profile')
+
+
+@receiver(post_save, sender=Team)
+def count_team_skills(sender, instance, **kwargs):
+    apply_skill_delta(instance._previous.get('required_skills'), instance.required_skills, 'team')
+
+
+@receiver(post_delete, sender=Team)
+def uncount_team_skills(sender, instance, **kwargs):
+    apply_skill_delta(instance.required_skills, [], 'team')
+
+
+@receiver([post_save, post_delete], sender=Team)
+def stale_analytics_on_team_change(sender, instance, **kwargs):
+    analytics.mark_stale(hackathon_id=instance.hackathon_id)
+
+
+@receiver([post_save, post_delete], sender=TeamMembership)
+@receiver([post_save, post_delete], sender=Task)
+def stale_analytics_on_team_activity(sender, instance, **kwargs):
+    analytics.mark_stale(team_id=instance.team_id)
+
+
+@receiver([post_save, post_delete], sender=TeamMembership)
+@receiver([post_save, post_delete], sender=Task)
+def refresh_team_health(sender, instance, **kwargs):
+    """Drop the cached score now and record a history point once committed"""
+    invalidate_team_health(instance.team_id)
+    schedule_team_health(instance.team_id)
+
+
+def uncount_member(team_id):
+    # A drifted count of 0 stays 0 instead of failing the unsigned column
+    Team.objects.filter(id=team_id, member_count__gt=0).update(member_count=F('member_count') - 1)
+
+
+@receiver(post_save, sender=TeamMembership)
+def count_accepted_member(sender, instance, **kwargs):
+    was_accepted = instance._previous.get('status') == 'accepted'
+    is_accepted = instance.status == 'accepted'
+    if is_accepted and not was_accepted:
+        Team.objects.filter(id=instance.team_id).update(member_count=F('member_count') + 1)
+    elif was_accepted and not is_accepted:
+        uncount_member(instance.team_id)
+
+
+@receiver(post_delete, sender=TeamMembership)
+def uncount_accepted_member(sender, instance, **kwargs):
+    if instance.status == 'accepted':
+        uncount_member(instance.team_id)
+
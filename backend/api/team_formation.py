@@ -0,0 +1,238 @@
+"""
+Hackathon-wide team formation for the HackMate API
+
+Places every unteamed participant of a hackathon into a proposed team at
+once. Jobs are queued by the API and run by the run_team_formation_jobs
+worker. Participants are sharded by timezone and experience level, each
+shard is formed greedily in a worker process using the same compatibility
+criteria as find_teammates, and undersized leftovers are merged in the
+parent process.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import UserProfile, TeamMembership, TeamInvitation, TeamFormationJob
+from .matching import FeatureEncoder, score_vectors
+
+
+# Participants per worker task; bounds the O(n^2) greedy pass
+SHARD_SIZE = 250
+
+# Bonus per preferred role a candidate adds that the team does not cover yet
+ROLE_COVERAGE_BONUS = 5
+
+# Penalty per seat of difference from the candidate's preferred team size
+TEAM_SIZE_PENALTY = 2
+
+PARTICIPANT_FIELDS = (
+    'user_id', 'skills', 'experience_level', 'preferred_roles', 'timezone',
+    'availability_mask', 'user__matching_preferences__preferred_team_size',
+)
+
+
+def load_participants(hackathon):
+    """
+    Available profiles of the hackathon's participants not yet accepted into
+    one of its teams. Participants are users who asked to join, were
+    invited to, or left a team of the hackathon.
+    """
+    memberships = TeamMembership.objects.filter(team__hackathon=hackathon)
+    teamed = memberships.filter(status='accepted').values('user_id')
+    invited = TeamInvitation.objects.filter(
+        team__hackathon=hackathon,
+        status='pending'
+    ).values('invited_user_id')
+
+    return list(
+        UserProfile.objects.filter(is_available=True)
+        .filter(Q(user_id__in=memberships.values('user_id')) | Q(user_id__in=invited))
+        .exclude(user_id__in=teamed)
+        .order_by('timezone', 'experience_level', 'user_id')
+        .values_list(*PARTICIPANT_FIELDS)
+    )
+
+
+def _target_size(preferred_size, min_size, max_size):
+    return max(min_size, min(preferred_size or max_size, max_size))
+
+
+def _form_shard(shard):
+    """Greedily grow teams around seeds; runs inside a worker process"""
+    participants, min_size, max_size = shard
+    encoder = FeatureEncoder()
+    vectors = [encoder.encode(*row[1:6]) for row in participants]
+    preferred = [row[6] for row in participants]
+
+    remaining = list(range(len(participants)))
+    teams = []
+    while remaining:
+        seed = remaining.pop(0)
+        members = [seed]
+        target = _target_size(preferred[seed], min_size, max_size)
+        role_mask = vectors[seed].role_mask
+
+        # Running sum of symmetric scores between each candidate and the team
+        affinity = {
+            c: score_vectors(vectors[seed], vectors[c]) + score_vectors(vectors[c], vectors[seed])
+            for c in remaining
+        }
+        while len(members) < target and remaining:
+            def fit(c):
+                new_roles = (vectors[c].role_mask & ~role_mask).bit_count()
+                size_gap = abs((preferred[c] or target) - target)
+                return (
+                    affinity[c] / (2 * len(members))
+                    + new_roles * ROLE_COVERAGE_BONUS
+                    - size_gap * TEAM_SIZE_PENALTY
+                )
+
+            best = max(remaining, key=fit)
+            remaining.remove(best)
+            del affinity[best]
+            members.append(best)
+            role_mask |= vectors[best].role_mask
+            for c in remaining:
+                affinity[c] += (
+                    score_vectors(vectors[best], vectors[c])
+                    + score_vectors(vectors[c], vectors[best])
+                )
+
+        teams.append([participants[i] for i in members])
+    return teams
+
+
+def _team_summary(members):
+    encoder = FeatureEncoder()
+    vectors = [encoder.encode(*row[1:6]) for row in members]
+    pairs = [
+        score_vectors(a, b)
+        for i, a in enumerate(vectors)
+        for j, b in enumerate(vectors)
+        if i != j
+    ]
+    roles = sorted({role for row in members for role in row[3] or ()})
+    return {
+        'members': [row[0] for row in members],
+        'size': len(members),
+        'compatibility_score': round(sum(pairs) / len(pairs), 2) if pairs else 0,
+        'roles': roles,
+    }
+
+
+def _merge_undersized(teams, min_size, max_size):
+    """
+    Dissolve teams below min_size into teams that still have room; members
+    that find no room form new teams, topped up from teams above min_size.
+    """
+    complete = [team for team in teams if len(team) >= min_size]
+    leftovers = [row for team in teams if len(team) < min_size for row in team]
+
+    encoder = FeatureEncoder()
+
+    def affinity(row, team):
+        vector = encoder.encode(*row[1:6])
+        return sum(
+            score_vectors(vector, encoder.encode(*member[1:6])) for member in team
+        ) / len(team)
+
+    homeless = []
+    for row in leftovers:
+        open_teams = [team for team in complete if len(team) < max_size]
+        if open_teams:
+            max(open_teams, key=lambda team: affinity(row, team)).append(row)
+        else:
+            homeless.append(row)
+
+    for i in range(0, len(homeless), max_size):
+        team = homeless[i:i + max_size]
+        while len(team) < min_size:
+            donors = [donor for donor in complete if len(donor) > min_size]
+            if not donors:
+                break
+            donor, row = max(
+                ((donor, row) for donor in donors for row in donor),
+                key=lambda pair: affinity(pair[1], team)
+            )
+            donor.remove(row)
+            team.append(row)
+        complete.append(team)
+    return complete
+
+
+def form_teams(participants, min_size, max_size, workers=None):
+    """
+    Partition ``participants`` (rows of PARTICIPANT_FIELDS) into proposed teams.
+
+    Shards are formed in a process pool of ``workers`` processes (defaults
+    to TEAM_FORMATION_WORKERS or the CPU count); a single shard or a single
+    worker runs inline.
+    """
+    min_size = max(1, min_size)
+    max_size = max(min_size, max_size)
+    shards = [
+        (participants[i:i + SHARD_SIZE], min_size, max_size)
+        for i in range(0, len(participants), SHARD_SIZE)
+    ]
+    workers = workers or settings.TEAM_FORMATION_WORKERS or os.cpu_count() or 1
+
+    if workers <= 1 or len(shards) <= 1:
+        shard_teams = [_form_shard(shard) for shard in shards]
+    else:
+        # Forked workers only compute; keep them from inheriting open connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as executor:
+            shard_teams = list(executor.map(_form_shard, shards))
+
+    teams = [team for shard in shard_teams for team in shard]
+    teams = _merge_undersized(teams, min_size, max_size)
+    return [_team_summary(team) for team in teams]
+
+
+def run_team_formation_job(job_id, workers=None):
+    """Execute a TeamFormationJob and store its proposed teams"""
+    job = TeamFormationJob.objects.select_related('hackathon').get(id=job_id)
+    job.status = 'running'
+    job.started_at = timezone.now()
+    job.save(update_fields=['status', 'started_at'])
+
+    try:
+        hackathon = job.hackathon
+        participants = load_participants(hackathon)
+        teams = form_teams(
+            participants,
+            hackathon.min_team_size,
+            hackathon.max_team_size,
+            workers=workers
+        )
+        job.participant_count = len(participants)
+        job.result = {'teams': teams}
+        job.status = 'completed'
+    except Exception as e:
+        job.status = 'failed'
+        job.error = str(e)
+    job.completed_at = timezone.now()
+    job.save()
+    return job
+
+
+def run_pending_jobs(limit=None, workers=None):
+    """Run queued jobs oldest first; returns the number run"""
+    ran = 0
+    pending = TeamFormationJob.objects.filter(status='pending').order_by('created_at')
+    while limit is None or ran < limit:
+        job_id = pending.values_list('id', flat=True).first()
+        if job_id is None:
+            break
+        # Claim the job so concurrent workers do not run it twice
+        claimed = TeamFormationJob.objects.filter(id=job_id, status='pending').update(
+            status='running'
+        )
+        if claimed:
+            run_team_formation_job(job_id, workers=workers)
+            ran += 1
+    return ran
@@ -0,0 +1,110 @@
+"""
+Cached team health scores and their history
+
+The current score of a team is cached for TEAM_HEALTH_CACHE_TIMEOUT
+seconds and dropped by signal handlers whenever the team's tasks or
+memberships change. Each transaction that changes a team also appends a
+TeamHealthPoint for it once it commits, and the record_team_health command appends points on
+a schedule (catching tasks that became overdue), so trend charts read
+stored points instead of recomputing from raw tasks. A point is only
+appended when the score differs from the team's previous point.
+"""
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+
+from .models import Team, TeamHealthPoint
+from .utils import annotate_team_health, team_health_score, calculate_team_health_score
+
+
+# Teams changed by the current thread's transaction, recorded when it commits
+_pending = threading.local()
+
+
+def health_cache_key(team_id):
+    return f'team-health:{team_id}'
+
+
+def get_current_health(team):
+    """The team's current health score, computed on a cache miss"""
+    key = health_cache_key(team.id)
+    health_score = cache.get(key)
+    if health_score is None:
+        health_score = calculate_team_health_score(team)
+        cache.set(key, health_score, settings.TEAM_HEALTH_CACHE_TIMEOUT)
+    return health_score
+
+
+def invalidate_team_health(team_id):
+    cache.delete(health_cache_key(team_id))
+
+
+def schedule_team_health(team_id):
+    """Record a point for the team once, when the current transaction commits"""
+    _pending.team_ids = getattr(_pending, 'team_ids', set())
+    _pending.team_ids.add(team_id)
+    # Every change registers the flush, so a rollback that discards some of
+    # them cannot leave pending teams without one; the first flush to run
+    # records the whole batch and the rest find nothing left to do
+    transaction.on_commit(_flush_team_health)
+
+
+def _flush_team_health():
+    team_ids = getattr(_pending, 'team_ids', None)
+    if not team_ids:
+        return
+    _pending.team_ids = set()
+    record_team_health(Team.objects.filter(id__in=team_ids))
+
+
+def record_team_health(teams, now=None, batch_size=1000):
+    """
+    Append a health point for every team in the ``teams`` queryset whose
+    score changed since its last point; returns the number appended
+    """
+    now = now or timezone.now()
+    last_score = TeamHealthPoint.objects.filter(team=OuterRef('pk')).order_by(
+        '-recorded_at'
+    ).values('health_score')[:1]
+    teams = annotate_team_health(teams, now).annotate(
+        last_health_score=Subquery(last_score)
+    ).order_by('id')
+
+    recorded = 0
+    points, scores = [], {}
+    for team in teams.iterator(chunk_size=batch_size):
+        health_score = team_health_score(team)
+        scores[health_cache_key(team.id)] = health_score
+        if health_score == team.last_health_score:
+            continue
+        points.append(TeamHealthPoint(
+            team_id=team.id,
+            health_score=health_score,
+            task_count=team.health_task_count,
+            done_count=team.health_done_count,
+            overdue_count=team.health_overdue_count,
+            member_count=team.member_count,
+            recorded_at=now,
+        ))
+        if len(points) >= batch_size:
+            TeamHealthPoint.objects.bulk_create(points)
+            recorded += len(points)
+            points = []
+    TeamHealthPoint.objects.bulk_create(points)
+
+    cache.set_many(scores, settings.TEAM_HEALTH_CACHE_TIMEOUT)
+    return recorded + len(points)
+
+
+def health_history(team, since=None):
+    """Stored health points of a team in chronological order"""
+    points = TeamHealthPoint.objects.filter(team=team)
+    if since is not None:
+        points = points.filter(recorded_at__gte=since)
+    return list(points.values(
+        'recorded_at', 'health_score', 'task_count', 'done_count', 'overdue_count', 'member_count'
+    ))
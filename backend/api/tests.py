@@ -1,10 +1,45 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, transaction
+from django.core.management import call_command
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.core.cache import cache
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.db.models import Sum
+from django.db.models.fields.json import HasKeys
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
-from .models import UserProfile, Skill, Hackathon, Team, Task
+from .models import (
+    UserProfile, Skill, Hackathon, Team, Task, MatchingPreference, TeamMembership,
+    TeamFormationJob, RecommendationFeed, SkillTrendBucket, HackathonAnalytics, TaskComment,
+    TeamInvitation, TeamHealthPoint
+)
+from .matching import calculate_compatibility_score, rank_candidates
+from .serializers import TaskSerializer, TeamSerializer
+from .utils import (
+    filter_profiles_by_skills, get_hackathon_analytics, calculate_team_health_score,
+    member_count_mismatches, reconcile_member_counts, json_list_filter, lowered_json
+)
+from .team_formation import form_teams, load_participants, run_pending_jobs
+from .lsh import shortlist, measure_recall, rebuild_index, rank_candidates_lsh
+from .availability import availability_mask, hex_to_mask, shared_hours
+from .locations import parse_location
+from .feeds import refresh_feeds
+from .aggregates import json_element_counts
+from .analytics import refresh_snapshots, mark_stale
+from .team_health import record_team_health
+from .trending import (
+    counter_mismatches, rebuild_counters, aggregate_skills, top_skills, compact_buckets, parse_window,
+    record_skill_events, trending_in_window
+)
 
 
 class AuthenticationTestCase(APITestCase):
@@ -68,6 +103,9 @@ class UserProfileTestCase(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['user']['username'], 'testuser')
 
+        response = self.client.get(url, {'expand': ''})
+        self.assertEqual(response.data['user'], self.user.id)
+
     def test_update_user_profile(self):
         """Test updating user profile"""
         url = reverse('user_profile')
@@ -104,6 +142,47 @@ class HackathonTestCase(APITestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
+    def test_filter_hackathons_by_json_lists(self):
+        """Test required_skills/themes filters match whole list elements"""
+        fields = {
+            'description': 'Test description',
+            'short_description': 'Test',
+            'location_type': 'remote',
+            'start_date': '2024-12-01T10:00:00Z',
+            'end_date': '2024-12-03T18:00:00Z',
+            'registration_deadline': '2024-11-25T23:59:59Z',
+            'organizer': 'Test Organizer',
+            'created_by': self.user,
+        }
+        java = Hackathon.objects.create(
+            title='Java', required_skills=['Java', 'SQL'], themes=['Fintech'], **fields
+        )
+        Hackathon.objects.create(
+            title='JS', required_skills=['JavaScript'], themes=['AI', 'Fintech'], **fields
+        )
+        url = reverse('hackathon_list')
+
+        response = self.client.get(url, {'required_skills': 'Java'})
+        self.assertEqual([item['id'] for item in response.data['results']], [java.id])
+
+        response = self.client.get(url, {'themes': 'Fintech'})
+        self.assertEqual(response.data['count'], 2)
+
+        response = self.client.get(url, {'required_skills': 'Java,Go', 'match': 'all'})
+        self.assertEqual(response.data['count'], 0)
+
+        response = self.client.get(url, {'required_skills': 'java,sql', 'match': 'all'})
+        self.assertEqual([item['id'] for item in response.data['results']], [java.id])
+
+    def test_json_list_filter_ignores_case_on_postgres(self):
+        """Test the PostgreSQL lookup compares lower-cased elements against lower-cased values"""
+        with mock.patch.object(connection, 'vendor', 'postgresql'):
+            q = json_list_filter('required_skills', ['Python', 'Go'], match='all')
+        lookup, = q.children
+        self.assertIsInstance(lookup, HasKeys)
+        self.assertEqual(lookup.rhs, ['python', 'go'])
+        self.assertEqual(lookup.lhs, lowered_json('required_skills'))
+
     def test_create_hackathon(self):
         """Test creating a hackathon"""
         url = reverse('hackathon_list')
@@ -167,6 +246,29 @@ class TeamTestCase(APITestCase):
             user=self.user,
             role='leader'
         ).exists())
+        self.assertEqual(response.data['member_count'], 1)
+
+        # Editing the team must not overwrite the maintained count
+        TeamMembership.objects.create(
+            team=team, user=User.objects.create(username='member'), status='accepted'
+        )
+        response = self.client.patch(reverse('team_detail', args=[team.id]), {'description': 'Updated'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        team.refresh_from_db()
+        self.assertEqual((team.description, team.current_size), ('Updated', 2))
+
+    def test_filter_teams_by_required_skills(self):
+        """Test the required_skills filter on the team list"""
+        Team.objects.create(
+            name='Go Team', hackathon=self.hackathon, leader=self.user, required_skills=['Go']
+        )
+        rust = Team.objects.create(
+            name='Rust Team', hackathon=self.hackathon, leader=self.user,
+            required_skills=['Rust', 'Go']
+        )
+
+        response = self.client.get(reverse('team_list'), {'required_skills': 'Rust'})
+        self.assertEqual([item['id'] for item in response.data['results']], [rust.id])
 
 
 class ModelTestCase(TestCase):
@@ -185,6 +287,25 @@ class ModelTestCase(TestCase):
         self.assertEqual(str(profile), "testuser's Profile")
         self.assertTrue(profile.is_available)
 
+    def test_parse_location(self):
+        """Test free-text locations are parsed into country and city codes"""
+        self.assertEqual(parse_location('Bengaluru, India'), ('in', 'bengaluru'))
+        self.assertEqual(parse_location('London, United Kingdom'), ('gb', 'london'))
+        self.assertEqual(parse_location('Germany'), ('de', ''))
+        self.assertEqual(parse_location('Mumbai, IN'), ('in', 'mumbai'))
+        self.assertEqual(parse_location('Berlin, DE'), ('de', 'berlin'))
+        self.assertEqual(parse_location('Austin, TX'), ('us', 'austin'))
+        self.assertEqual(parse_location('San Francisco, California'), ('us', 'san francisco'))
+        self.assertEqual(parse_location('Atlanta, Georgia'), ('georgia', 'atlanta'))
+
+        # State codes that are also country codes are kept as given, whatever the city
+        self.assertEqual(parse_location('Fresno, CA'), ('ca', 'fresno'))
+        self.assertEqual(parse_location('San Francisco, CA'), ('ca', 'san francisco'))
+        self.assertEqual(parse_location('Springfield, IL'), ('il', 'springfield'))
+        self.assertEqual(parse_location('Chicago, IL'), ('il', 'chicago'))
+        self.assertEqual(parse_location('Denver, CO'), ('co', 'denver'))
+        self.assertEqual(parse_location(''), ('', ''))
+
     def test_skill_creation(self):
         """Test skill creation"""
         skill = Skill.objects.create(
@@ -217,3 +338,1328 @@ class ModelTestCase(TestCase):
 
         self.assertEqual(team.current_size, 0)  # No members added yet
         self.assertFalse(team.is_full)
+
+    def create_team(self, *membership_statuses):
+        hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+        team = Team.objects.create(name='Test Team', hackathon=hackathon, leader=self.user, max_members=2)
+        for i, membership_status in enumerate(membership_statuses):
+            TeamMembership.objects.create(
+                team=team, user=User.objects.create(username=f'member{i}'), status=membership_status
+            )
+        team.refresh_from_db()
+        return team
+
+    def test_team_size_counts_accepted_members(self):
+        """Test only accepted members count towards the team size"""
+        team = self.create_team('accepted', 'pending', 'left', 'accepted')
+        self.assertEqual(team.current_size, 2)
+        self.assertTrue(team.is_full)
+
+        # Leaving frees the seat again
+        membership = TeamMembership.objects.filter(team=team, status='accepted').first()
+        membership.status = 'left'
+        membership.save()
+        TeamMembership.objects.filter(team=team, status='pending').delete()
+        team.refresh_from_db()
+        self.assertEqual(team.current_size, 1)
+        self.assertEqual(list(Team.objects.open()), [team])
+
+    def test_team_edit_keeps_member_count(self):
+        """Test editing a stale team instance keeps the maintained count"""
+        stale = self.create_team('accepted')
+        TeamMembership.objects.create(team=stale, user=User.objects.create(username='late'), status='accepted')
+
+        serializer = TeamSerializer(stale, data={'description': 'Edited'}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        team = Team.objects.get(id=stale.id)
+        self.assertEqual((team.description, team.current_size), ('Edited', 2))
+
+    def test_reconcile_member_counts(self):
+        """Test drifted member counts are reported and repaired"""
+        team = self.create_team('accepted', 'accepted')
+        Team.objects.filter(id=team.id).update(member_count=5)
+        self.assertEqual(member_count_mismatches(), {team.id: (5, 2)})
+        reconcile_member_counts()
+        self.assertEqual(member_count_mismatches(), {})
+
+    def test_member_count_never_negative(self):
+        """Test a drifted count never goes below zero"""
+        team = self.create_team('accepted')
+        Team.objects.filter(id=team.id).update(member_count=0)
+        TeamMembership.objects.get(team=team).delete()
+        team.refresh_from_db()
+        self.assertEqual(team.current_size, 0)
+
+    def test_team_save_reinserts_deleted_row(self):
+        """Test saving a team whose row was deleted inserts it again"""
+        team = self.create_team()
+        Team.objects.filter(id=team.id).delete()
+        team.save()
+        self.assertTrue(Team.objects.filter(id=team.id).exists())
+
+    def test_team_size_annotation(self):
+        """Test current_size reads with_member_counts() over the stored count"""
+        team = self.create_team('accepted', 'pending', 'accepted')
+        Team.objects.filter(id=team.id).update(member_count=0)
+
+        self.assertEqual(Team.objects.get(id=team.id).current_size, 0)
+        with self.assertNumQueries(1):
+            annotated = Team.objects.with_member_counts().get(id=team.id)
+            self.assertEqual(annotated.current_size, 2)
+            self.assertTrue(annotated.is_full)
+
+
+class MatchingTestCase(APITestCase):
+    """Test teammate matching"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        self.profile = UserProfile.objects.create(
+            user=self.user,
+            skills=['Python', 'Django', 'React'],
+            experience_level='intermediate',
+            preferred_roles=['backend_dev'],
+            timezone='UTC'
+        )
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def create_candidate(self, username, **profile_fields):
+        user = User.objects.create(username=username)
+        return UserProfile.objects.create(user=user, **profile_fields)
+
+    def test_vector_score_matches_pairwise_score(self):
+        """Test the batched engine scores exactly like the pairwise function"""
+        candidates = [
+            self.create_candidate('c1', skills=['Python'], experience_level='expert'),
+            self.create_candidate('c2', skills=['Go', 'Rust'], preferred_roles=['backend_dev'],
+                                  timezone='UTC'),
+            self.create_candidate('c3', skills=['React', 'Django', 'Python'],
+                                  preferred_roles=['designer'], timezone='Asia/Kolkata'),
+            self.create_candidate('c4'),
+        ]
+
+        ranked = rank_candidates(self.profile, UserProfile.objects.exclude(user=self.user), limit=10)
+        scores = {profile.id: score for profile, score in ranked}
+
+        self.assertEqual(len(ranked), len(candidates))
+        for candidate in candidates:
+            self.assertEqual(
+                scores[candidate.id],
+                calculate_compatibility_score(self.profile, candidate)
+            )
+
+    def test_find_teammates_considers_full_candidate_pool(self):
+        """Test the best match is found even beyond the first 50 candidates"""
+        for i in range(60):
+            self.create_candidate(f'filler{i}', skills=['COBOL'], experience_level='expert')
+        best = self.create_candidate(
+            'best',
+            skills=['Python', 'Django', 'React'],
+            experience_level='intermediate',
+            preferred_roles=['designer'],
+            timezone='UTC'
+        )
+
+        response = self.client.get(reverse('find_teammates'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 20)
+        self.assertEqual(response.data[0]['id'], best.id)
+        self.assertEqual(response.data[0]['compatibility_score'], 100)
+
+    def test_preferred_skills_match_exact_skill_names(self):
+        """Test skill filtering does not treat 'Java' as matching 'JavaScript'"""
+        java = self.create_candidate('java_dev', skills=['java'])
+        self.create_candidate('js_dev', skills=['JavaScript'])
+        MatchingPreference.objects.create(user=self.user, preferred_skills=['Java'])
+
+        response = self.client.get(reverse('find_teammates'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data], [java.id])
+
+    def test_skill_links_follow_profile_skills(self):
+        """Test the ProfileSkill relation is kept in sync with the skills JSON"""
+        candidate = self.create_candidate('dev', skills=['Go', 'Rust'])
+        profiles = UserProfile.objects.all()
+        self.assertTrue(filter_profiles_by_skills(profiles, ['rust']).filter(id=candidate.id).exists())
+
+        candidate.skills = ['Go']
+        candidate.save()
+        self.assertFalse(filter_profiles_by_skills(profiles, ['Rust']).filter(id=candidate.id).exists())
+        self.assertEqual(Skill.objects.filter(normalized_name='go').count(), 1)
+
+    def test_profile_skills_stay_out_of_catalogue(self):
+        """Test free-form profile skills are linked privately, not listed in /skills/"""
+        Skill.objects.create(name='Elixir', category='backend')
+        self.create_candidate('dev', skills=['elixir', 'Elxir'])
+
+        self.assertEqual(Skill.objects.filter(normalized_name='elixir').count(), 1)
+        self.assertFalse(Skill.objects.get(normalized_name='elxir').is_public)
+        response = self.client.get(reverse('skill_list'))
+        self.assertEqual([skill['name'] for skill in response.data['results']], ['Elixir'])
+
+    def test_search_users_matches_partial_skill_names(self):
+        """Test user search keeps matching substrings of skill names"""
+        candidate = self.create_candidate('dev', skills=['PostgreSQL'])
+        response = self.client.get(reverse('search_users'), {'q': 'postgres'})
+        self.assertEqual([user['id'] for user in response.data], [candidate.user.id])
+
+    def test_find_teammates_results_are_cached(self):
+        """Test repeated polls are served from the match cache"""
+        self.create_candidate('dev', skills=['Python'])
+        url = reverse('find_teammates')
+        first = self.client.get(url)
+
+        with self.assertNumQueries(3):  # user, profile, preferences
+            second = self.client.get(url)
+        self.assertEqual(first.data, second.data)
+
+    def test_match_cache_invalidated_by_candidate_changes(self):
+        """Test a candidate becoming unavailable invalidates cached matches"""
+        candidate = self.create_candidate('dev', skills=['Python'])
+        url = reverse('find_teammates')
+        self.assertEqual(len(self.client.get(url).data), 1)
+
+        candidate.is_available = False
+        candidate.save()
+        self.assertEqual(self.client.get(url).data, [])
+
+    def test_match_cache_invalidated_by_own_preferences(self):
+        """Test saving matching preferences invalidates the user's cached matches"""
+        self.create_candidate('dev', skills=['Python'], experience_level='expert')
+        url = reverse('find_teammates')
+        self.assertEqual(len(self.client.get(url).data), 1)
+
+        MatchingPreference.objects.create(
+            user=self.user, experience_level_preference=['beginner']
+        )
+        self.assertEqual(self.client.get(url).data, [])
+
+    def test_match_cache_scoped_to_listed_candidates(self):
+        """Test only edits of listed candidates (profile or user) invalidate cached matches"""
+        candidate = self.create_candidate('dev', skills=['Python'])
+        outsider = self.create_candidate('outsider', is_available=False)
+        url = reverse('find_teammates')
+        self.client.get(url)
+
+        outsider.bio = 'Changed'
+        outsider.save()
+        with self.assertNumQueries(3):  # user, profile, preferences
+            self.client.get(url)
+
+        candidate.user.first_name = 'Renamed'
+        candidate.user.save(update_fields=['first_name'])
+        response = self.client.get(url)
+        self.assertEqual(response.data[0]['user']['first_name'], 'Renamed')
+
+    def test_match_cache_invalidated_by_newly_qualifying_candidates(self):
+        """Test profiles becoming available or gaining a shared skill enter cached results"""
+        for i in range(20):
+            self.create_candidate(f'filler{i}', skills=['Python'])
+        url = reverse('find_teammates')
+        self.client.get(url)
+
+        stranger = self.create_candidate('stranger', skills=['Cobol'])
+        with self.assertNumQueries(3):  # user, profile, preferences
+            self.client.get(url)
+
+        stranger.skills = ['Python', 'Django', 'React']
+        stranger.save()
+        self.assertEqual(self.client.get(url).data[0]['id'], stranger.id)
+
+        away = self.create_candidate('away', skills=['Python', 'Django', 'React'], is_available=False)
+        self.client.get(url)
+        away.is_available = True
+        away.save()
+        self.assertIn(away.id, [result['id'] for result in self.client.get(url).data])
+
+    def test_lsh_shortlist_contains_similar_profiles(self):
+        """Test the LSH index shortlists overlapping skill sets and skips disjoint ones"""
+        twin = self.create_candidate('twin', skills=['python', 'Django', 'React'])
+        stranger = self.create_candidate('stranger', skills=['COBOL', 'Fortran'])
+
+        shortlisted = shortlist(self.profile, UserProfile.objects.exclude(user=self.user))
+        self.assertIn(twin, shortlisted)
+        self.assertNotIn(stranger, shortlisted)
+
+        stranger.skills = ['Python', 'Django', 'React']
+        stranger.save()
+        self.assertIn(stranger, shortlist(self.profile, UserProfile.objects.all()))
+
+    def test_lsh_ranking_tops_up_short_shortlist(self):
+        """Test candidates without a shared bucket fill the results when the shortlist is short"""
+        twin = self.create_candidate('twin', skills=['python', 'Django', 'React'])
+        stranger = self.create_candidate('stranger', skills=['COBOL', 'Fortran'])
+
+        ranked = rank_candidates_lsh(self.profile, UserProfile.objects.exclude(user=self.user))
+        self.assertEqual([profile for profile, _ in ranked], [twin, stranger])
+
+    def test_lsh_top_up_is_ranked_by_score(self):
+        """Test top-up candidates outrank weaker shortlisted ones, as in exact ranking"""
+        twin = self.create_candidate(
+            'twin', skills=['python', 'Django', 'React'], experience_level='expert'
+        )
+        stranger = self.create_candidate(
+            'stranger', skills=['COBOL'], preferred_roles=['designer'], timezone='UTC'
+        )
+        candidates = UserProfile.objects.exclude(user=self.user)
+
+        ranked = rank_candidates_lsh(self.profile, candidates)
+        self.assertEqual([profile for profile, _ in ranked], [stranger, twin])
+        self.assertEqual(ranked, rank_candidates(self.profile, candidates))
+
+        with self.settings(MATCHING_LSH_TOP_UP_SCAN=0):
+            ranked = rank_candidates_lsh(self.profile, candidates)
+        self.assertEqual([profile for profile, _ in ranked], [twin])
+
+    def test_lsh_recall_report(self):
+        """Test rebuilding the index and measuring recall against exact scoring"""
+        for i in range(5):
+            self.create_candidate(f'dev{i}', skills=['Python', 'Django'])
+
+        self.assertEqual(rebuild_index(), 6)
+        report = measure_recall(sample_size=3, k=3)
+        self.assertEqual(report['profiles_sampled'], 3)
+        self.assertEqual(report['recall'], 1.0)
+
+    def test_find_teammates_ranks_by_shared_hours(self):
+        """Test real availability overlap outranks a bare timezone match"""
+        self.profile.availability = {'days': ['mon', 'tue'], 'hours': '09:00-17:00'}
+        self.profile.save()
+        night_owl = self.create_candidate(
+            'night_owl', timezone='UTC',
+            availability={'days': ['mon', 'tue'], 'hours': '20:00-23:00'}
+        )
+        overlapping = self.create_candidate(
+            'overlapping', timezone='Europe/London',
+            availability={'monday': ['08:00-12:00']}
+        )
+
+        response = self.client.get(reverse('find_teammates'))
+        self.assertEqual([item['id'] for item in response.data], [overlapping.id, night_owl.id])
+        self.assertEqual(response.data[1]['shared_hours'], 0)
+
+    def test_location_preferences_use_normalized_codes(self):
+        """Test same_country and same_city filter on parsed location codes"""
+        self.profile.location = 'San Francisco, California'
+        self.profile.save()
+        neighbour = self.create_candidate('neighbour', location='san francisco,  California, USA')
+        compatriot = self.create_candidate('compatriot', location='Austin, TX')
+        self.create_candidate('abroad', location='Toronto, Canada')
+        preferences = MatchingPreference.objects.create(
+            user=self.user, location_preference='same_country'
+        )
+        url = reverse('find_teammates')
+
+        response = self.client.get(url)
+        self.assertEqual({item['id'] for item in response.data}, {neighbour.id, compatriot.id})
+
+        preferences.location_preference = 'same_city'
+        preferences.save()
+        response = self.client.get(url)
+        self.assertEqual([item['id'] for item in response.data], [neighbour.id])
+
+
+class TeamFormationTestCase(APITestCase):
+    """Test batch team formation"""
+
+    def setUp(self):
+        self.organizer = User.objects.create_user(
+            username='organizer',
+            email='organizer@example.com',
+            password='testpassword123'
+        )
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.organizer,
+            min_team_size=2,
+            max_team_size=3
+        )
+        self.team = Team.objects.create(
+            name='Open Team', hackathon=self.hackathon, leader=self.organizer
+        )
+        roles = ['developer', 'designer', 'pm']
+        for i in range(10):
+            user = User.objects.create(username=f'participant{i}')
+            UserProfile.objects.create(
+                user=user,
+                skills=['Python'] if i % 2 else ['Figma'],
+                preferred_roles=[roles[i % 3]],
+                timezone='UTC'
+            )
+            TeamMembership.objects.create(team=self.team, user=user, role=roles[i % 3])
+
+        refresh = RefreshToken.for_user(self.organizer)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_form_teams_respects_team_size_bounds(self):
+        """Test every participant is placed in a team within the size bounds"""
+        participants = load_participants(self.hackathon)
+        teams = form_teams(participants, 2, 3, workers=1)
+
+        placed = [user_id for team in teams for user_id in team['members']]
+        self.assertEqual(sorted(placed), sorted(row[0] for row in participants))
+        for team in teams:
+            self.assertTrue(2 <= team['size'] <= 3)
+
+    def test_teamed_participants_are_excluded(self):
+        """Test users already accepted into a team are not re-placed"""
+        member = User.objects.get(username='participant0')
+        team = Team.objects.create(name='Existing', hackathon=self.hackathon, leader=member)
+        TeamMembership.objects.create(team=team, user=member, role='leader', status='accepted')
+
+        user_ids = [row[0] for row in load_participants(self.hackathon)]
+        self.assertNotIn(member.id, user_ids)
+
+    def test_only_hackathon_participants_are_placed(self):
+        """Test profiles without a membership or invitation in the hackathon are left out"""
+        outsider = User.objects.create(username='outsider')
+        UserProfile.objects.create(user=outsider, skills=['Python'])
+        invited = User.objects.create(username='invited')
+        UserProfile.objects.create(user=invited, skills=['Go'])
+        TeamInvitation.objects.create(
+            team=self.team, invited_user=invited, invited_by=self.organizer, role='developer',
+            expires_at=timezone.now() + timedelta(days=7)
+        )
+
+        user_ids = [row[0] for row in load_participants(self.hackathon)]
+        self.assertNotIn(outsider.id, user_ids)
+        self.assertIn(invited.id, user_ids)
+        self.assertEqual(len(user_ids), 11)
+
+    def test_team_formation_job_api(self):
+        """Test starting a job through the API and polling its result"""
+        url = reverse('start_team_formation', args=[self.hackathon.id])
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+
+        self.assertEqual(run_pending_jobs(workers=1), 1)
+        self.assertEqual(run_pending_jobs(workers=1), 0)
+        response = self.client.get(reverse('team_formation_job', args=[response.data['id']]))
+        self.assertEqual(response.data['status'], 'completed')
+        self.assertEqual(response.data['participant_count'], 10)
+        self.assertEqual(
+            sum(team['size'] for team in response.data['result']['teams']), 10
+        )
+
+    def test_only_organizer_can_start_team_formation(self):
+        """Test other users cannot run team formation"""
+        other = User.objects.create(username='other')
+        self.client.force_authenticate(other)
+        response = self.client.post(reverse('start_team_formation', args=[self.hackathon.id]))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(TeamFormationJob.objects.exists())
+
+
+class AvailabilityTestCase(TestCase):
+    """Test weekly availability bitmasks"""
+
+    def test_mask_is_aligned_to_utc(self):
+        """Test local hours are shifted into UTC, wrapping around the week"""
+        mask = availability_mask({'monday': '01:00-03:00'}, 'Asia/Kolkata')
+        # 01:00-03:00 IST is Sunday 19:30-21:30 UTC
+        self.assertEqual(mask, (1 << 163) | (1 << 164) | (1 << 165))
+
+    def test_day_list_and_overnight_ranges(self):
+        """Test the days/hours format and ranges running past midnight"""
+        mask = availability_mask({'days': ['Sat'], 'hours': {'start': '22:00', 'end': '02:00'}})
+        self.assertEqual(mask.bit_count(), 4)
+        self.assertTrue(mask >> (5 * 24 + 22) & 1)
+        self.assertTrue(mask >> (6 * 24 + 1) & 1)
+
+    def test_unparseable_availability_has_no_mask(self):
+        """Test invalid availability is ignored rather than raising"""
+        self.assertIsNone(availability_mask({}))
+        self.assertIsNone(availability_mask({'monday': 'whenever'}))
+
+    def test_profile_save_derives_mask(self):
+        """Test the mask column is derived on save and overlaps are popcounts"""
+        first = UserProfile.objects.create(
+            user=User.objects.create(username='first'),
+            availability={'days': ['mon'], 'hours': '09:00-17:00'}
+        )
+        second = UserProfile.objects.create(
+            user=User.objects.create(username='second'),
+            availability={'mon': ['15:00-20:00']}
+        )
+        self.assertEqual(len(first.availability_mask), 42)
+        self.assertEqual(
+            shared_hours(hex_to_mask(first.availability_mask), hex_to_mask(second.availability_mask)),
+            2
+        )
+
+
+class RecommendationTestCase(APITestCase):
+    """Test personalized recommendations"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        UserProfile.objects.create(user=self.user, skills=['Python', 'Figma'])
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def create_team(self, name, required_skills, member_skills, max_members=4):
+        leader = User.objects.create(username=f'{name}_leader')
+        UserProfile.objects.create(user=leader, skills=member_skills)
+        team = Team.objects.create(
+            name=name,
+            hackathon=self.hackathon,
+            leader=leader,
+            max_members=max_members,
+            required_skills=required_skills
+        )
+        TeamMembership.objects.create(team=team, user=leader, role='leader', status='accepted')
+        return team
+
+    def test_teams_ranked_by_unmet_skill_coverage(self):
+        """Test teams are ranked by the unmet skills the user covers, full teams excluded"""
+        covered = self.create_team('covered', ['Python', 'React'], ['Python'])
+        needs_me = self.create_team('needs_me', ['Python', 'Figma'], ['Go'])
+        self.create_team('full', ['Python', 'Figma'], ['Go'], max_members=1)
+
+        response = self.client.get(reverse('user_recommendations'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        teams = response.data['teams']
+        self.assertEqual([team['id'] for team in teams], [needs_me.id, covered.id])
+        self.assertEqual(teams[0]['fit_score'], 95)
+        self.assertEqual(teams[1]['fit_score'], 15)
+        self.assertEqual(teams[0]['leader']['username'], needs_me.leader.username)
+        self.assertEqual(teams[0]['hackathon']['id'], needs_me.hackathon_id)
+        self.assertIn('user', teams[0]['memberships'][0])
+
+    def test_recommendations_served_from_feed(self):
+        """Test the endpoint reads the stored feed until a worker refreshes it"""
+        self.create_team('needs_me', ['Python'], ['Go'])
+        url = reverse('user_recommendations')
+        first = self.client.get(url)
+        self.assertEqual(len(first.data['teams']), 1)
+        self.assertFalse(first.data['is_stale'])
+
+        with self.assertNumQueries(2):  # user, feed
+            second = self.client.get(url)
+        self.assertEqual(second.data['refreshed_at'], first.data['refreshed_at'])
+
+    def test_feed_marked_stale_and_refreshed(self):
+        """Test relevant changes flag feeds stale and the worker rebuilds them"""
+        url = reverse('user_recommendations')
+        self.assertEqual(self.client.get(url).data['teams'], [])
+
+        self.create_team('needs_me', ['Figma'], ['Go'])
+        response = self.client.get(url)
+        self.assertTrue(response.data['is_stale'])
+        self.assertEqual(response.data['teams'], [])
+
+        self.assertEqual(refresh_feeds(), 1)
+        response = self.client.get(url)
+        self.assertFalse(response.data['is_stale'])
+        self.assertEqual(len(response.data['teams']), 1)
+
+        profile = self.user.profile
+        profile.skills = ['Go']
+        profile.save()
+        self.assertTrue(RecommendationFeed.objects.get(user=self.user).is_stale)
+
+
+    def test_stale_marking_scoped_to_matching_users(self):
+        """Test teams only flag feeds sharing a skill, and filling a team flags them too"""
+        other = User.objects.create(username='other')
+        UserProfile.objects.create(user=other, skills=['COBOL'])
+        self.client.get(reverse('user_recommendations'))
+        RecommendationFeed.objects.create(user=other, refreshed_at=timezone.now())
+
+        team = self.create_team('needs_me', ['Figma'], ['Go'], max_members=2)
+        self.assertTrue(RecommendationFeed.objects.get(user=self.user).is_stale)
+        self.assertFalse(RecommendationFeed.objects.get(user=other).is_stale)
+
+        refresh_feeds()
+        self.assertEqual(len(self.client.get(reverse('user_recommendations')).data['teams']), 1)
+
+        joiner = User.objects.create(username='joiner')
+        TeamMembership.objects.create(team=team, user=joiner, role='developer', status='accepted')
+        self.assertTrue(RecommendationFeed.objects.get(user=self.user).is_stale)
+        self.assertFalse(RecommendationFeed.objects.get(user=other).is_stale)
+        refresh_feeds()
+        self.assertEqual(self.client.get(reverse('user_recommendations')).data['teams'], [])
+
+
+class TrendingSkillsTestCase(APITestCase):
+    """Test trending skill counters"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        self.profile = UserProfile.objects.create(user=self.user, skills=['Python', 'Go'])
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_counters_follow_profile_and_team_changes(self):
+        """Test counters are updated incrementally on save and delete"""
+        team = Team.objects.create(
+            name='Team', hackathon=self.hackathon, leader=self.user, required_skills=['Go']
+        )
+        self.profile.skills = ['Go', 'Rust']
+        self.profile.save()
+
+        response = self.client.get(reverse('trending_skills'))
+        self.assertEqual(response.data, [
+            {'skill': 'Go', 'count': 3},
+            {'skill': 'Rust', 'count': 1},
+        ])
+        self.assertEqual(counter_mismatches(), {})
+
+        team.delete()
+        self.assertEqual(self.client.get(reverse('trending_skills')).data[0], {'skill': 'Go', 'count': 1})
+        self.assertEqual(counter_mismatches(), {})
+
+    def test_trending_skills_is_a_single_query(self):
+        """Test the endpoint reads the counter table only"""
+        url = reverse('trending_skills')
+        with self.assertNumQueries(2):  # user, counters
+            self.client.get(url)
+
+    def test_rebuild_repairs_drift(self):
+        """Test rebuilding counters after updates that bypass signals"""
+        UserProfile.objects.filter(id=self.profile.id).update(skills=['Haskell'])
+        self.assertIn('Haskell', counter_mismatches())
+
+        rebuild_counters()
+        self.assertEqual(counter_mismatches(), {})
+        self.assertEqual(self.client.get(reverse('trending_skills')).data, [{'skill': 'Haskell', 'count': 1}])
+
+    def test_window_ranks_recent_activity(self):
+        """Test windowed trends decay older additions and ignore removals"""
+        now = timezone.now()
+        SkillTrendBucket.objects.all().delete()
+        record_skill_events({'Rust': 4}, now=now - timedelta(days=5))
+        record_skill_events({'Go': 3}, now=now)
+
+        trends = trending_in_window(timedelta(days=7), now=now)
+        self.assertEqual([entry['skill'] for entry in trends], ['Go', 'Rust'])
+        self.assertEqual(trends[1]['count'], 4)
+        self.assertLess(trends[1]['score'], 4)
+        self.assertEqual(trending_in_window(timedelta(days=1), now=now)[0]['skill'], 'Go')
+
+        self.profile.skills = []
+        self.profile.save()
+        self.assertEqual(SkillTrendBucket.objects.filter(skill='Go').aggregate(total=Sum('count'))['total'], 3)
+
+    def test_window_prorates_straddling_daily_bucket(self):
+        """Test a daily bucket half inside the window counts half"""
+        now = timezone.now()
+        SkillTrendBucket.objects.all().delete()
+        SkillTrendBucket.objects.create(
+            skill='Rust', granularity='day', bucket_start=now - timedelta(days=7, hours=12), count=4
+        )
+        SkillTrendBucket.objects.create(
+            skill='Go', granularity='day', bucket_start=now - timedelta(days=8, hours=1), count=9
+        )
+
+        trends = trending_in_window(timedelta(days=7), now=now)
+        self.assertEqual([(entry['skill'], entry['count']) for entry in trends], [('Rust', 2)])
+
+
+        """Test the window query parameter"""
+        self.profile.skills = ['Python', 'Go', 'Elixir']
+        self.profile.save()
+
+        response = self.client.get(reverse('trending_skills'), {'window': '24h'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Elixir', [entry['skill'] for entry in response.data])
+
+        for window in ('week', '0d', '365d'):
+            response = self.client.get(reverse('trending_skills'), {'window': window})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(parse_window('36h'), timedelta(hours=36))
+
+    def test_database_aggregation_matches_counters(self):
+        """Test unnesting JSON lists in the database agrees with the counters"""
+        Team.objects.create(
+            name='Team', hackathon=self.hackathon, leader=self.user,
+            required_skills=['Go', 'SQL', 7, '']
+        )
+        UserProfile.objects.create(
+            user=User.objects.create(username='other'), skills=['Go', 'Python', {'x': 1}]
+        )
+
+        self.assertEqual(aggregate_skills(limit=10), top_skills(limit=10))
+        self.assertEqual(aggregate_skills(limit=1), [{'skill': 'Go', 'count': 4}])
+        self.assertEqual(
+            json_element_counts([(Team.objects.all(), 'required_skills', 1)]),
+            [('Go', 1), ('SQL', 1)]
+        )
+
+    def test_hackathon_filter(self):
+        """Test skills restricted to a hackathon's teams and accepted members"""
+        team = Team.objects.create(
+            name='Team', hackathon=self.hackathon, leader=self.user, required_skills=['SQL']
+        )
+        UserProfile.objects.create(user=User.objects.create(username='outsider'), skills=['Cobol'])
+        TeamMembership.objects.create(team=team, user=self.user, status='accepted')
+
+        url = reverse('trending_skills')
+        response = self.client.get(url, {'hackathon': self.hackathon.id})
+        self.assertEqual(response.data, [
+            {'skill': 'SQL', 'count': 2},
+            {'skill': 'Go', 'count': 1},
+            {'skill': 'Python', 'count': 1},
+        ])
+        self.assertEqual(
+            self.client.get(url, {'hackathon': 'x'}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+    def test_compaction_rolls_hours_into_days(self):
+        """Test old hourly buckets become daily buckets and expired ones are dropped"""
+        now = timezone.now()
+        SkillTrendBucket.objects.all().delete()
+        old = (now - timedelta(days=4)).replace(hour=10)
+        record_skill_events({'Go': 1}, now=old)
+        record_skill_events({'Go': 2}, now=old + timedelta(hours=3))
+        record_skill_events({'Go': 5}, now=now - timedelta(days=120))
+
+        compact_buckets(now)
+        buckets = list(SkillTrendBucket.objects.values_list('granularity', 'count'))
+        self.assertEqual(buckets, [('day', 3)])
+
+
+class HackathonAnalyticsTestCase(APITestCase):
+    """Test hackathon analytics"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='organizer')
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+        self.url = reverse('hackathon_analytics', args=[self.hackathon.id])
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def create_teams(self, count, members_per_team):
+        users = User.objects.bulk_create([
+            User(username=f'member-{count}-{i}') for i in range(count * members_per_team)
+        ])
+        teams = Team.objects.bulk_create([
+            Team(
+                name=f'Team {count}-{i}', hackathon=self.hackathon, leader=self.user,
+                required_skills=['Python'], is_recruiting=i % 2 == 0
+            )
+            for i in range(count)
+        ])
+        TeamMembership.objects.bulk_create([
+            TeamMembership(team=team, user=users[i * members_per_team + j], status='accepted')
+            for i, team in enumerate(teams)
+            for j in range(members_per_team)
+        ])
+        # bulk_create skips the signal handlers that maintain member_count
+        reconcile_member_counts()
+        return teams
+
+    def test_sizes_and_statuses(self):
+        """Test per-status membership counts and real averages/medians"""
+        teams = self.create_teams(3, 2)
+        extra = User.objects.create(username='extra')
+        TeamMembership.objects.create(team=teams[0], user=extra, status='accepted')
+        TeamMembership.objects.create(team=teams[1], user=extra, status='pending')
+        Team.objects.create(name='Empty', hackathon=self.hackathon, leader=self.user)
+
+        data = self.client.get(self.url).data
+        self.assertEqual(data['total_teams'], 4)
+        self.assertEqual(data['total_participants'], 7)
+        self.assertEqual(data['team_size_distribution'], {'0': 1, '2': 2, '3': 1})
+        self.assertEqual(data['average_team_size'], 1.75)
+        self.assertEqual(data['median_team_size'], 2)
+        self.assertEqual(data['membership_counts']['accepted'], 7)
+        self.assertEqual(data['membership_counts']['pending'], 1)
+        self.assertEqual(data['teams_recruiting'], 3)
+        self.assertEqual(data['skill_distribution'], {'Python': 3})
+
+    def test_query_count_is_independent_of_team_count(self):
+        """Test analytics use the same number of queries for 1 and 1,000 teams"""
+        self.create_teams(1, 2)
+        with CaptureQueriesContext(connection) as one_team:
+            get_hackathon_analytics(self.hackathon)
+
+        self.create_teams(999, 2)
+        with CaptureQueriesContext(connection) as many_teams:
+            analytics = get_hackathon_analytics(self.hackathon)
+
+        self.assertEqual(analytics['total_teams'], 1000)
+        self.assertEqual(len(many_teams), len(one_team))
+        self.assertLessEqual(len(many_teams), 6)
+
+    def test_snapshot_is_served_until_debounce_expires(self):
+        """Test changes mark the stored snapshot stale and rebuild it after the debounce"""
+        self.create_teams(1, 2)
+        self.assertEqual(self.client.get(self.url).data['total_teams'], 1)
+
+        team = Team.objects.create(name='New', hackathon=self.hackathon, leader=self.user)
+        with self.assertNumQueries(3):  # user, hackathon, snapshot
+            data = self.client.get(self.url).data
+        self.assertEqual(data['total_teams'], 1)
+        self.assertTrue(data['is_stale'])
+
+        with override_settings(HACKATHON_ANALYTICS_DEBOUNCE=0):
+            data = self.client.get(self.url).data
+        self.assertEqual(data['total_teams'], 2)
+        self.assertFalse(data['is_stale'])
+
+        Task.objects.create(title='Task', team=team, created_by=self.user)
+        self.assertTrue(HackathonAnalytics.objects.get(hackathon=self.hackathon).is_stale)
+        self.assertEqual(refresh_snapshots(), 0)
+        with override_settings(HACKATHON_ANALYTICS_DEBOUNCE=0):
+            self.assertEqual(refresh_snapshots(), 1)
+
+    def test_history(self):
+        """Test each change in the figures adds a history point"""
+        self.client.get(self.url)
+        self.create_teams(2, 2)
+        mark_stale(hackathon_id=self.hackathon.id)
+        with override_settings(HACKATHON_ANALYTICS_DEBOUNCE=0):
+            self.client.get(self.url)
+            self.client.get(self.url)
+
+        history_url = reverse('hackathon_analytics_history', args=[self.hackathon.id])
+        history = self.client.get(history_url).data
+        self.assertEqual([point['total_teams'] for point in history], [0, 2])
+
+        since = history[1]['taken_at'].isoformat()
+        self.assertEqual(len(self.client.get(history_url, {'since': since}).data), 1)
+        response = self.client.get(history_url, {'since': 'yesterday'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class HackathonExportTestCase(APITestCase):
+    """Test streaming hackathon exports"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='organizer')
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+        self.team = Team.objects.create(
+            name='Team, "One"', hackathon=self.hackathon, leader=self.user,
+            required_skills=['Python', 'Go']
+        )
+        TeamMembership.objects.create(team=self.team, user=self.user, role='leader', status='accepted')
+        Task.objects.create(title='Task', team=self.team, created_by=self.user, tags=['api'])
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_csv_export(self):
+        """Test teams are streamed as CSV"""
+        url = reverse('export_hackathon_data', args=[self.hackathon.id, 'teams'])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:2], ['id', 'name'])
+        self.assertEqual(rows[1][1], 'Team, "One"')
+        self.assertEqual(json.loads(rows[1][6]), ['Python', 'Go'])
+
+    def test_ndjson_export(self):
+        """Test memberships and tasks are streamed as NDJSON"""
+        for table, key, value in (('memberships', 'role', 'leader'), ('tasks', 'tags', ['api'])):
+            url = reverse('export_hackathon_data', args=[self.hackathon.id, table])
+            response = self.client.get(url, {'fmt': 'ndjson'})
+            lines = b''.join(response.streaming_content).decode().splitlines()
+            self.assertEqual(len(lines), 1)
+            self.assertEqual(json.loads(lines[0])[key], value)
+
+    def test_export_validation(self):
+        """Test unknown tables/formats and non-organizers are rejected"""
+        url = reverse('export_hackathon_data', args=[self.hackathon.id, 'users'])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_400_BAD_REQUEST)
+        url = reverse('export_hackathon_data', args=[self.hackathon.id, 'teams'])
+        self.assertEqual(self.client.get(url, {'fmt': 'xml'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+        other = User.objects.create(username='other')
+        refresh = RefreshToken.for_user(other)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TeamHealthTestCase(APITestCase):
+    """Test team health scores"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='organizer')
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+        cache.clear()
+        self.team = self.create_team('Team')
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def create_team(self, name):
+        with self.captureOnCommitCallbacks(execute=True):
+            team = Team.objects.create(name=name, hackathon=self.hackathon, leader=self.user, max_members=5)
+            TeamMembership.objects.create(team=team, user=self.user, role='leader', status='accepted')
+        return team
+
+    def test_score_components(self):
+        """Test completion, size, activity and overdue components"""
+        # No tasks: 20 neutral + 1/4 of the optimal size + no activity + no overdue
+        self.assertEqual(calculate_team_health_score(self.team), 20 + 5 + 0 + 20)
+
+        Task.objects.create(title='Done', team=self.team, created_by=self.user, status='done')
+        Task.objects.create(
+            title='Late', team=self.team, created_by=self.user,
+            due_date=timezone.now() - timedelta(days=1)
+        )
+        # Half done, two recent tasks, one overdue
+        with self.assertNumQueries(1):
+            self.assertEqual(calculate_team_health_score(self.team), 20 + 5 + 10 + 15)
+
+        response = self.client.get(reverse('team_health', args=[self.team.id]))
+        self.assertEqual(response.data['health_score'], 50)
+        self.assertEqual(response.data['status'], 'needs_improvement')
+
+    def test_hackathon_batch_scores(self):
+        """Test every team is scored with a query count independent of team count"""
+        url = reverse('hackathon_team_health', args=[self.hackathon.id])
+        with CaptureQueriesContext(connection) as one_team:
+            self.client.get(url)
+
+        for i in range(20):
+            team = self.create_team(f'Team {i}')
+            Task.objects.create(title='Task', team=team, created_by=self.user, status='done')
+        with CaptureQueriesContext(connection) as many_teams:
+            response = self.client.get(url)
+
+        self.assertEqual(len(many_teams), len(one_team))
+        self.assertEqual(len(response.data), 21)
+        scores = {row['team_id']: row['health_score'] for row in response.data}
+        self.assertEqual(scores[self.team.id], calculate_team_health_score(self.team))
+        self.assertEqual(response.data[-1]['health_score'], 40 + 5 + 5 + 20)
+
+        other = User.objects.create(username='other')
+        refresh = RefreshToken.for_user(other)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_current_score_is_cached_until_tasks_change(self):
+        """Test the cached score is served until a task changes"""
+        url = reverse('team_health', args=[self.team.id])
+        self.client.get(url)
+        with self.assertNumQueries(3):  # user, team, membership check
+            self.assertEqual(self.client.get(url).data['health_score'], 45)
+
+        Task.objects.create(title='Done', team=self.team, created_by=self.user, status='done')
+        self.assertEqual(self.client.get(url).data['health_score'], 70)
+
+    def test_history(self):
+        """Test changes append history points served by ?since="""
+        url = reverse('team_health', args=[self.team.id])
+        start = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title='Task', team=self.team, created_by=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = 'done'
+            task.save()
+        self.assertEqual(record_team_health(Team.objects.all()), 0)
+
+        response = self.client.get(url, {'since': start.isoformat()})
+        self.assertEqual([point['health_score'] for point in response.data['history']], [30, 70])
+        self.assertEqual(response.data['history'][1]['done_count'], 1)
+        self.assertNotIn('history', self.client.get(url).data)
+        self.assertEqual(
+            self.client.get(url, {'since': 'soon'}).status_code, status.HTTP_400_BAD_REQUEST
+        )
+
+
+    def test_history_recorded_once_per_transaction(self):
+        """Test a commit records one point per changed team"""
+        other = self.create_team('Other')
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(5):
+                Task.objects.create(title=f'Task {i}', team=self.team, created_by=self.user, status='done')
+            Task.objects.create(title='Other', team=other, created_by=self.user, status='done')
+
+        self.assertEqual(TeamHealthPoint.objects.filter(team=self.team).count(), 2)
+        self.assertEqual(TeamHealthPoint.objects.filter(team=other).count(), 2)
+
+    def test_history_recorded_after_rollback(self):
+        """Test a rolled back change does not stop the next commit from recording"""
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                Task.objects.create(title='Lost', team=self.team, created_by=self.user, status='done')
+                raise RuntimeError
+        self.assertEqual(TeamHealthPoint.objects.filter(team=self.team).count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(title='Kept', team=self.team, created_by=self.user, status='done')
+        self.assertEqual(TeamHealthPoint.objects.filter(team=self.team).count(), 2)
+
+    def test_worker_closes_old_connections_every_pass(self):
+        """Test looping workers drop stale connections before each pass"""
+        with mock.patch('api.management.base.close_old_connections') as close, \
+                mock.patch('api.management.base.time.sleep', side_effect=[None, KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command('record_team_health', '--loop', stdout=io.StringIO())
+        self.assertEqual(close.call_count, 2)
+
+class TaskTestCase(APITestCase):
+    """Test task endpoints"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+        self.team = Team.objects.create(name='Team', hackathon=self.hackathon, leader=self.user)
+        TeamMembership.objects.create(team=self.team, user=self.user, role='leader', status='accepted')
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def create_task(self, title, **kwargs):
+        return Task.objects.create(title=title, team=self.team, created_by=self.user, **kwargs)
+
+    def test_overdue_filter(self):
+        """Test overdue tasks are selected in the database"""
+        yesterday = timezone.now() - timedelta(days=1)
+        late = self.create_task('Late', due_date=yesterday)
+        self.create_task('Late but done', due_date=yesterday, status='done')
+        self.create_task('Upcoming', due_date=timezone.now() + timedelta(days=1))
+        self.create_task('No due date')
+
+        self.assertEqual(list(Task.objects.overdue()), [late])
+        self.assertEqual(
+            [task for task in Task.objects.all() if task.is_overdue], [late]
+        )
+
+        url = reverse('task_list')
+        response = self.client.get(url, {'team': self.team.id, 'overdue': 'true'})
+        self.assertEqual([task['title'] for task in response.data['results']], ['Late'])
+        response = self.client.get(url, {'team': self.team.id, 'overdue': 'false'})
+        self.assertEqual(response.data['count'], 3)
+
+        response = self.client.get(reverse('team_dashboard', args=[self.team.id]))
+        self.assertEqual(response.data['stats']['overdue_tasks'], 1)
+        self.assertEqual(response.data['stats']['completed_tasks'], 1)
+        self.assertEqual(response.data['stats']['total_tasks'], 4)
+
+    def test_priority_ordering(self):
+        """Test tasks sort by priority rank rather than alphabetically"""
+        for priority in ('high', 'low', 'urgent', 'medium'):
+            self.create_task(priority, priority=priority)
+
+        expected = ['urgent', 'high', 'medium', 'low']
+        self.assertEqual([task.priority for task in Task.objects.all()], expected)
+
+        url = reverse('task_list')
+        response = self.client.get(url, {'ordering': 'priority'})
+        self.assertEqual([task['priority'] for task in response.data['results']], expected[::-1])
+        response = self.client.get(url, {'ordering': '-priority'})
+        self.assertEqual([task['priority'] for task in response.data['results']], expected)
+
+        task = Task.objects.get(priority='low')
+        task.priority = 'urgent'
+        task.save(update_fields=['priority'])
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, Task.PRIORITY_RANKS['urgent'])
+
+
+class QueryBudgetTestCase(APITestCase):
+    """Test list endpoints load a page in a fixed number of queries"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+        self.task = None
+        self.created = 0
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def populate(self, count):
+        """Add ``count`` teams, each with members, a task, a comment and an invitation"""
+        for i in range(self.created, self.created + count):
+            leader = User.objects.create(username=f'leader{i}')
+            Hackathon.objects.create(
+                title=f'Hackathon {i}', description='', short_description='', location_type='remote',
+                start_date='2024-12-01T10:00:00Z', end_date='2024-12-03T18:00:00Z',
+                registration_deadline='2024-11-25T23:59:59Z', organizer='Org', created_by=leader
+            )
+            team = Team.objects.create(name=f'Team {i}', hackathon=self.hackathon, leader=leader)
+            TeamMembership.objects.create(team=team, user=leader, role='leader', status='accepted')
+            TeamMembership.objects.create(team=team, user=self.user, status='accepted')
+            task = Task.objects.create(
+                title=f'Task {i}', team=team, created_by=leader, assigned_to=self.user
+            )
+            if self.task:
+                task.dependencies.add(self.task)
+            else:
+                self.task = task
+            TaskComment.objects.create(task=self.task, author=leader, content='Comment')
+            TeamInvitation.objects.create(
+                team=team, invited_user=self.user, invited_by=leader, role='developer',
+                expires_at=timezone.now() + timedelta(days=7)
+            )
+        self.created += count
+
+    def assertQueryBudget(self, url, budget):
+        """One item and a full page of 20 items cost the same, bounded, number of queries"""
+        self.populate(1)
+        with CaptureQueriesContext(connection) as one_item:
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+        self.populate(19)
+        with CaptureQueriesContext(connection) as full_page:
+            response = self.client.get(url)
+        results = response.data['results'] if 'results' in response.data else response.data
+        self.assertEqual(len(results), 20)
+        self.assertEqual(len(full_page), len(one_item))
+        self.assertLessEqual(len(full_page), budget)
+
+    def test_team_list_budget(self):
+        self.assertQueryBudget(reverse('team_list'), 6)
+
+    def test_task_list_budget(self):
+        self.assertQueryBudget(reverse('task_list'), 7)
+
+    def test_hackathon_list_budget(self):
+        self.assertQueryBudget(reverse('hackathon_list'), 3)
+
+    def test_task_comment_list_budget(self):
+        self.populate(1)
+        self.assertQueryBudget(reverse('task_comment_list', args=[self.task.id]), 3)
+
+    def test_my_invitations_budget(self):
+        self.assertQueryBudget(reverse('my_invitations'), 5)
+
+    def test_team_list_ids_budget(self):
+        self.assertQueryBudget(reverse('team_list') + '?expand=', 5)
+
+    def test_task_list_ids_budget(self):
+        self.assertQueryBudget(reverse('task_list') + '?expand=', 4)
+
+    def test_my_invitations_ids_budget(self):
+        self.assertQueryBudget(reverse('my_invitations') + '?expand=', 2)
+
+    def test_expanded_task_list_budget(self):
+        url = reverse('task_list') + '?expand=assigned_to,team.hackathon,team.memberships.user'
+        self.assertQueryBudget(url, 7)
+
+    def test_plan_follows_expanded_serializers(self):
+        """Test expanded serializers contribute their relations under their source"""
+        self.assertEqual(TaskSerializer.get_eager_loading(expand=''), ([], ['dependencies']))
+        select, prefetch = TaskSerializer.get_eager_loading()
+        self.assertIn('team__hackathon__created_by', select)
+        self.assertIn('team__teammembership_set__user', prefetch)
+
+        select, prefetch = TaskSerializer.get_eager_loading(
+            expand='team.hackathon.created_by,team.memberships.user'
+        )
+        self.assertIn('team__hackathon__created_by', select)
+        self.assertIn('team__teammembership_set__user', prefetch)
+        self.assertIn('dependencies', prefetch)
+
+        self.assertEqual(TaskSerializer.get_eager_loading(expand='team', fields='id,title'), ([], []))
+        self.assertEqual(
+            TeamSerializer.get_eager_loading(expand=''), ([], ['members', 'teammembership_set'])
+        )
+        self.assertEqual(TeamSerializer.get_eager_loading(fields='id,name'), ([], []))
+
+    def test_relations_nested_by_default(self):
+        """Test relations nest unless ?expand= narrows them, and fields= trims the output"""
+        self.populate(1)
+        url = reverse('task_list')
+        task = self.client.get(url).data['results'][0]
+        self.assertEqual(task['team']['hackathon']['created_by']['id'], self.user.id)
+        self.assertEqual(task['team']['memberships'][0]['user']['username'], self.user.username)
+
+        task = self.client.get(url, {'expand': 'team'}).data['results'][0]
+        self.assertEqual(task['team']['hackathon'], self.task.team.hackathon_id)
+        self.assertEqual(task['assigned_to'], self.user.id)
+        task = self.client.get(url, {'expand': ''}).data['results'][0]
+        self.assertEqual(task['team'], self.task.team_id)
+        team = self.client.get(reverse('team_list'), {'expand': ''}).data['results'][0]
+        self.assertEqual(sorted(team['memberships']), sorted(
+            TeamMembership.objects.filter(team_id=self.task.team_id).values_list('id', flat=True)
+        ))
+
+        task = self.client.get(url, {'expand': 'team.hackathon', 'fields': 'id,team.name,team.hackathon'}).data['results'][0]
+        self.assertEqual(set(task), {'id', 'team'})
+        self.assertEqual(set(task['team']), {'name', 'hackathon'})
+        self.assertEqual(task['team']['hackathon']['title'], 'Test Hackathon')
+
+
+class NormalizedResponseTestCase(APITestCase):
+    """Test the normalized list envelope side-loads each related object once"""
+
+    def setUp(self):
+        self.user = User.objects.create(username='testuser')
+        self.hackathon = Hackathon.objects.create(
+            title='Test Hackathon',
+            description='Test description',
+            short_description='Test',
+            location_type='remote',
+            start_date='2024-12-01T10:00:00Z',
+            end_date='2024-12-03T18:00:00Z',
+            registration_deadline='2024-11-25T23:59:59Z',
+            organizer='Test Organizer',
+            created_by=self.user
+        )
+        self.teams = []
+        for i in range(3):
+            team = Team.objects.create(name=f'Team {i}', hackathon=self.hackathon, leader=self.user)
+            TeamMembership.objects.create(team=team, user=self.user, role='leader', status='accepted')
+            Task.objects.create(title=f'Task {i}', team=team, created_by=self.user)
+            self.teams.append(team)
+
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_team_list_side_loads_entities(self):
+        response = self.client.get(
+            reverse('team_list'),
+            {'expand': 'hackathon.created_by,leader,memberships'},
+            HTTP_ACCEPT='application/vnd.hackmate.normalized+json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/vnd.hackmate.normalized+json')
+        self.assertEqual(response.data['count'], 3)
+
+        team = response.data['results'][0]
+        self.assertEqual(team['hackathon'], self.hackathon.id)
+        self.assertEqual(team['leader'], self.user.id)
+        self.assertEqual(len(team['memberships']), 1)
+
+        entities = response.data['entities']
+        self.assertEqual(list(entities['hackathon']), [str(self.hackathon.id)])
+        self.assertEqual(entities['hackathon'][str(self.hackathon.id)]['created_by'], self.user.id)
+        self.assertEqual(list(entities['user']), [str(self.user.id)])
+        self.assertEqual(len(entities['teammembership']), 3)
+
+    def test_task_list_nested_side_loads(self):
+        response = self.client.get(
+            reverse('task_list'),
+            {'expand': 'team.hackathon', 'fields': 'id,team,team.name,team.hackathon'},
+            HTTP_ACCEPT='application/vnd.hackmate.normalized+json'
+        )
+        self.assertEqual(set(response.data['results'][0]), {'id', 'team'})
+        entities = response.data['entities']
+        self.assertEqual(len(entities['team']), 3)
+        self.assertEqual(
+            entities['team'][str(self.teams[0].id)], {'name': 'Team 0', 'hackathon': self.hackathon.id}
+        )
+        self.assertEqual(len(entities['hackathon']), 1)
+
+    def test_team_list_side_loads_every_relation_by_default(self):
+        response = self.client.get(
+            reverse('team_list'), HTTP_ACCEPT='application/vnd.hackmate.normalized+json'
+        )
+        self.assertEqual(response.data['results'][0]['hackathon'], self.hackathon.id)
+        self.assertEqual(set(response.data['entities']), {'hackathon', 'user', 'teammembership'})
+        self.assertEqual(response.data['entities']['teammembership'][str(
+            self.teams[0].teammembership_set.get().id
+        )]['user'], self.user.id)
+
+    def test_plain_json_is_unchanged(self):
+        response = self.client.get(reverse('team_list'), {'expand': 'hackathon'})
+        self.assertNotIn('entities', response.data)
+        self.assertEqual(response.data['results'][0]['hackathon']['id'], self.hackathon.id)
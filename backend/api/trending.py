@@ -0,0 +1,239 @@
+"""
+Skill popularity counters for the HackMate API
+
+SkillPopularity keeps a running count of every skill listed on profiles
+and in team requirements. Signal handlers apply the difference between a
+row's old and new skill lists with atomic F() updates, so trending skills
+are a single indexed query instead of a scan over every profile and team.
+
+Skill additions are also recorded in hourly SkillTrendBucket rows. The
+compact_skill_trends worker rolls hourly buckets into daily ones after
+HOURLY_RETENTION and drops them after DAILY_RETENTION, so a windowed,
+time-decayed trend costs one pass over the buckets in the window.
+"""
+import re
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from .models import UserProfile, Team, TeamMembership, SkillPopularity, SkillTrendBucket
+from .aggregates import json_element_counts
+
+
+# Team requirements count double towards a skill's score
+TEAM_WEIGHT = 2
+
+HOURLY_RETENTION = timedelta(hours=48)
+DAILY_RETENTION = timedelta(days=90)
+
+BUCKET_SPANS = {'hour': timedelta(hours=1), 'day': timedelta(days=1)}
+
+WINDOW_PATTERN = re.compile(r'^(\d+)([hd])$')
+
+
+def skill_counter(skills):
+    """Occurrences of each (string) skill in a JSON skill list"""
+    return Counter(
+        skill[:100] for skill in skills or ()
+        if isinstance(skill, str) and skill
+    )
+
+
+def apply_skill_delta(old_skills, new_skills, source):
+    """
+    Move the counters from ``old_skills`` to ``new_skills`` for one profile
+    (``source='profile'``) or team (``source='team'``).
+    """
+    delta = skill_counter(new_skills)
+    delta.subtract(skill_counter(old_skills))
+    delta = {skill: change for skill, change in delta.items() if change}
+    if not delta:
+        return
+
+    count_field = 'profile_count' if source == 'profile' else 'team_count'
+    weight = 1 if source == 'profile' else TEAM_WEIGHT
+
+    with transaction.atomic():
+        SkillPopularity.objects.bulk_create(
+            [SkillPopularity(skill=skill) for skill, change in delta.items() if change > 0],
+            ignore_conflicts=True
+        )
+        for skill, change in delta.items():
+            SkillPopularity.objects.filter(skill=skill).update(**{
+                count_field: F(count_field) + change,
+                'score': F('score') + change * weight,
+            })
+        record_skill_events(
+            {skill: change * weight for skill, change in delta.items() if change > 0}
+        )
+
+
+def top_skills(limit=10):
+    """Most popular skills from the counter table"""
+    rows = SkillPopularity.objects.filter(score__gt=0).order_by('-score', 'skill')[:limit]
+    return [{'skill': row.skill, 'count': row.score} for row in rows]
+
+
+def aggregate_skills(limit=10, hackathon=None):
+    """
+    Top skills counted in the database instead of read from the counters,
+    optionally restricted to a hackathon's teams and accepted members
+    """
+    profiles = UserProfile.objects.all()
+    teams = Team.objects.all()
+    if hackathon is not None:
+        teams = teams.filter(hackathon=hackathon)
+        profiles = profiles.filter(
+            user_id__in=TeamMembership.objects.filter(
+                team__hackathon=hackathon, status='accepted'
+            ).values('user_id')
+        )
+    counts = json_element_counts(
+        [(profiles, 'skills', 1), (teams, 'required_skills', TEAM_WEIGHT)],
+        limit=limit
+    )
+    return [{'skill': skill, 'count': count} for skill, count in counts]
+
+
+def recount_skills():
+    """Full recount as ``{skill: (profile_count, team_count)}``"""
+    profile_counts = Counter()
+    for skills in UserProfile.objects.exclude(skills=[]).values_list('skills', flat=True).iterator():
+        profile_counts.update(skill_counter(skills))
+
+    team_counts = Counter()
+    for skills in Team.objects.exclude(required_skills=[]).values_list(
+        'required_skills', flat=True
+    ).iterator():
+        team_counts.update(skill_counter(skills))
+
+    return {
+        skill: (profile_counts[skill], team_counts[skill])
+        for skill in profile_counts.keys() | team_counts.keys()
+    }
+
+
+def counter_mismatches(expected=None):
+    """Skills whose stored counters differ from a full recount"""
+    expected = recount_skills() if expected is None else expected
+    stored = {
+        row[0]: (row[1], row[2])
+        for row in SkillPopularity.objects.values_list('skill', 'profile_count', 'team_count')
+    }
+    return {
+        skill: {'stored': stored.get(skill, (0, 0)), 'expected': expected.get(skill, (0, 0))}
+        for skill in expected.keys() | stored.keys()
+        if stored.get(skill, (0, 0)) != expected.get(skill, (0, 0))
+    }
+
+
+def rebuild_counters():
+    """Replace the counter table with a full recount; returns the recount"""
+    counts = recount_skills()
+    with transaction.atomic():
+        SkillPopularity.objects.all().delete()
+        SkillPopularity.objects.bulk_create(
+            [
+                SkillPopularity(
+                    skill=skill,
+                    profile_count=profiles,
+                    team_count=teams,
+                    score=profiles + teams * TEAM_WEIGHT
+                )
+                for skill, (profiles, teams) in counts.items()
+            ],
+            batch_size=1000
+        )
+    return counts
+
+
+def record_skill_events(weights, now=None):
+    """Add weighted skill additions to the current hourly bucket"""
+    if not weights:
+        return
+    now = now or timezone.now()
+    hour = now.replace(minute=0, second=0, microsecond=0)
+
+    SkillTrendBucket.objects.bulk_create(
+        [SkillTrendBucket(skill=skill, granularity='hour', bucket_start=hour) for skill in weights],
+        ignore_conflicts=True
+    )
+    for skill, weight in weights.items():
+        SkillTrendBucket.objects.filter(
+            skill=skill, granularity='hour', bucket_start=hour
+        ).update(count=F('count') + weight)
+
+
+def compact_buckets(now=None):
+    """Roll old hourly buckets into daily ones and drop expired buckets"""
+    now = now or timezone.now()
+    hourly_cutoff = (now - HOURLY_RETENTION).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    with transaction.atomic():
+        old_hours = SkillTrendBucket.objects.filter(
+            granularity='hour', bucket_start__lt=hourly_cutoff
+        )
+        daily = (
+            old_hours.annotate(day=TruncDay('bucket_start'))
+            .values('skill', 'day')
+            .annotate(total=Sum('count'))
+        )
+        for row in daily:
+            bucket, _ = SkillTrendBucket.objects.get_or_create(
+                skill=row['skill'], granularity='day', bucket_start=row['day']
+            )
+            SkillTrendBucket.objects.filter(id=bucket.id).update(count=F('count') + row['total'])
+        old_hours.delete()
+
+        SkillTrendBucket.objects.filter(bucket_start__lt=now - DAILY_RETENTION).delete()
+
+
+def parse_window(value):
+    """timedelta for '<n>h' / '<n>d' windows up to DAILY_RETENTION, else None"""
+    match = WINDOW_PATTERN.match(value or '')
+    if not match:
+        return None
+    amount, unit = int(match.group(1)), match.group(2)
+    window = timedelta(hours=amount) if unit == 'h' else timedelta(days=amount)
+    if not timedelta(0) < window <= DAILY_RETENTION:
+        return None
+    return window
+
+
+def trending_in_window(window, limit=10, half_life=None, now=None):
+    """
+    Skills ranked by exponentially decayed additions within ``window``.
+
+    Each bucket contributes ``count * 0.5 ** (age / half_life)``, where age
+    is measured from the midpoint of the part of the bucket inside the
+    window; a bucket straddling the window start counts pro rata.
+    ``half_life`` defaults to a quarter of the window.
+    """
+    now = now or timezone.now()
+    start = now - window
+    half_life = (half_life or window / 4).total_seconds()
+    buckets = SkillTrendBucket.objects.filter(
+        Q(granularity='hour', bucket_start__gt=start - BUCKET_SPANS['hour']) |
+        Q(granularity='day', bucket_start__gt=start - BUCKET_SPANS['day'])
+    ).values_list('skill', 'granularity', 'bucket_start', 'count')
+
+    scores = defaultdict(float)
+    counts = defaultdict(float)
+    for skill, granularity, bucket_start, count in buckets:
+        span = BUCKET_SPANS[granularity]
+        covered_start = max(bucket_start, start)
+        covered = bucket_start + span - covered_start
+        share = count * covered / span
+        age = max((now - (covered_start + covered / 2)).total_seconds(), 0)
+        scores[skill] += share * 0.5 ** (age / half_life)
+        counts[skill] += share
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+    return [
+        {'skill': skill, 'count': round(counts[skill]), 'score': round(score, 3)}
+        for skill, score in ranked
+    ]
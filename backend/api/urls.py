@@ -24,6 +24,11 @@ urlpatterns = [
     path('hackathons/', views.HackathonListView.as_view(), name='hackathon_list'),
     path('hackathons/<int:pk>/', views.HackathonDetailView.as_view(), name='hackathon_detail'),
     path('hackathons/<int:hackathon_id>/analytics/', views.hackathon_analytics, name='hackathon_analytics'),
+    path('hackathons/<int:hackathon_id>/export/<str:table>/', views.export_hackathon_data, name='export_hackathon_data'),
+    path('hackathons/<int:hackathon_id>/team-health/', views.hackathon_team_health, name='hackathon_team_health'),
+    path('hackathons/<int:hackathon_id>/analytics/history/', views.hackathon_analytics_history, name='hackathon_analytics_history'),
+    path('hackathons/<int:hackathon_id>/team-formation/', views.start_team_formation, name='start_team_formation'),
+    path('team-formation/<int:job_id>/', views.team_formation_job, name='team_formation_job'),
     
     # Team endpoints
     path('teams/', views.TeamListView.as_view(), name='team_list'),
@@ -1,10 +1,91 @@
 """
 Utility functions for the HackMate API
 """
-from django.db.models import Q, Count
+from django.db import connection
+from django.db.models import Q, Count, F, JSONField, TextField
+from django.db.models.fields.json import HasAnyKeys, HasKeys
+from django.db.models.functions import Cast, Lower
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from datetime import timedelta
-from .models import UserProfile, Team, Task, Hackathon
+import heapq
+import json
+from .models import (
+    Team, TeamMembership, Task, Hackathon, Skill, ProfileSkill, normalize_skill_name
+)
+from .trending import top_skills, aggregate_skills
+from .aggregates import json_element_counts
+
+
+def split_query_list(value):
+    """Split a comma separated query parameter into stripped, non-empty items"""
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def parse_since(value):
+    """Timezone-aware datetime for an ISO 8601 ``since`` parameter, or None"""
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        return None
+    if since is not None and timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def lowered_json(field):
+    """``field`` with every string in its JSON lower-cased, as indexed on PostgreSQL"""
+    return Cast(Lower(Cast(field, TextField())), JSONField())
+
+
+def json_list_filter(field, values, match='any'):
+    """
+    Q object matching rows whose JSON list ``field`` contains any (or, with
+    ``match='all'``, every) value in ``values``, ignoring case.
+
+    On PostgreSQL this compiles to the jsonb ``?|`` / ``?&`` operators over
+    ``lower(field::text)::jsonb``, which is served by the GIN expression
+    indexes on these columns. Other backends fall back to matching the
+    quoted JSON element in the serialized text case-insensitively, which
+    avoids 'Java' matching 'JavaScript' but cannot use an index.
+    """
+    values = [value.lower() for value in values if isinstance(value, str) and value]
+    if not values:
+        return Q()
+
+    if connection.vendor == 'postgresql':
+        lookup = HasKeys if match == 'all' else HasAnyKeys
+        return Q(lookup(lowered_json(field), values))
+
+    q = Q()
+    for value in values:
+        element = Q(**{f'{field}__icontains': json.dumps(value)})
+        q = q & element if match == 'all' else q | element
+    return q
+
+
+def filter_profiles_by_skills(queryset, skill_names, partial=False):
+    """
+    Restrict a UserProfile queryset to profiles having any of the given skills.
+
+    Uses the indexed ProfileSkill relation (exact, case-insensitive names)
+    instead of scans over the skills JSON. With ``partial``, any skill whose
+    name contains one of ``skill_names`` matches.
+    """
+    if partial:
+        names = {normalize_skill_name(name) for name in skill_names if isinstance(name, str)}
+        names.discard('')
+        if not names:
+            return queryset.none()
+        skills = Q()
+        for name in names:
+            skills |= Q(normalized_name__contains=name)
+        skill_ids = Skill.objects.filter(skills).values('id')
+    else:
+        skill_ids = Skill.resolve_ids(skill_names)
+    return queryset.filter(
+        id__in=ProfileSkill.objects.filter(skill_id__in=skill_ids).values('profile_id')
+    )
 
 
 def get_user_recommendations(user):
@@ -17,143 +98,250 @@ def get_user_recommendations(user):
     
     # Recommend hackathons based on user skills
     if user_profile.skills:
-        skill_filter = Q()
-        for skill in user_profile.skills:
-            skill_filter |= Q(required_skills__icontains=skill)
-        
         recommended_hackathons = Hackathon.objects.filter(
-            skill_filter,
+            json_list_filter('required_skills', user_profile.skills),
             status='upcoming',
             registration_deadline__gt=timezone.now()
-        ).distinct()[:5]
+        )[:5]
         
         recommendations['hackathons'] = recommended_hackathons
     
     # Recommend teams looking for user's skills
     if user_profile.skills:
-        skill_filter = Q()
-        for skill in user_profile.skills:
-            skill_filter |= Q(required_skills__icontains=skill)
-        
-        recommended_teams = Team.objects.filter(
-            skill_filter,
+        candidate_teams = Team.objects.filter(
+            json_list_filter('required_skills', user_profile.skills),
             is_recruiting=True
         ).exclude(
             members=user
-        ).distinct()[:5]
+        )
         
-        recommendations['teams'] = recommended_teams
+        recommendations['teams'] = rank_teams_for_user(user_profile, candidate_teams, limit=5)
     
     return recommendations
 
 
-def calculate_team_health_score(team):
-    """Calculate a health score for a team based on various metrics"""
+def rank_teams_for_user(user_profile, teams, limit=5):
+    """
+    Rank recruiting teams by how well the user fills their gaps.
+
+    Full teams are dropped using an annotated count of accepted members.
+    Each remaining team scores up to 80 points for the share of its unmet
+    required skills (not yet covered by accepted members) that the user
+    has, and up to 20 points for remaining capacity. Skills of current
+    members are read in one query for all candidates. Returns Team
+    instances carrying a ``fit_score`` attribute, best first.
+    """
+    candidates = list(
+        teams.filter(
+            member_count__lt=F('max_members')
+        ).values_list('id', 'required_skills', 'max_members', 'member_count')
+    )
+    if not candidates:
+        return []
+
+    covered = {}
+    member_skills = TeamMembership.objects.filter(
+        team_id__in=[team_id for team_id, *_ in candidates],
+        status='accepted',
+        user__profile__skill_links__isnull=False
+    ).values_list('team_id', 'user__profile__skill_links__skill__normalized_name')
+    for team_id, skill in member_skills:
+        covered.setdefault(team_id, set()).add(skill)
+
+    user_skills = {
+        normalize_skill_name(skill) for skill in user_profile.skills or ()
+        if isinstance(skill, str)
+    }
+    scored = []
+    for team_id, required_skills, max_members, accepted_members in candidates:
+        required = {
+            normalize_skill_name(skill) for skill in required_skills or ()
+            if isinstance(skill, str)
+        }
+        unmet = required - covered.get(team_id, set())
+        coverage = len(unmet & user_skills) / len(unmet) if unmet else 0
+        capacity = (max_members - accepted_members) / max_members
+        scored.append((round(coverage * 80 + capacity * 20, 2), team_id))
+
+    top = heapq.nlargest(limit, scored, key=lambda item: item[0])
+    teams_by_id = Team.objects.select_related('hackathon', 'leader').in_bulk(
+        [team_id for _, team_id in top]
+    )
+    ranked = []
+    for score, team_id in top:
+        team = teams_by_id[team_id]
+        team.fit_score = score
+        ranked.append(team)
+    return ranked
+
+
+def annotate_team_health(teams, now=None):
+    """
+    Annotate a Team queryset with the task and member counts the health score
+    is computed from, using conditional aggregation (one query for any
+    number of teams)
+    """
+    now = now or timezone.now()
+    return teams.annotate(
+        health_task_count=Count('tasks'),
+        health_done_count=Count('tasks', filter=Q(tasks__status='done')),
+        health_recent_count=Count(
+            'tasks', filter=Q(tasks__updated_at__gte=now - timedelta(days=7))
+        ),
+        health_overdue_count=Count('tasks', filter=Task.overdue_filter(now, prefix='tasks__')),
+    )
+
+
+def team_health_score(team):
+    """Health score of a team annotated by annotate_team_health"""
     score = 0
     max_score = 100
-    
+
     # Task completion rate (40 points)
-    tasks = Task.objects.filter(team=team)
-    if tasks.exists():
-        completed_tasks = tasks.filter(status='done').count()
-        completion_rate = completed_tasks / tasks.count()
-        score += completion_rate * 40
+    if team.health_task_count:
+        score += team.health_done_count / team.health_task_count * 40
     else:
         score += 20  # Neutral score if no tasks yet
-    
+
     # Team size optimization (20 points)
-    current_size = team.current_size
     optimal_size = team.max_members * 0.8  # 80% of max is considered optimal
-    if current_size >= optimal_size:
+    if team.member_count >= optimal_size:
         score += 20
     else:
-        score += (current_size / optimal_size) * 20
-    
+        score += (team.member_count / optimal_size) * 20
+
     # Recent activity (20 points)
-    recent_activity = Task.objects.filter(
-        team=team,
-        updated_at__gte=timezone.now() - timedelta(days=7)
-    ).count()
-    if recent_activity > 0:
-        score += min(recent_activity * 5, 20)
-    
+    if team.health_recent_count > 0:
+        score += min(team.health_recent_count * 5, 20)
+
     # Overdue tasks penalty (20 points)
-    overdue_tasks = sum(1 for task in tasks if task.is_overdue)
-    if overdue_tasks == 0:
-        score += 20
-    else:
-        penalty = min(overdue_tasks * 5, 20)
-        score += max(0, 20 - penalty)
-    
+    penalty = min(team.health_overdue_count * 5, 20)
+    score += 20 - penalty
+
     return min(score, max_score)
 
 
-def get_trending_skills():
+def team_health_status(health_score):
+    """Label for a health score"""
+    return (
+        'excellent' if health_score >= 80 else
+        'good' if health_score >= 60 else
+        'needs_improvement' if health_score >= 40 else 'poor'
+    )
+
+
+def calculate_team_health_score(team):
+    """Calculate a health score for a team based on various metrics"""
+    return team_health_score(annotate_team_health(Team.objects.filter(id=team.id)).get())
+
+
+def member_count_mismatches():
+    """``{team_id: (stored, actual)}`` for teams whose member_count has drifted"""
+    teams = Team.objects.with_member_counts().exclude(
+        member_count=F('accepted_member_count')
+    ).values_list('id', 'member_count', 'accepted_member_count')
+    return {team_id: (stored, actual) for team_id, stored, actual in teams}
+
+
+def reconcile_member_counts():
+    """Reset drifted member_count columns to a recount; returns the mismatches fixed"""
+    mismatches = member_count_mismatches()
+    for team_id, (_, actual) in mismatches.items():
+        Team.objects.filter(id=team_id).update(member_count=actual)
+    return mismatches
+
+
+def get_trending_skills(hackathon=None):
     """Get trending skills based on user profiles and team requirements"""
-    # Count skills in user profiles
-    user_skills = {}
-    for profile in UserProfile.objects.exclude(skills=[]):
-        for skill in profile.skills:
-            user_skills[skill] = user_skills.get(skill, 0) + 1
-    
-    # Count skills in team requirements
-    team_skills = {}
-    for team in Team.objects.exclude(required_skills=[]):
-        for skill in team.required_skills:
-            team_skills[skill] = team_skills.get(skill, 0) + 1
-    
-    # Combine and sort
-    all_skills = {}
-    for skill, count in user_skills.items():
-        all_skills[skill] = all_skills.get(skill, 0) + count
-    
-    for skill, count in team_skills.items():
-        all_skills[skill] = all_skills.get(skill, 0) + count * 2  # Weight team requirements higher
-    
-    # Return top 10 trending skills
-    trending = sorted(all_skills.items(), key=lambda x: x[1], reverse=True)[:10]
-    return [{'skill': skill, 'count': count} for skill, count in trending]
+    if hackathon is not None:
+        return aggregate_skills(limit=10, hackathon=hackathon)
+
+    # Counters are kept up to date by signal handlers (see api.trending);
+    # count in the database when they have not been built yet
+    return top_skills(limit=10) or aggregate_skills(limit=10)
 
 
 def get_hackathon_analytics(hackathon):
     """Get analytics data for a hackathon"""
+    # A fixed number of aggregate queries, however many teams there are
     teams = Team.objects.filter(hackathon=hackathon)
-    
+    memberships = TeamMembership.objects.filter(team__hackathon=hackathon)
+
+    # Histogram of teams by accepted member count
+    size_rows = teams.order_by().values('member_count').annotate(
+        teams=Count('id'),
+        recruiting=Count('id', filter=Q(is_recruiting=True))
+    )
+    size_distribution = {row['member_count']: row['teams'] for row in size_rows}
+    total_teams = sum(size_distribution.values())
+
+    status_rows = memberships.order_by().values('status').annotate(
+        count=Count('id'),
+        users=Count('user', distinct=True)
+    )
+    membership_counts = {status: 0 for status, _ in TeamMembership.STATUS_CHOICES}
+    participants = 0
+    for row in status_rows:
+        membership_counts[row['status']] = row['count']
+        if row['status'] == 'accepted':
+            participants = row['users']
+
+    task_counts = {status: 0 for status, _ in Task.STATUS_CHOICES}
+    for row in Task.objects.filter(team__hackathon=hackathon).order_by().values('status').annotate(
+        count=Count('id')
+    ):
+        task_counts[row['status']] = row['count']
+
     analytics = {
-        'total_teams': teams.count(),
-        'total_participants': sum(team.current_size for team in teams),
-        'average_team_size': teams.aggregate(
-            avg_size=Count('members')
-        )['avg_size'] or 0,
-        'teams_recruiting': teams.filter(is_recruiting=True).count(),
+        'total_teams': total_teams,
+        'total_participants': participants,
+        'average_team_size': round(
+            sum(size * count for size, count in size_distribution.items()) / total_teams, 2
+        ) if total_teams else 0,
+        'median_team_size': _histogram_median(size_distribution),
+        'team_size_distribution': dict(sorted(size_distribution.items())),
+        'teams_recruiting': sum(row['recruiting'] for row in size_rows),
+        'membership_counts': membership_counts,
+        'task_counts': task_counts,
         'skill_distribution': {},
         'role_distribution': {},
     }
-    
+
     # Analyze skill distribution
-    skill_counts = {}
-    for team in teams:
-        for skill in team.required_skills:
-            skill_counts[skill] = skill_counts.get(skill, 0) + 1
-    
     analytics['skill_distribution'] = dict(
-        sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        json_element_counts([(teams, 'required_skills', 1)], limit=10)
     )
-    
+
     # Analyze role distribution
-    from .models import TeamMembership
-    role_counts = TeamMembership.objects.filter(
-        team__hackathon=hackathon,
+    role_counts = memberships.filter(
         status='accepted'
     ).values('role').annotate(count=Count('role'))
-    
+
     analytics['role_distribution'] = {
         item['role']: item['count'] for item in role_counts
     }
-    
+
     return analytics
 
 
+def _histogram_median(histogram):
+    """Median of the values described by a ``{value: frequency}`` histogram"""
+    total = sum(histogram.values())
+    if not total:
+        return 0
+
+    # Zero-based positions of the middle value(s)
+    low, high = (total - 1) // 2, total // 2
+    low_value = None
+    seen = 0
+    for value, frequency in sorted(histogram.items()):
+        seen += frequency
+        if low_value is None and seen > low:
+            low_value = value
+        if seen > high:
+            return (low_value + value) / 2
+
+
 def send_notification(user, notification_type, data):
     """
     Placeholder for notification system
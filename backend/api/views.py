@@ -1,17 +1,22 @@
 from rest_framework import generics, status, permissions, filters
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import timedelta
 
 from .models import (
     UserProfile, Skill, Hackathon, Team, TeamMembership,
-    TeamInvitation, Task, TaskComment, MatchingPreference
+    TeamInvitation, Task, TaskComment, MatchingPreference, TeamFormationJob,
+    normalize_skill_name
 )
 from .serializers import (
     CustomTokenObtainPairSerializer, UserRegistrationSerializer,
@@ -19,12 +24,62 @@ from .serializers import (
     SkillSerializer, HackathonSerializer, HackathonCreateSerializer,
     TeamSerializer, TeamCreateSerializer, TeamMembershipSerializer,
     TeamInvitationSerializer, TaskSerializer, TaskCreateSerializer,
-    TaskCommentSerializer, MatchingPreferenceSerializer
+    TaskCommentSerializer, MatchingPreferenceSerializer, TeamFormationJobSerializer
 )
 from .utils import (
-    get_user_recommendations, calculate_team_health_score,
-    get_trending_skills, get_hackathon_analytics, get_user_activity_summary
+    annotate_team_health, team_health_score, team_health_status,
+    get_trending_skills, get_user_activity_summary,
+    filter_profiles_by_skills, json_list_filter, split_query_list, parse_since
 )
+from .matching import rank_candidates, get_cached_matches
+from .lsh import rank_candidates_lsh
+from .availability import hex_to_mask, shared_hours
+from .feeds import get_feed
+from .team_health import get_current_health, health_history
+from .exports import EXPORT_FORMATS, EXPORT_TABLES, stream_export
+from .analytics import get_snapshot, analytics_history
+from .trending import parse_window, trending_in_window
+from .normalized import NormalizedJSONRenderer, is_normalized, normalize
+
+
+class EagerLoadingViewMixin:
+    """Load the relations the serializer renders for the requested ?expand=/?fields= shape"""
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer_class = self.get_serializer_class()
+        if hasattr(serializer_class, 'setup_eager_loading'):
+            queryset = serializer_class.setup_eager_loading(
+                queryset,
+                expand=self.request.query_params.get('expand'),
+                fields=self.request.query_params.get('fields')
+            )
+        return queryset
+
+
+class NormalizedListMixin:
+    """Answer list requests that accept the normalized media type with side-loaded entities"""
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NormalizedJSONRenderer]
+
+    def list(self, request, *args, **kwargs):
+        if not is_normalized(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        records, entities = normalize(
+            queryset if page is None else page,
+            self.get_serializer_class(),
+            expand=request.query_params.get('expand'),
+            fields=request.query_params.get('fields'),
+            context=self.get_serializer_context()
+        )
+        if page is None:
+            return Response({'results': records, 'entities': entities})
+
+        response = self.get_paginated_response(records)
+        response.data['entities'] = entities
+        return response
 
 
 class CustomTokenObtainPairView(TokenObtainPairView):
@@ -54,7 +109,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
         return UserProfileSerializer
 
 
-class UserProfileDetailView(generics.RetrieveAPIView):
+class UserProfileDetailView(EagerLoadingViewMixin, generics.RetrieveAPIView):
     """Public user profile view"""
     queryset = UserProfile.objects.all()
     serializer_class = UserProfileSerializer
@@ -64,15 +119,22 @@ class UserProfileDetailView(generics.RetrieveAPIView):
 
 class SkillListView(generics.ListCreateAPIView):
     """Skills list and create view"""
-    queryset = Skill.objects.all()
+    queryset = Skill.objects.filter(is_public=True)
     serializer_class = SkillSerializer
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'category']
     ordering_fields = ['name', 'category', 'created_at']
 
+    def perform_create(self, serializer):
+        # A private skill already used on profiles is published instead of duplicated
+        serializer.instance = Skill.objects.filter(
+            normalized_name=normalize_skill_name(serializer.validated_data['name'])
+        ).first()
+        serializer.save(is_public=True)
+
 
-class HackathonListView(generics.ListCreateAPIView):
+class HackathonListView(EagerLoadingViewMixin, generics.ListCreateAPIView):
     """Hackathons list and create view"""
     queryset = Hackathon.objects.all()
     permission_classes = [permissions.IsAuthenticated]
@@ -106,13 +168,22 @@ class HackathonListView(generics.ListCreateAPIView):
         if end_date:
             queryset = queryset.filter(end_date__lte=end_date)
 
+        # Filter by JSON list fields (comma separated, any value unless match=all)
+        match = self.request.query_params.get('match', 'any')
+        for field in ('required_skills', 'themes'):
+            values = self.request.query_params.get(field)
+            if values:
+                queryset = queryset.filter(
+                    json_list_filter(field, split_query_list(values), match)
+                )
+
         return queryset
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
-class HackathonDetailView(generics.RetrieveUpdateDestroyAPIView):
+class HackathonDetailView(EagerLoadingViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """Hackathon detail view"""
     queryset = Hackathon.objects.all()
     serializer_class = HackathonSerializer
@@ -124,7 +195,7 @@ class HackathonDetailView(generics.RetrieveUpdateDestroyAPIView):
         return [permissions.IsAuthenticated()]
 
 
-class TeamListView(generics.ListCreateAPIView):
+class TeamListView(NormalizedListMixin, EagerLoadingViewMixin, generics.ListCreateAPIView):
     """Teams list and create view"""
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -149,25 +220,41 @@ class TeamListView(generics.ListCreateAPIView):
         if is_recruiting is not None:
             queryset = queryset.filter(is_recruiting=is_recruiting.lower() == 'true')
 
+        # Filter recruiting teams with a free seat
+        open_teams = self.request.query_params.get('open')
+        if open_teams and open_teams.lower() == 'true':
+            queryset = queryset.open()
+
         # Filter teams user is member of
         my_teams = self.request.query_params.get('my_teams')
         if my_teams and my_teams.lower() == 'true':
             queryset = queryset.filter(members=self.request.user)
 
+        # Filter by required skills (comma separated, any value unless match=all)
+        required_skills = self.request.query_params.get('required_skills')
+        if required_skills:
+            queryset = queryset.filter(json_list_filter(
+                'required_skills',
+                split_query_list(required_skills),
+                self.request.query_params.get('match', 'any')
+            ))
+
         return queryset
 
     def perform_create(self, serializer):
-        team = serializer.save(leader=self.request.user)
-        # Add leader as team member
-        TeamMembership.objects.create(
-            team=team,
-            user=self.request.user,
-            role='leader',
-            status='accepted'
-        )
+        with transaction.atomic():
+            team = serializer.save(leader=self.request.user)
+            # Add leader as team member
+            TeamMembership.objects.create(
+                team=team,
+                user=self.request.user,
+                role='leader',
+                status='accepted'
+            )
+        team.refresh_from_db(fields=['member_count'])
 
 
-class TeamDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TeamDetailView(EagerLoadingViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """Team detail view"""
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
@@ -217,8 +304,9 @@ def leave_team(request, team_id):
                 {'error': 'Team leader cannot leave. Transfer leadership first.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        membership.status = 'left'
-        membership.save()
+        with transaction.atomic():
+            membership.status = 'left'
+            membership.save()
         return Response({'message': 'Left team successfully'})
     except TeamMembership.DoesNotExist:
         return Response(
@@ -286,12 +374,23 @@ def invite_to_team(request, team_id):
     return Response(serializer.data, status=status.HTTP_201_CREATED)
 
 
-class TaskListView(generics.ListCreateAPIView):
+class TaskOrderingFilter(filters.OrderingFilter):
+    """Ordering filter that sorts ``priority`` by its indexed integer rank"""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        return [
+            field.replace('priority', 'priority_rank') if field.lstrip('-') == 'priority' else field
+            for field in ordering or ()
+        ] or ordering
+
+
+class TaskListView(NormalizedListMixin, EagerLoadingViewMixin, generics.ListCreateAPIView):
     """Tasks list and create view"""
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [filters.SearchFilter, TaskOrderingFilter]
     search_fields = ['title', 'description']
-    ordering_fields = ['created_at', 'due_date', 'priority']
+    ordering_fields = ['created_at', 'due_date', 'priority', 'priority_rank']
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -326,20 +425,28 @@ class TaskListView(generics.ListCreateAPIView):
         if my_tasks and my_tasks.lower() == 'true':
             queryset = queryset.filter(assigned_to=self.request.user)
 
+        # Filter by overdue status
+        overdue = self.request.query_params.get('overdue')
+        if overdue is not None:
+            if overdue.lower() == 'true':
+                queryset = queryset.overdue()
+            else:
+                queryset = queryset.exclude(Task.overdue_filter())
+
         return queryset
 
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
 
-class TaskDetailView(generics.RetrieveUpdateDestroyAPIView):
+class TaskDetailView(EagerLoadingViewMixin, generics.RetrieveUpdateDestroyAPIView):
     """Task detail view"""
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [permissions.IsAuthenticated]
 
 
-class TaskCommentListView(generics.ListCreateAPIView):
+class TaskCommentListView(EagerLoadingViewMixin, generics.ListCreateAPIView):
     """Task comments list and create view"""
     serializer_class = TaskCommentSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -379,97 +486,124 @@ def find_teammates(request):
     except MatchingPreference.DoesNotExist:
         preferences = None
 
-    # Base queryset - exclude current user
-    potential_teammates = UserProfile.objects.exclude(user=user).filter(
-        is_available=True
-    )
+    def compute_matches():
+        # Base queryset - exclude current user
+        potential_teammates = UserProfile.objects.exclude(user=user).filter(
+            is_available=True
+        ).select_related('user')
 
-    # Filter by skills if user has preferences
-    if preferences and preferences.preferred_skills:
-        skill_filter = Q()
-        for skill in preferences.preferred_skills:
-            skill_filter |= Q(skills__icontains=skill)
-        potential_teammates = potential_teammates.filter(skill_filter)
-
-    # Filter by experience level
-    if preferences and preferences.experience_level_preference:
-        potential_teammates = potential_teammates.filter(
-            experience_level__in=preferences.experience_level_preference
-        )
+        # Filter by skills if user has preferences
+        if preferences and preferences.preferred_skills:
+            potential_teammates = filter_profiles_by_skills(
+                potential_teammates, preferences.preferred_skills
+            )
 
-    # Filter by location preference
-    if preferences and preferences.location_preference != 'any':
-        if preferences.location_preference == 'same_timezone':
+        # Filter by experience level
+        if preferences and preferences.experience_level_preference:
             potential_teammates = potential_teammates.filter(
-                timezone=user_profile.timezone
+                experience_level__in=preferences.experience_level_preference
             )
-        elif preferences.location_preference == 'same_country':
-            # Simple location matching - in real app, use proper geo data
-            user_location_parts = user_profile.location.split(',')
-            if len(user_location_parts) >= 2:
-                country = user_location_parts[-1].strip()
+
+        # Filter by location preference
+        if preferences and preferences.location_preference != 'any':
+            if preferences.location_preference == 'same_timezone':
                 potential_teammates = potential_teammates.filter(
-                    location__icontains=country
+                    timezone=user_profile.timezone
                 )
+            elif preferences.location_preference == 'same_country':
+                if user_profile.location_country:
+                    potential_teammates = potential_teammates.filter(
+                        location_country=user_profile.location_country
+                    )
+            elif preferences.location_preference == 'same_city':
+                if user_profile.location_city:
+                    potential_teammates = potential_teammates.filter(
+                        location_country=user_profile.location_country,
+                        location_city=user_profile.location_city
+                    )
+
+        # Score every candidate (or the LSH shortlist) in one pass and keep the top 20
+        if settings.MATCHING_STRATEGY == 'lsh':
+            ranked = rank_candidates_lsh(user_profile, potential_teammates, limit=20)
+        else:
+            ranked = rank_candidates(user_profile, potential_teammates, limit=20)
+
+        user_availability = hex_to_mask(user_profile.availability_mask)
+        results = []
+        for profile, score in ranked:
+            profile_data = UserProfileSerializer(profile).data
+            profile_data['compatibility_score'] = score
+            profile_data['shared_hours'] = shared_hours(
+                user_availability, hex_to_mask(profile.availability_mask)
+            )
+            results.append(profile_data)
+        return results
 
-    # Calculate compatibility scores (simple algorithm)
-    teammates_with_scores = []
-    for teammate in potential_teammates[:50]:  # Limit for performance
-        score = calculate_compatibility_score(user_profile, teammate, preferences)
-        teammates_with_scores.append({
-            'profile': teammate,
-            'compatibility_score': score
-        })
+    return Response(get_cached_matches(user_profile, preferences, compute_matches))
 
-    # Sort by compatibility score
-    teammates_with_scores.sort(key=lambda x: x['compatibility_score'], reverse=True)
 
-    # Serialize results
-    results = []
-    for item in teammates_with_scores[:20]:  # Return top 20
-        profile_data = UserProfileSerializer(item['profile']).data
-        profile_data['compatibility_score'] = item['compatibility_score']
-        results.append(profile_data)
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def start_team_formation(request, hackathon_id):
+    """Start a batch job proposing teams for all unteamed participants"""
+    hackathon = get_object_or_404(Hackathon, id=hackathon_id)
 
-    return Response(results)
+    if hackathon.created_by != request.user and not request.user.is_staff:
+        return Response(
+            {'error': 'Only the hackathon organizer can run team formation'},
+            status=status.HTTP_403_FORBIDDEN
+        )
 
+    # Queued for the run_team_formation_jobs worker
+    job = TeamFormationJob.objects.create(hackathon=hackathon, requested_by=request.user)
 
-def calculate_compatibility_score(user_profile, teammate_profile, preferences):
-    """Calculate compatibility score between two users"""
-    score = 0
-
-    # Skill matching (40% weight)
-    if user_profile.skills and teammate_profile.skills:
-        common_skills = set(user_profile.skills) & set(teammate_profile.skills)
-        skill_score = len(common_skills) / max(len(user_profile.skills), 1) * 40
-        score += skill_score
-
-    # Experience level compatibility (20% weight)
-    experience_levels = ['beginner', 'intermediate', 'advanced', 'expert']
-    user_exp_idx = experience_levels.index(user_profile.experience_level)
-    teammate_exp_idx = experience_levels.index(teammate_profile.experience_level)
-    exp_diff = abs(user_exp_idx - teammate_exp_idx)
-    exp_score = max(0, (3 - exp_diff) / 3) * 20
-    score += exp_score
-
-    # Role compatibility (20% weight)
-    if (user_profile.preferred_roles and teammate_profile.preferred_roles):
-        common_roles = set(user_profile.preferred_roles) & set(teammate_profile.preferred_roles)
-        # Prefer complementary roles rather than same roles
-        if common_roles:
-            role_score = 10  # Some overlap is good
-        else:
-            role_score = 20  # Different roles are better for team diversity
-        score += role_score
+    serializer = TeamFormationJobSerializer(job)
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
 
-    # Location/timezone compatibility (20% weight)
-    if user_profile.timezone and teammate_profile.timezone:
-        if user_profile.timezone == teammate_profile.timezone:
-            score += 20
-        else:
-            score += 10  # Different timezones can still work
 
-    return min(score, 100)  # Cap at 100
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def export_hackathon_data(request, hackathon_id, table):
+    """Stream a hackathon's teams, memberships or tasks as CSV or NDJSON"""
+    hackathon = get_object_or_404(Hackathon, id=hackathon_id)
+
+    if hackathon.created_by != request.user and not request.user.is_staff:
+        return Response(
+            {'error': 'Only the hackathon organizer can export its data'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    fmt = request.query_params.get('fmt', 'csv')
+    if table not in EXPORT_TABLES or fmt not in EXPORT_FORMATS:
+        return Response(
+            {'error': f"Export one of {', '.join(EXPORT_TABLES)} as {' or '.join(EXPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    response = StreamingHttpResponse(
+        stream_export(hackathon, table, fmt),
+        content_type=EXPORT_FORMATS[fmt]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="hackathon-{hackathon.id}-{table}.{fmt}"'
+    )
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def team_formation_job(request, job_id):
+    """Get the status and proposed teams of a team formation job"""
+    job = get_object_or_404(TeamFormationJob.objects.select_related('hackathon'), id=job_id)
+
+    if job.hackathon.created_by != request.user and not request.user.is_staff:
+        return Response(
+            {'error': 'Access denied'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    serializer = TeamFormationJobSerializer(job)
+    return Response(serializer.data)
 
 
 @api_view(['GET'])
@@ -515,21 +649,24 @@ def respond_to_invitation(request, invitation_id):
     action = request.data.get('action')  # 'accept' or 'decline'
 
     if action == 'accept':
-        if invitation.team.is_full:
-            return Response(
-                {'error': 'Team is full'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        with transaction.atomic():
+            # Lock the team row so concurrent acceptances cannot overfill it
+            team = Team.objects.select_for_update().get(id=invitation.team_id)
+            if team.is_full:
+                return Response(
+                    {'error': 'Team is full'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        # Create team membership
-        TeamMembership.objects.create(
-            team=invitation.team,
-            user=request.user,
-            role=invitation.role,
-            status='accepted'
-        )
-        invitation.status = 'accepted'
-        invitation.save()
+            # Create team membership
+            TeamMembership.objects.create(
+                team=team,
+                user=request.user,
+                role=invitation.role,
+                status='accepted'
+            )
+            invitation.status = 'accepted'
+            invitation.save()
 
         return Response({'message': 'Invitation accepted successfully'})
 
@@ -547,14 +684,25 @@ def respond_to_invitation(request, invitation_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
+@renderer_classes([*api_settings.DEFAULT_RENDERER_CLASSES, NormalizedJSONRenderer])
 def my_invitations(request):
     """Get user's pending invitations"""
-    invitations = TeamInvitation.objects.filter(
-        invited_user=request.user,
-        status='pending'
-    ).select_related('team', 'invited_by')
+    expand = request.query_params.get('expand')
+    fields = request.query_params.get('fields')
+    invitations = TeamInvitationSerializer.setup_eager_loading(
+        TeamInvitation.objects.filter(invited_user=request.user, status='pending'),
+        expand=expand,
+        fields=fields
+    )
 
-    serializer = TeamInvitationSerializer(invitations, many=True)
+    if is_normalized(request):
+        records, entities = normalize(
+            invitations, TeamInvitationSerializer, expand=expand, fields=fields,
+            context={'request': request}
+        )
+        return Response({'results': records, 'entities': entities})
+
+    serializer = TeamInvitationSerializer(invitations, many=True, context={'request': request})
     return Response(serializer.data)
 
 
@@ -604,7 +752,7 @@ def assign_task(request, task_id):
     task.assigned_to = assignee
     task.save()
 
-    serializer = TaskSerializer(task)
+    serializer = TaskSerializer(task, context={'request': request})
     return Response(serializer.data)
 
 
@@ -612,7 +760,7 @@ def assign_task(request, task_id):
 @permission_classes([permissions.IsAuthenticated])
 def team_dashboard(request, team_id):
     """Get team dashboard data"""
-    team = get_object_or_404(Team, id=team_id)
+    team = get_object_or_404(TeamSerializer.setup_eager_loading(Team.objects.all()), id=team_id)
 
     # Check if user is team member
     if not TeamMembership.objects.filter(
@@ -627,19 +775,31 @@ def team_dashboard(request, team_id):
 
     # Get team statistics
     tasks = Task.objects.filter(team=team)
-    members = TeamMembership.objects.filter(team=team, status='accepted')
+    members = TeamMembership.objects.filter(
+        team=team, status='accepted'
+    ).select_related('user__profile')
+    member_availability = [
+        hex_to_mask(member.user.profile.availability_mask)
+        for member in members
+        if hasattr(member.user, 'profile') and member.user.profile.availability_mask
+    ]
+
+    task_stats = tasks.aggregate(
+        total_tasks=Count('id'),
+        completed_tasks=Count('id', filter=Q(status='done')),
+        in_progress_tasks=Count('id', filter=Q(status='in_progress')),
+        overdue_tasks=Count('id', filter=Task.overdue_filter()),
+    )
 
     dashboard_data = {
         'team': TeamSerializer(team).data,
         'stats': {
-            'total_tasks': tasks.count(),
-            'completed_tasks': tasks.filter(status='done').count(),
-            'in_progress_tasks': tasks.filter(status='in_progress').count(),
-            'overdue_tasks': sum(1 for task in tasks if task.is_overdue),
-            'total_members': members.count(),
+            **task_stats,
+            'total_members': team.current_size,
+            'shared_hours': shared_hours(*member_availability),
         },
         'recent_tasks': TaskSerializer(
-            tasks.order_by('-created_at')[:5],
+            TaskSerializer.setup_eager_loading(tasks).order_by('-created_at')[:5],
             many=True
         ).data,
         'members': TeamMembershipSerializer(members, many=True).data,
@@ -651,29 +811,46 @@ def team_dashboard(request, team_id):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def user_recommendations(request):
-    """Get personalized recommendations for the user"""
-    recommendations = get_user_recommendations(request.user)
+    """Get personalized recommendations for the user from their precomputed feed"""
+    feed = get_feed(request.user)
 
-    # Serialize the recommendations
-    serialized_recommendations = {}
-
-    if 'hackathons' in recommendations:
-        serialized_recommendations['hackathons'] = HackathonSerializer(
-            recommendations['hackathons'], many=True
-        ).data
-
-    if 'teams' in recommendations:
-        serialized_recommendations['teams'] = TeamSerializer(
-            recommendations['teams'], many=True
-        ).data
-
-    return Response(serialized_recommendations)
+    return Response({
+        'hackathons': feed.hackathons,
+        'teams': feed.teams,
+        'refreshed_at': feed.refreshed_at,
+        'is_stale': feed.is_stale,
+    })
 
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def trending_skills(request):
     """Get trending skills"""
+    window = request.query_params.get('window')
+    hackathon_id = request.query_params.get('hackathon')
+    if hackathon_id:
+        if not hackathon_id.isdigit():
+            return Response(
+                {'error': 'hackathon must be a hackathon ID'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if window:
+            return Response(
+                {'error': 'window cannot be combined with hackathon'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        hackathon = get_object_or_404(Hackathon, id=hackathon_id)
+        return Response(get_trending_skills(hackathon))
+
+    if window:
+        window_delta = parse_window(window)
+        if window_delta is None:
+            return Response(
+                {'error': 'window must look like 24h or 7d and be at most 90d'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(trending_in_window(window_delta))
+
     skills = get_trending_skills()
     return Response(skills)
 
@@ -683,8 +860,31 @@ def trending_skills(request):
 def hackathon_analytics(request, hackathon_id):
     """Get analytics for a specific hackathon"""
     hackathon = get_object_or_404(Hackathon, id=hackathon_id)
-    analytics = get_hackathon_analytics(hackathon)
-    return Response(analytics)
+    snapshot = get_snapshot(hackathon)
+
+    return Response({
+        **snapshot.data,
+        'refreshed_at': snapshot.refreshed_at,
+        'is_stale': snapshot.is_stale,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def hackathon_analytics_history(request, hackathon_id):
+    """Get the stored analytics history of a hackathon"""
+    hackathon = get_object_or_404(Hackathon, id=hackathon_id)
+
+    since = request.query_params.get('since')
+    if since:
+        since = parse_since(since)
+        if since is None:
+            return Response(
+                {'error': 'since must be an ISO 8601 datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    return Response(analytics_history(hackathon, since=since or None))
 
 
 @api_view(['GET'])
@@ -713,15 +913,49 @@ def team_health(request, team_id):
             status=status.HTTP_403_FORBIDDEN
         )
 
-    health_score = calculate_team_health_score(team)
+    since = request.query_params.get('since')
+    if since:
+        since = parse_since(since)
+        if since is None:
+            return Response(
+                {'error': 'since must be an ISO 8601 datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-    return Response({
+    health_score = get_current_health(team)
+    data = {
         'team_id': team_id,
         'health_score': health_score,
-        'status': 'excellent' if health_score >= 80 else
-                 'good' if health_score >= 60 else
-                 'needs_improvement' if health_score >= 40 else 'poor'
-    })
+        'status': team_health_status(health_score)
+    }
+    if since:
+        data['history'] = health_history(team, since=since)
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def hackathon_team_health(request, hackathon_id):
+    """Get health scores for every team of a hackathon"""
+    hackathon = get_object_or_404(Hackathon, id=hackathon_id)
+
+    if hackathon.created_by != request.user and not request.user.is_staff:
+        return Response(
+            {'error': 'Only the hackathon organizer can view team health for all teams'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    teams = annotate_team_health(Team.objects.filter(hackathon=hackathon)).order_by('id')
+    results = []
+    for team in teams:
+        health_score = team_health_score(team)
+        results.append({
+            'team_id': team.id,
+            'team_name': team.name,
+            'health_score': health_score,
+            'status': team_health_status(health_score)
+        })
+    return Response(results)
 
 
 @api_view(['POST'])
@@ -772,7 +1006,7 @@ def transfer_leadership(request, team_id):
     )
 
     team.leader = new_leader
-    team.save()
+    team.save(update_fields=['leader', 'updated_at'])
 
     # Update roles
     new_leader_membership.role = 'leader'
@@ -801,8 +1035,8 @@ def search_users(request):
     ).exclude(id=request.user.id)[:20]
 
     # Also search by skills
-    profiles_by_skills = UserProfile.objects.filter(
-        skills__icontains=query
+    profiles_by_skills = filter_profiles_by_skills(
+        UserProfile.objects.select_related('user'), [query], partial=True
     ).exclude(user=request.user)[:20]
 
     # Combine results
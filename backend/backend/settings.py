@@ -130,6 +130,49 @@ else:
     }
 
 
+# Cache
+# Use a shared Redis cache when REDIS_URL is set so invalidations reach every worker
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds a cached find-teammates result may be served
+MATCHING_CACHE_TIMEOUT = int(os.getenv('MATCHING_CACHE_TIMEOUT', 15 * 60))
+
+# Candidate generation for find-teammates: 'exact' scores every available
+# profile, 'lsh' rescores only the MinHash/LSH shortlist of similar skill sets
+MATCHING_STRATEGY = os.getenv('MATCHING_STRATEGY', 'exact')
+MATCHING_LSH_BANDS = int(os.getenv('MATCHING_LSH_BANDS', 16))
+MATCHING_LSH_ROWS = int(os.getenv('MATCHING_LSH_ROWS', 2))
+# Candidates outside a short LSH shortlist scored to fill the results
+MATCHING_LSH_TOP_UP_SCAN = int(os.getenv('MATCHING_LSH_TOP_UP_SCAN', 2000))
+
+# Seconds before the background worker rebuilds a recommendation feed
+# even if nothing marked it stale
+RECOMMENDATION_FEED_MAX_AGE = int(os.getenv('RECOMMENDATION_FEED_MAX_AGE', 60 * 60))
+
+# Minimum seconds between rebuilds of a stale hackathon analytics snapshot
+HACKATHON_ANALYTICS_DEBOUNCE = int(os.getenv('HACKATHON_ANALYTICS_DEBOUNCE', 30))
+
+# Seconds a team's current health score may be served from the cache; task
+# and membership changes invalidate it sooner
+TEAM_HEALTH_CACHE_TIMEOUT = int(os.getenv('TEAM_HEALTH_CACHE_TIMEOUT', 5 * 60))
+
+# Worker processes for batch team formation (0 = one per CPU)
+TEAM_FORMATION_WORKERS = int(os.getenv('TEAM_FORMATION_WORKERS', 0))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 